@@ -0,0 +1,70 @@
+"""Micro-benchmark: legacy per-token SSE encoding vs. api/sse.py.
+
+    python benchmarks/sse_encoding.py [--tokens 200000]
+
+Legacy = what the routes did before: build the nested dict, ``json.dumps`` it,
+format a ``str`` frame per token (encoded to bytes by Starlette). New = the
+shared encoder, reported both without coalescing (encoding cost only) and with
+the default 30 ms / 256 B coalescing (frame count is what drives syscalls).
+Tokens are produced as fast as possible, so coalescing here is size-bound.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from candidate_agent.api.sse import sse_frames
+
+# Typical Claude stream chunk sizes: 1–6 words
+_CHUNKS = ["The", " candidate", "'s application", " is", " in", " the", " Technical", " Interview", " stage", "."]
+
+
+def legacy(tokens: int) -> tuple[int, int]:
+    frames = 0
+    size = 0
+    for i in range(tokens):
+        content = _CHUNKS[i % len(_CHUNKS)]
+        frame = f"data: {json.dumps({'event': 'token', 'data': {'content': content}})}\n\n"
+        size += len(frame.encode("utf-8"))
+        frames += 1
+    return frames, size
+
+
+async def new(tokens: int, coalesce_bytes: int) -> tuple[int, int]:
+    async def events():
+        for i in range(tokens):
+            yield "token", {"content": _CHUNKS[i % len(_CHUNKS)]}
+
+    frames = 0
+    size = 0
+    async for frame in sse_frames(events(), coalesce_bytes=coalesce_bytes):
+        size += len(frame)
+        frames += 1
+    return frames, size
+
+
+def _report(label: str, tokens: int, elapsed: float, frames: int, size: int) -> None:
+    print(
+        f"{label:<28} {elapsed * 1000:9.1f} ms  {elapsed / tokens * 1e6:6.2f} µs/token  "
+        f"{frames:>8} frames  {size / 1024:9.1f} KiB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=200_000)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    frames, size = legacy(args.tokens)
+    _report("legacy json.dumps per token", args.tokens, time.perf_counter() - started, frames, size)
+
+    for label, coalesce in [("sse_frames, no coalescing", 0), ("sse_frames, coalesced", 256)]:
+        started = time.perf_counter()
+        frames, size = asyncio.run(new(args.tokens, coalesce))
+        _report(label, args.tokens, time.perf_counter() - started, frames, size)
+
+
+if __name__ == "__main__":
+    main()
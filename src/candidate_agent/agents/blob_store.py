@@ -0,0 +1,196 @@
+"""Content-addressed blob store for large tool results.
+
+ToolMessage payloads from tools such as ``getCandidateJourney`` or
+``getInterviewFeedback`` can be many KB. Kept inline, they are re-serialized
+into every checkpoint version of the thread state. Instead, payloads above a
+size threshold are written once to a blob store (keyed by SHA-256, so repeated
+results are deduplicated) and the ToolMessage keeps only a small reference.
+
+References are resolved lazily when the LLM prompt is built
+(see ``resolve_messages``), so the model still sees the full tool output.
+
+Backends:
+  memory — bounded LRU dict, per process (default)
+  disk   — one file per blob under TOOL_BLOB_DIR, survives restarts
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Sequence
+
+import structlog
+from langchain_core.messages import AnyMessage, ToolMessage
+from langgraph.prebuilt.tool_node import ToolCallRequest
+
+logger = structlog.get_logger(__name__)
+
+# additional_kwargs key holding the blob reference on an offloaded ToolMessage
+BLOB_REF_KEY = "blob_ref"
+
+
+class BlobStore(ABC):
+    """Minimal content-addressed byte store."""
+
+    def put(self, data: bytes) -> str:
+        """Store ``data`` and return its SHA-256 hex digest (no-op if already present)."""
+        key = hashlib.sha256(data).hexdigest()
+        if not self.contains(key):
+            self._write(key, data)
+        return key
+
+    @abstractmethod
+    def get(self, key: str) -> bytes | None:
+        """Return the blob for ``key``, or None if it is unknown or was evicted."""
+
+    @abstractmethod
+    def contains(self, key: str) -> bool:
+        """Return True if ``key`` is stored."""
+
+    @abstractmethod
+    def _write(self, key: str, data: bytes) -> None:
+        """Persist a blob that is not yet stored."""
+
+
+class InMemoryBlobStore(BlobStore):
+    """Per-process blob store bounded by total size (least recently used evicted first)."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self._max_bytes = max_bytes
+        self._blobs: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+
+    def get(self, key: str) -> bytes | None:
+        data = self._blobs.get(key)
+        if data is not None:
+            self._blobs.move_to_end(key)
+        return data
+
+    def contains(self, key: str) -> bool:
+        return key in self._blobs
+
+    def _write(self, key: str, data: bytes) -> None:
+        self._blobs[key] = data
+        self._size += len(data)
+        while self._size > self._max_bytes and len(self._blobs) > 1:
+            _, evicted = self._blobs.popitem(last=False)
+            self._size -= len(evicted)
+
+
+class DiskBlobStore(BlobStore):
+    """Blob store backed by a local directory (``<root>/<key[:2]>/<key>``)."""
+
+    def __init__(self, root: str | Path) -> None:
+        self._root = Path(root)
+        self._root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self._root / key[:2] / key
+
+    def get(self, key: str) -> bytes | None:
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def contains(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def _write(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so concurrent readers never see a partial blob
+        fd, tmp = tempfile.mkstemp(dir=path.parent)
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+
+
+def build_blob_store(backend: str, directory: str, memory_max_bytes: int) -> BlobStore | None:
+    """Return the configured blob store, or None when offloading is disabled."""
+    backend = backend.lower()
+    if backend == "memory":
+        return InMemoryBlobStore(memory_max_bytes)
+    if backend == "disk":
+        return DiskBlobStore(directory)
+    if backend in ("none", "off", ""):
+        return None
+    raise ValueError(f"Unknown TOOL_BLOB_STORE backend: {backend!r} (expected memory|disk|none)")
+
+
+# ── ToolMessage offloading ────────────────────────────────────────────────────
+
+
+def _encode_content(content: str | list) -> tuple[bytes, str]:
+    if isinstance(content, str):
+        return content.encode("utf-8"), "text"
+    return json.dumps(content, separators=(",", ":")).encode("utf-8"), "json"
+
+
+def _decode_content(data: bytes, fmt: str) -> str | list:
+    text = data.decode("utf-8")
+    return json.loads(text) if fmt == "json" else text
+
+
+def offload_tool_message(msg: ToolMessage, store: BlobStore, min_bytes: int) -> ToolMessage:
+    """Move a large ToolMessage payload into ``store``, leaving a reference behind.
+
+    The MCP artifact (``structured_content``) duplicates the text payload and is
+    not sent to the LLM, so it is dropped from offloaded messages.
+    """
+    if BLOB_REF_KEY in msg.additional_kwargs:
+        return msg
+    data, fmt = _encode_content(msg.content)
+    if len(data) < min_bytes:
+        return msg
+
+    key = store.put(data)
+    ref = {"key": key, "size": len(data), "format": fmt}
+    return msg.model_copy(
+        update={
+            "content": f"[{msg.name or 'tool'} result stored out-of-band: sha256:{key[:16]}, {len(data)} bytes]",
+            "artifact": None,
+            "additional_kwargs": {**msg.additional_kwargs, BLOB_REF_KEY: ref},
+        }
+    )
+
+
+def resolve_message(msg: AnyMessage, store: BlobStore | None) -> AnyMessage:
+    """Return ``msg`` with its out-of-band payload restored (copy; state is not mutated)."""
+    ref: dict[str, Any] | None = msg.additional_kwargs.get(BLOB_REF_KEY)
+    if ref is None or store is None:
+        return msg
+    data = store.get(ref["key"])
+    if data is None:
+        # Evicted (memory backend) or written by another process — let the LLM re-fetch
+        logger.warning("tool_blob_missing", key=ref["key"], tool=msg.name)
+        content: str | list = (
+            f"[{msg.name or 'tool'} result is no longer available — call the tool again if needed]"
+        )
+    else:
+        content = _decode_content(data, ref.get("format", "text"))
+    kwargs = {k: v for k, v in msg.additional_kwargs.items() if k != BLOB_REF_KEY}
+    return msg.model_copy(update={"content": content, "additional_kwargs": kwargs})
+
+
+def resolve_messages(messages: Sequence[AnyMessage], store: BlobStore | None) -> list[AnyMessage]:
+    """Resolve every blob reference in ``messages`` for prompt construction."""
+    if store is None:
+        return list(messages)
+    return [resolve_message(m, store) for m in messages]
+
+
+def offload_large_results(store: BlobStore, min_bytes: int):
+    """ToolNode ``awrap_tool_call`` hook that offloads large ToolMessage payloads."""
+
+    async def _wrapper(request: ToolCallRequest, execute):
+        result = await execute(request)
+        if isinstance(result, ToolMessage):
+            return offload_tool_message(result, store, min_bytes)
+        return result
+
+    return _wrapper
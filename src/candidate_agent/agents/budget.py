@@ -0,0 +1,216 @@
+"""Per-turn tool-call budgets for the ReAct agents.
+
+Without a budget a confused model can go through a dozen tool calls before it
+answers, and those runs set our p99. Each agent node now has a tool-call
+budget for each turn. The budget is the node's default (AGENT_TOOL_CALL_BUDGET
+or an AGENT_TOOL_CALL_BUDGETS override), lowered by a request's
+``max_tool_calls`` if that is smaller. Two hooks enforce it:
+
+  • budget_model      dynamic ``model`` for create_react_agent. Once the budget
+                      is spent, the loop keeps repeating identical calls, or
+                      ``remaining_steps`` runs low, the agent is re-bound with
+                      tool_choice "none" and told to answer from what it has.
+                      In JSON mode (agents/structured.py) it is bound to call
+                      the answer tool instead.
+  • enforce_budget    ToolNode wrapper. It answers a repeated identical call
+                      with the earlier result instead of calling MCP again, and
+                      refuses calls past the budget. This backs up models that
+                      ignore tool_choice.
+
+Counters live in ``budget_stats``.
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Sequence
+
+import structlog
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AnyMessage, SystemMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
+from langgraph.prebuilt.tool_node import ToolCallRequest
+
+from candidate_agent.agents.state import current_turn
+from candidate_agent.agents.structured import (
+    ANSWER_TOOL_NAME,
+    submit_structured_answer,
+    with_structured_instruction,
+)
+from candidate_agent.agents.tool_context import tool_key
+
+logger = structlog.get_logger(__name__)
+
+# Forced-answer mode starts when fewer graph steps than this remain
+STEP_RESERVE = 3
+
+FINAL_ANSWER_INSTRUCTION = (
+    "\n\n## Tool Budget Exhausted\n"
+    "You have used all tool calls available for this question. Do not call any more tools. "
+    "Answer now using only the data already retrieved above; if something could not be "
+    "retrieved, say so briefly."
+)
+
+
+@dataclass
+class BudgetStats:
+    """Process-wide step-budget counters, keyed by agent node."""
+
+    forced_final: Counter = field(default_factory=Counter)     # answers forced by the budget
+    rejected_calls: Counter = field(default_factory=Counter)   # calls refused past the budget
+    repeated_calls: Counter = field(default_factory=Counter)   # identical calls served from the turn
+
+    def snapshot(self) -> dict[str, dict[str, int]]:
+        return {
+            "forced_final": dict(self.forced_final),
+            "rejected_calls": dict(self.rejected_calls),
+            "repeated_calls": dict(self.repeated_calls),
+        }
+
+
+budget_stats = BudgetStats()
+
+
+@dataclass
+class TurnUsage:
+    tool_calls: int = 0
+    repeats: int = 0
+
+
+def turn_usage(
+    messages: Sequence[AnyMessage], agent: str, turn_id: str | None, exempt: frozenset[str]
+) -> TurnUsage:
+    """Tool calls (and repeats of an identical call) made by ``agent`` this turn."""
+    usage = TurnUsage()
+    seen: set[str] = set()
+    for msg in current_turn(messages, turn_id):
+        if not isinstance(msg, AIMessage) or msg.name != agent:
+            continue
+        for tc in msg.tool_calls:
+            if tc["name"] in exempt:
+                continue
+            usage.tool_calls += 1
+            key = tool_key(tc["name"], tc["args"])
+            if key in seen:
+                usage.repeats += 1
+            seen.add(key)
+    return usage
+
+
+def effective_budget(state: dict, node_budget: int) -> int:
+    """The node budget, lowered by the request's ``tool_call_budget`` when smaller."""
+    requested = state.get("tool_call_budget")
+    return min(node_budget, requested) if requested else node_budget
+
+
+def _with_final_instruction(messages: list[AnyMessage]) -> list[AnyMessage]:
+    """Append the budget instruction to the leading system prompt."""
+    if messages and isinstance(messages[0], SystemMessage):
+        head = SystemMessage(content=f"{messages[0].text}{FINAL_ANSWER_INSTRUCTION}")
+        return [head, *messages[1:]]
+    return [SystemMessage(content=FINAL_ANSWER_INSTRUCTION.lstrip()), *messages]
+
+
+def budget_model(
+    llm: BaseChatModel,
+    tools: list,
+    *,
+    agent: str,
+    budget: int,
+    max_repeats: int,
+    no_tool_choice: str | dict,
+    structured_max_tokens: int,
+    exempt: frozenset[str] = frozenset(),
+) -> Callable:
+    """Return a dynamic ``model`` callable enforcing ``budget`` for ``agent``.
+
+    Turns with ``response_format == "json"`` get the structured-answer bindings.
+    """
+    with_tools = llm.bind_tools(tools)
+    # Tools stay declared (the history holds tool calls) but may not be called
+    force = RunnableLambda(_with_final_instruction) | llm.bind_tools(tools, tool_choice=no_tool_choice)
+    json_tools = [*tools, submit_structured_answer]
+    json_with_tools = RunnableLambda(with_structured_instruction) | llm.bind_tools(
+        json_tools, tool_choice="any", max_tokens=structured_max_tokens
+    )
+    json_force = RunnableLambda(with_structured_instruction) | llm.bind_tools(
+        json_tools, tool_choice=ANSWER_TOOL_NAME, max_tokens=structured_max_tokens
+    )
+
+    def select(state: dict, runtime) -> BaseChatModel:
+        limit = effective_budget(state, budget)
+        usage = turn_usage(state["messages"], agent, state.get("turn_id"), exempt)
+        remaining_steps = state.get("remaining_steps")
+        structured = state.get("response_format") == "json"
+        if usage.tool_calls < limit and usage.repeats < max_repeats and (
+            remaining_steps is None or remaining_steps > STEP_RESERVE
+        ):
+            return json_with_tools if structured else with_tools
+        budget_stats.forced_final[agent] += 1
+        logger.info(
+            "step_budget_exhausted",
+            agent=agent,
+            tool_calls=usage.tool_calls,
+            budget=limit,
+            repeats=usage.repeats,
+            remaining_steps=remaining_steps,
+        )
+        return json_force if structured else force
+
+    return select
+
+
+def enforce_budget(*, agent: str, budget: int, exempt: frozenset[str] = frozenset()):
+    """ToolNode ``awrap_tool_call`` hook deduplicating repeats and refusing calls past the budget."""
+
+    async def _wrapper(request: ToolCallRequest, execute):
+        call = request.tool_call
+        if call["name"] in exempt:
+            return await execute(request)
+        state = request.state or {}
+        turn = current_turn(state.get("messages", []), state.get("turn_id"))
+
+        key = tool_key(call["name"], call["args"])
+        earlier = {
+            tc["id"]
+            for m in turn
+            if isinstance(m, AIMessage) and m.name == agent
+            for tc in m.tool_calls
+            if tc["id"] != call["id"] and tool_key(tc["name"], tc["args"]) == key
+        }
+        previous = next(
+            (m for m in reversed(turn) if isinstance(m, ToolMessage) and m.tool_call_id in earlier),
+            None,
+        )
+        if previous is not None and previous.status != "error":
+            budget_stats.repeated_calls[agent] += 1
+            logger.info("repeated_tool_call", agent=agent, tool=call["name"])
+            return ToolMessage(
+                content=previous.content,
+                name=call["name"],
+                tool_call_id=call["id"],
+                additional_kwargs=previous.additional_kwargs,
+            )
+
+        # Position of this call among the agent's budgeted calls this turn (1-based)
+        position = 0
+        for m in turn:
+            if isinstance(m, AIMessage) and m.name == agent:
+                for tc in m.tool_calls:
+                    if tc["name"] not in exempt:
+                        position += 1
+                    if tc["id"] == call["id"]:
+                        break
+                else:
+                    continue
+                break
+        if position > effective_budget(state, budget):
+            budget_stats.rejected_calls[agent] += 1
+            return ToolMessage(
+                content="Tool budget exhausted for this question — answer with the data already retrieved.",
+                name=call["name"],
+                tool_call_id=call["id"],
+                status="error",
+            )
+        return await execute(request)
+
+    return _wrapper
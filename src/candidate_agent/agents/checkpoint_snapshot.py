@@ -0,0 +1,131 @@
+"""Hand off in-memory thread checkpoints across a process restart.
+
+MemorySaver keeps every conversation in process memory, so a deploy would
+otherwise drop all threads. On drain, the latest root checkpoint of every
+thread is written to a snapshot file; the next process imports it at startup
+and the threads continue where they left off.
+
+Snapshot format: JSON lines, one thread per line —
+  {"graph": "v2", "thread_id": "...", "checkpoint": [type, b64], "metadata": [type, b64]}
+Checkpoints are encoded with the saver's own serializer, so message objects
+round-trip exactly as they would through the checkpointer.
+
+Only the latest checkpoint per thread is exported (history is not needed to
+resume a conversation), and only from savers that hold state in memory.
+
+Offloaded tool results (agents/blob_store.py) in a process-local blob store
+would not survive the restart, so the drain passes that store as
+``inline_blobs`` and their payloads are written back inline. With the disk
+store, references are exported as they are.
+"""
+
+import base64
+import json
+import os
+from pathlib import Path
+
+import structlog
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
+
+from candidate_agent.agents.blob_store import BlobStore, resolve_messages
+
+logger = structlog.get_logger(__name__)
+
+
+def _encode(typed: tuple[str, bytes]) -> list[str]:
+    return [typed[0], base64.b64encode(typed[1]).decode("ascii")]
+
+
+def _decode(raw: list[str]) -> tuple[str, bytes]:
+    return raw[0], base64.b64decode(raw[1])
+
+
+def _inline_blobs(checkpoint: dict, store: BlobStore) -> dict:
+    """``checkpoint`` with the blob references in its messages resolved (copy)."""
+    values = checkpoint["channel_values"]
+    if not values.get("messages"):
+        return checkpoint
+    messages = resolve_messages(values["messages"], store)
+    return {**checkpoint, "channel_values": {**values, "messages": messages}}
+
+
+async def export_checkpoints(
+    savers: dict[str, BaseCheckpointSaver],
+    path: str | Path,
+    inline_blobs: BlobStore | None = None,
+) -> int:
+    """Write the latest checkpoint of every thread held by ``savers`` to ``path``.
+
+    Args:
+        savers:       Checkpointers keyed by graph name (e.g. ``{"v1": ..., "v2": ...}``).
+        path:         Snapshot file; written atomically (tmp file + rename).
+        inline_blobs: Process-local blob store whose referenced payloads are
+                      written inline (None exports references unchanged).
+
+    Returns:
+        Number of threads exported.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    exported = 0
+
+    with tmp.open("w", encoding="utf-8") as fh:
+        for graph_name, saver in savers.items():
+            if not isinstance(saver, InMemorySaver):
+                logger.info("checkpoint_export_skipped", graph=graph_name, reason="persistent saver")
+                continue
+            for thread_id in list(saver.storage):
+                config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+                tup = await saver.aget_tuple(config)
+                if tup is None:
+                    continue
+                checkpoint = tup.checkpoint
+                if inline_blobs is not None:
+                    checkpoint = _inline_blobs(checkpoint, inline_blobs)
+                record = {
+                    "graph": graph_name,
+                    "thread_id": thread_id,
+                    "checkpoint": _encode(saver.serde.dumps_typed(checkpoint)),
+                    "metadata": _encode(saver.serde.dumps_typed(tup.metadata)),
+                }
+                fh.write(json.dumps(record) + "\n")
+                exported += 1
+
+    os.replace(tmp, path)
+    logger.info("checkpoints_exported", path=str(path), threads=exported)
+    return exported
+
+
+async def import_checkpoints(savers: dict[str, BaseCheckpointSaver], path: str | Path) -> int:
+    """Load a snapshot written by ``export_checkpoints`` into ``savers``.
+
+    The snapshot is renamed to ``<path>.imported`` afterwards so a crash-looping
+    process does not re-import stale threads over newer ones.
+
+    Returns:
+        Number of threads imported (0 if no snapshot exists).
+    """
+    path = Path(path)
+    if not path.exists():
+        return 0
+
+    imported = 0
+    with path.open("r", encoding="utf-8") as fh:
+        for line in fh:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            saver = savers.get(record["graph"])
+            if saver is None:
+                continue
+            checkpoint = saver.serde.loads_typed(_decode(record["checkpoint"]))
+            metadata = saver.serde.loads_typed(_decode(record["metadata"]))
+            config = {"configurable": {"thread_id": record["thread_id"], "checkpoint_ns": ""}}
+            await saver.aput(config, checkpoint, metadata, checkpoint["channel_versions"])
+            imported += 1
+
+    os.replace(path, path.with_suffix(path.suffix + ".imported"))
+    logger.info("checkpoints_imported", path=str(path), threads=imported)
+    return imported
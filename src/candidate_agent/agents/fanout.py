@@ -0,0 +1,258 @@
+"""Per-application fan-out for multi-application questions (v2 graph).
+
+"Summarize all my applications" would otherwise make post_apply_assistant walk
+every application sequentially inside one ReAct loop. Instead:
+
+    application_fan_out      calls getApplicationsByCandidate once, then emits one
+                             Send("application_sub_run", ...) per application
+    application_sub_run      runs the post_apply ReAct agent scoped to a single
+                             application, in parallel — at most max_concurrency
+                             at a time per fan-out (other turns are not affected)
+    synthesize_applications  one LLM call merging the per-application findings
+                             into the candidate-facing answer
+
+Single-application candidates (or an unparseable list) fall through to the
+normal post_apply_assistant with the fetched list already in the conversation.
+"""
+
+import asyncio
+import json
+import re
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+from uuid import uuid4
+
+import structlog
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool
+from langgraph.types import Command, Send
+
+from candidate_agent.agents.blob_store import BlobStore, offload_tool_message, resolve_messages
+from candidate_agent.agents.tool_timing import DURATION_KEY
+
+logger = structlog.get_logger(__name__)
+
+LIST_TOOL_NAME = "getApplicationsByCandidate"
+
+# Synthesized AIMessage.response_metadata key listing the tool calls made inside
+# sub-runs — their messages never reach the parent thread, so per-turn
+# accounting reads them from here.
+SUB_RUN_TOOL_CALLS_KEY = "sub_run_tool_calls"
+
+_MULTI_APPLICATION_RE = re.compile(
+    r"\b(all|each|every)\s+(of\s+)?my\s+(job\s+)?applications?\b"
+    r"|\b(summar\w*|overview|recap|status(es)?|update)\b.{0,40}\bmy\s+applications\b"
+    r"|\bmy\s+applications\b.{0,40}\b(summar\w*|overview|recap|status(es)?|stand)\b",
+    re.IGNORECASE,
+)
+
+
+def is_multi_application_query(text: str) -> bool:
+    """Heuristic: does the question ask about all of the candidate's applications?"""
+    return bool(_MULTI_APPLICATION_RE.search(text))
+
+
+def merge_summaries(left: list | None, right: list | None) -> list:
+    """Reducer for ``application_summaries`` — ``None`` resets the list for a new fan-out.
+
+    Entries are keyed by ``application_id`` so re-applying the same update (the
+    ReAct subgraphs share this state schema and return it whole) is a no-op.
+    """
+    if right is None:
+        return []
+    merged = {s["application_id"]: s for s in (left or [])}
+    merged.update((s["application_id"], s) for s in right)
+    return list(merged.values())
+
+
+def tool_text(content: str | list) -> str:
+    """Flatten ToolMessage content (string or content blocks) to text."""
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block.get("text", "") if isinstance(block, dict) else str(block) for block in content
+    )
+
+
+def extract_application_ids(payload: Any) -> list[str]:
+    """Collect ``applicationId`` values from a tool payload, in order, without duplicates."""
+    found: list[str] = []
+
+    def walk(node: Any) -> None:
+        if isinstance(node, dict):
+            app_id = node.get("applicationId") or node.get("application_id")
+            if isinstance(app_id, str) and app_id not in found:
+                found.append(app_id)
+            for value in node.values():
+                if isinstance(value, (dict, list)):
+                    walk(value)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+
+    walk(payload)
+    return found
+
+
+def _candidate_arg(tool: BaseTool) -> str:
+    """Name of the candidate-id argument in the MCP tool's input schema."""
+    args = list(tool.args)
+    for name in ("candidateId", "candidate_id"):
+        if name in args:
+            return name
+    return args[0] if args else "candidateId"
+
+
+def build_fanout_nodes(
+    *,
+    list_tool: BaseTool,
+    post_apply_agent,
+    llm: BaseChatModel,
+    persona_prompt: str,
+    blob_store: BlobStore | None,
+    min_blob_bytes: int,
+    max_concurrency: int,
+    max_applications: int,
+):
+    """Return the ``(fan_out, sub_run, synthesize)`` node callables for ``build_v2_graph``."""
+    # fan-out id → [semaphore, sub-runs using it]. An entry lives only while one of
+    # its sub-runs is running, so cancelled turns leave nothing behind; a later
+    # sub-run of the same fan-out that finds no entry starts a fresh semaphore.
+    semaphores: dict[str, list] = {}
+    candidate_arg = _candidate_arg(list_tool)
+
+    @asynccontextmanager
+    async def dispatch_slot(fanout_id: str) -> AsyncIterator[None]:
+        entry = semaphores.setdefault(fanout_id, [asyncio.Semaphore(max_concurrency), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del semaphores[fanout_id]
+
+    async def application_fan_out(state: dict, config: RunnableConfig) -> Command:
+        candidate_id = state.get("candidate_id", "")
+        call_id = f"call_fanout_{uuid4().hex[:12]}"
+        call = AIMessage(
+            content="",
+            name="post_apply_assistant",
+            tool_calls=[{"name": LIST_TOOL_NAME, "args": {candidate_arg: candidate_id}, "id": call_id}],
+        )
+        started = time.perf_counter()
+        result: ToolMessage = await list_tool.ainvoke(
+            {"type": "tool_call", "name": LIST_TOOL_NAME, "args": {candidate_arg: candidate_id}, "id": call_id},
+            config,
+        )
+        result.response_metadata[DURATION_KEY] = round((time.perf_counter() - started) * 1000, 1)
+        try:
+            app_ids = extract_application_ids(json.loads(tool_text(result.content)))
+        except ValueError:
+            app_ids = []
+
+        if blob_store is not None:
+            result = offload_tool_message(result, blob_store, min_blob_bytes)
+        messages = [call, result]
+
+        if not 2 <= len(app_ids) <= max_applications:
+            logger.info("fanout_skipped", candidate_id=candidate_id, applications=len(app_ids))
+            return Command(goto="post_apply_assistant", update={"messages": messages})
+
+        question = next(
+            (m.content for m in reversed(state["messages"]) if isinstance(m, HumanMessage)), ""
+        )
+        fanout_id = uuid4().hex
+        logger.info(
+            "fanout_dispatch",
+            candidate_id=candidate_id,
+            applications=len(app_ids),
+            max_concurrency=max_concurrency,
+        )
+        return Command(
+            goto=[
+                Send(
+                    "application_sub_run",
+                    {
+                        "fanout_id": fanout_id,
+                        "candidate_id": candidate_id,
+                        "application_id": app_id,
+                        "correlation_id": state.get("correlation_id", ""),
+                        "question": question,
+                    },
+                )
+                for app_id in app_ids
+            ],
+            update={"messages": messages, "application_summaries": None},
+        )
+
+    async def application_sub_run(payload: dict, config: RunnableConfig) -> dict:
+        app_id = payload["application_id"]
+        prompt = (
+            f"{payload['question']}\n\n"
+            f"Focus only on application {app_id}. Gather what is needed to answer for this "
+            "application and reply with a short factual summary (status, stage, key dates, "
+            "next step). It will be combined with summaries of the candidate's other applications."
+        )
+        async with dispatch_slot(payload["fanout_id"]):
+            try:
+                out = await post_apply_agent.ainvoke(
+                    {
+                        "messages": [HumanMessage(content=prompt)],
+                        "candidate_id": payload["candidate_id"],
+                        "application_id": app_id,
+                        "correlation_id": payload["correlation_id"],
+                        "active_agent": "post_apply_assistant",
+                    },
+                    config,
+                )
+            except Exception as exc:
+                logger.warning("fanout_sub_run_failed", application_id=app_id, error=str(exc))
+                return {
+                    "application_summaries": [
+                        {"application_id": app_id, "summary": "Details could not be retrieved.", "tool_calls": []}
+                    ]
+                }
+
+        final = out["messages"][-1]
+        durations = {
+            m.tool_call_id: m.response_metadata.get(DURATION_KEY)
+            for m in out["messages"]
+            if isinstance(m, ToolMessage)
+        }
+        tool_calls = [
+            {"name": tc["name"], "duration_ms": durations.get(tc["id"])}
+            for m in out["messages"]
+            if isinstance(m, AIMessage)
+            for tc in m.tool_calls
+        ]
+        return {
+            "application_summaries": [
+                {"application_id": app_id, "summary": tool_text(final.content), "tool_calls": tool_calls}
+            ]
+        }
+
+    async def synthesize_applications(state: dict, config: RunnableConfig) -> dict:
+        summaries = sorted(state.get("application_summaries", []), key=lambda s: s["application_id"])
+        findings = "\n\n".join(f"### {s['application_id']}\n{s['summary']}" for s in summaries)
+        system = SystemMessage(
+            content=(
+                f"{persona_prompt}\n\n## Per-application findings\n"
+                "Each application was researched separately; the findings below are complete. "
+                "Answer the candidate's question by combining them — do not call tools.\n\n"
+                f"{findings}"
+            )
+        )
+        response = await llm.ainvoke([system] + resolve_messages(state["messages"], blob_store), config)
+        response.name = "post_apply_assistant"
+        response.response_metadata[SUB_RUN_TOOL_CALLS_KEY] = [
+            {**tc, "application_id": s["application_id"]} for s in summaries for tc in s["tool_calls"]
+        ]
+        logger.info("fanout_synthesized", applications=len(summaries))
+        return {"messages": [response], "active_agent": "post_apply_assistant"}
+
+    return application_fan_out, application_sub_run, synthesize_applications
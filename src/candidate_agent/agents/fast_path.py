@@ -0,0 +1,370 @@
+"""Templated fast path for deterministic v2 questions (no LLM call).
+
+"What's the status of application A123?" and "When is my next interview?"
+each map to one tool, and the answers always have the same shape. Routing
+them through v2_primary_assistant and post_apply_assistant costs at least
+three LLM calls. The ``fast_path`` node runs first in the v2 graph:
+
+  1. ``classify`` matches the whole message against a few strict patterns.
+     Small talk around the question is allowed; a second question or any other
+     wording is not.
+  2. The intent's tool is called directly, as application_fan_out does.
+  3. The payload is rendered from a template. Status codes are translated
+     with the state-machine labels from ``workflow_states_json``
+     (ats://workflow/application-states).
+
+Anything unexpected falls back to the normal entry node: no match, a missing
+application id, a tool error, or a payload without the expected fields. The
+fallback adds nothing to the thread. JSON-mode turns (agents/structured.py)
+always take the full graph. Counters live in ``fast_path_stats``.
+"""
+
+import json
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable
+from uuid import uuid4
+
+import structlog
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool
+from langgraph.graph import END
+from langgraph.types import Command
+
+from candidate_agent.agents.blob_store import BlobStore, offload_tool_message
+from candidate_agent.agents.fanout import tool_text
+from candidate_agent.agents.tool_timing import DURATION_KEY
+
+logger = structlog.get_logger(__name__)
+
+FAST_PATH_AGENT = "fast_path"
+STATUS_TOOL_NAME = "getApplicationStatus"
+EVENTS_TOOL_NAME = "getScheduledEvents"
+
+_POLITE = r"(?:(?:hi|hello|hey)\b[\s,!.]*)?(?:(?:can|could) you (?:please )?(?:tell me|check)\s*|please\s+)?"
+_APP_ID = r"(?P<app_id>[A-Z]\d{2,})"
+
+_INTENTS: dict[str, re.Pattern] = {
+    "application_status": re.compile(
+        _POLITE
+        + r"(?:what(?:'s| is) (?:the |my )?(?:current )?status (?:of|for|on) (?:my )?(?:job )?application"
+        r"|(?:check |get )?(?:the |my )?(?:current )?status (?:of|for|on) (?:my )?(?:job )?application"
+        r"|where (?:is|does) my (?:job )?application)"
+        + r"(?:\s+" + _APP_ID + r")?(?:\s+stand)?(?:\s+(?:right )?now)?\s*[?.!]*",
+        re.IGNORECASE,
+    ),
+    "next_interview": re.compile(
+        _POLITE
+        + r"(?:when(?:'s| is) my next interview"
+        r"|what(?:'s| is) my next interview"
+        r"|when are my (?:next|upcoming) interviews?"
+        r"|do i have (?:any )?(?:upcoming )?interviews?(?: scheduled| coming up)?)"
+        + r"\s*[?.!]*",
+        re.IGNORECASE,
+    ),
+}
+
+# Payload keys, in order of preference
+_STATUS_KEYS = ("status", "currentStatus", "currentStage", "stage", "state")
+_DAYS_KEYS = ("daysInStage", "daysInCurrentStage", "days_in_stage")
+_EVENT_LIST_KEYS = ("events", "scheduledEvents", "interviews", "items")
+_EVENT_TYPE_KEYS = ("eventType", "type", "stage", "title", "name")
+_EVENT_START_KEYS = ("scheduledAt", "startTime", "start", "dateTime", "scheduledDate", "date")
+_EVENT_DURATION_KEYS = ("durationMinutes", "duration")
+
+
+@dataclass
+class FastPathStats:
+    """Process-wide fast-path counters."""
+
+    answered: Counter = field(default_factory=Counter)   # by intent
+    fallbacks: Counter = field(default_factory=Counter)  # by reason
+
+    def snapshot(self) -> dict[str, dict[str, int]]:
+        return {"answered": dict(self.answered), "fallbacks": dict(self.fallbacks)}
+
+
+fast_path_stats = FastPathStats()
+
+
+@dataclass(frozen=True)
+class Intent:
+    name: str
+    application_id: str | None = None  # named in the message
+
+
+def classify(text: str) -> Intent | None:
+    """The intent ``text`` asks for, or None unless the whole message matches one."""
+    text = " ".join(text.split())
+    for name, pattern in _INTENTS.items():
+        match = pattern.fullmatch(text)
+        if match:
+            return Intent(name, match.groupdict().get("app_id"))
+    return None
+
+
+# ── Workflow labels ───────────────────────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class StateLabel:
+    label: str
+    description: str = ""
+
+
+def humanize(code: str) -> str:
+    """``TECHNICAL_INTERVIEW`` → ``Technical Interview``."""
+    return code.replace("_", " ").replace("-", " ").title()
+
+
+def workflow_labels(workflow_json: str) -> dict[str, StateLabel]:
+    """State code → label from ats://workflow/application-states, tolerating its layout.
+
+    Accepts a list of state objects (``{"code"|"state"|"id"|"name": ..., "label"|
+    "displayName"|...: ...}``) anywhere in the document, or a mapping keyed by
+    state code. Unknown layouts yield an empty dict (codes are then humanized).
+    """
+    try:
+        doc = json.loads(workflow_json) if workflow_json else None
+    except ValueError:
+        logger.warning("fast_path_workflow_unparseable")
+        return {}
+    labels: dict[str, StateLabel] = {}
+
+    def text_of(node: dict, keys: tuple[str, ...]) -> str:
+        return next((node[k] for k in keys if isinstance(node.get(k), str) and node[k]), "")
+
+    def add(code: str, node: dict) -> None:
+        label = text_of(node, ("label", "displayName", "display_name", "title", "name"))
+        if label == code or not label:
+            label = humanize(code)
+        labels.setdefault(code, StateLabel(label, text_of(node, ("description", "candidateMessage"))))
+
+    def walk(node: Any) -> None:
+        if isinstance(node, list):
+            for item in node:
+                walk(item)
+        elif isinstance(node, dict):
+            code = text_of(node, ("code", "state", "status", "id", "name"))
+            if code and code.isupper():
+                add(code, node)
+            for key, value in node.items():
+                if key.isupper() and isinstance(value, dict):
+                    add(key, value)
+                if isinstance(value, (dict, list)):
+                    walk(value)
+
+    walk(doc)
+    return labels
+
+
+# ── Templates ─────────────────────────────────────────────────────────────────
+
+
+def _first(node: dict, keys: tuple[str, ...]) -> Any:
+    return next((node[k] for k in keys if node.get(k) not in (None, "", [])), None)
+
+
+def render_status(payload: Any, application_id: str, labels: dict[str, StateLabel]) -> str | None:
+    """Answer for ``application_status``; None if the payload has no status."""
+    node = payload[0] if isinstance(payload, list) and len(payload) == 1 else payload
+    if not isinstance(node, dict):
+        return None
+    status = _first(node, _STATUS_KEYS)
+    if isinstance(status, dict):  # {"code": ..., "since": ...}
+        status = _first(status, ("code", "name", "status"))
+    if not isinstance(status, str):
+        return None
+    state = labels.get(status.upper(), StateLabel(humanize(status)))
+    title = node.get("jobTitle")
+    subject = f"Your application {application_id}" + (f" for {title}" if isinstance(title, str) else "")
+    parts = [f"{subject} is currently at the **{state.label}** stage."]
+    days = _first(node, _DAYS_KEYS)
+    if isinstance(days, int):
+        parts.append(f"It has been in this stage for {days} day{'s' if days != 1 else ''}.")
+    if state.description:
+        parts.append(state.description)
+    return " ".join(parts)
+
+
+def _parse_start(value: Any) -> datetime | None:
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def _format_start(start: datetime) -> str:
+    text = f"{start:%A, %B} {start.day} at {start:%I:%M %p}".replace(" 0", " ")
+    offset = start.utcoffset()
+    if offset is not None:
+        text += " UTC" if not offset else f" (UTC{start:%z})"
+    return text
+
+
+def _interviewer_names(event: dict) -> list[str]:
+    names = []
+    for person in event.get("interviewers") or []:
+        name = person if isinstance(person, str) else _first(person, ("name", "displayName"))
+        if isinstance(name, str):
+            names.append(name)
+    return names
+
+
+def render_next_interview(
+    payload: Any, labels: dict[str, StateLabel], now: datetime | None = None
+) -> str | None:
+    """Answer for ``next_interview``; None if the payload is not an event list."""
+    events = payload
+    if isinstance(payload, dict):
+        events = _first(payload, _EVENT_LIST_KEYS)
+        if events is None and not any(isinstance(v, list) and v for v in payload.values()):
+            events = []  # {"events": []} and similar
+    if not isinstance(events, list) or not all(isinstance(e, dict) for e in events):
+        return None
+    if not events:
+        return "You have no upcoming interviews scheduled right now."
+
+    dated = [(e, _parse_start(_first(e, _EVENT_START_KEYS))) for e in events]
+    if any(start is None for _, start in dated):
+        return None
+    upcoming = [
+        (e, start)
+        for e, start in dated
+        if now is None or start >= (now if start.tzinfo else now.replace(tzinfo=None))
+    ]
+    if not upcoming:
+        return "You have no upcoming interviews scheduled right now."
+    event, start = min(upcoming, key=lambda pair: pair[1].timestamp())
+
+    kind = _first(event, _EVENT_TYPE_KEYS)
+    label = labels.get(kind.upper(), StateLabel(humanize(kind))).label if isinstance(kind, str) else "Interview"
+    if "interview" not in label.lower():
+        label += " interview"
+    parts = [f"Your next interview is the **{label}** on {_format_start(start)}"]
+    duration = _first(event, _EVENT_DURATION_KEYS)
+    if isinstance(duration, int):
+        parts.append(f" ({duration} minutes)")
+    names = _interviewer_names(event)
+    if names:
+        parts.append(" with " + (", ".join(names[:-1]) + " and " + names[-1] if len(names) > 1 else names[0]))
+    parts.append(".")
+    if len(upcoming) > 1:
+        parts.append(f" You have {len(upcoming)} upcoming interviews in total.")
+    return "".join(parts)
+
+
+# ── Node ──────────────────────────────────────────────────────────────────────
+
+
+def _arg_name(tool: BaseTool, *candidates: str) -> str | None:
+    return next((name for name in candidates if name in tool.args), None)
+
+
+def _required_args(tool: BaseTool) -> set[str]:
+    schema = tool.args_schema
+    if isinstance(schema, dict):
+        return set(schema.get("required", []))
+    if schema is not None:
+        return set(schema.model_json_schema().get("required", []))
+    return set()
+
+
+def _tool_args(tool: BaseTool, candidate_id: str, application_id: str | None) -> dict | None:
+    """Arguments for ``tool`` from the ids we have; None if a required one is missing."""
+    args: dict[str, str] = {}
+    candidate_arg = _arg_name(tool, "candidateId", "candidate_id")
+    if candidate_arg and candidate_id:
+        args[candidate_arg] = candidate_id
+    application_arg = _arg_name(tool, "applicationId", "application_id")
+    if application_arg and application_id:
+        args[application_arg] = application_id
+    return args if _required_args(tool) <= args.keys() else None
+
+
+def build_fast_path_node(
+    *,
+    tools: list[BaseTool],
+    workflow_states_json: str,
+    fallback: Callable[[RunnableConfig], str],
+    blob_store: BlobStore | None,
+    min_blob_bytes: int,
+):
+    """Return the ``fast_path`` node; ``fallback(config)`` names the normal entry node."""
+    by_name = {t.name: t for t in tools}
+    labels = workflow_labels(workflow_states_json)
+    logger.info("fast_path_ready", workflow_labels=len(labels), tools=sorted(
+        name for name in (STATUS_TOOL_NAME, EVENTS_TOOL_NAME) if name in by_name
+    ))
+
+    def fall_back(config: RunnableConfig, reason: str, intent: Intent | None = None) -> Command:
+        if intent is not None:
+            fast_path_stats.fallbacks[reason] += 1
+            logger.info("fast_path_fallback", intent=intent.name, reason=reason)
+        return Command(goto=fallback(config))
+
+    async def fast_path(state: dict, config: RunnableConfig) -> Command:
+        if state.get("response_format") == "json":
+            return fall_back(config, "json_mode")
+        question = state["messages"][-1] if state.get("messages") else None
+        if not isinstance(question, HumanMessage) or not isinstance(question.content, str):
+            return fall_back(config, "not_text")
+        intent = classify(question.content)
+        if intent is None:
+            return fall_back(config, "no_match")
+
+        application_id = intent.application_id or state.get("application_id") or None
+        if intent.name == "application_status" and not application_id:
+            return fall_back(config, "no_application_id", intent)
+        tool = by_name.get(STATUS_TOOL_NAME if intent.name == "application_status" else EVENTS_TOOL_NAME)
+        if tool is None:
+            return fall_back(config, "tool_unavailable", intent)
+        args = _tool_args(tool, state.get("candidate_id", ""), application_id)
+        if args is None:
+            return fall_back(config, "missing_tool_args", intent)
+
+        call_id = f"call_fast_{uuid4().hex[:12]}"
+        started = time.perf_counter()
+        try:
+            result: ToolMessage = await tool.ainvoke(
+                {"type": "tool_call", "name": tool.name, "args": args, "id": call_id}, config
+            )
+            payload = json.loads(tool_text(result.content))
+        except Exception as exc:  # tool or payload problem — the full graph copes
+            logger.warning("fast_path_tool_failed", tool=tool.name, error=str(exc))
+            return fall_back(config, "tool_error", intent)
+        if result.status == "error":
+            return fall_back(config, "tool_error", intent)
+        result.response_metadata[DURATION_KEY] = round((time.perf_counter() - started) * 1000, 1)
+
+        if intent.name == "application_status":
+            answer = render_status(payload, application_id, labels)  # type: ignore[arg-type]
+        else:
+            answer = render_next_interview(payload, labels, now=datetime.now().astimezone())
+        if answer is None:
+            return fall_back(config, "unexpected_payload", intent)
+
+        if blob_store is not None:
+            result = offload_tool_message(result, blob_store, min_blob_bytes)
+        fast_path_stats.answered[intent.name] += 1
+        logger.info("fast_path_answered", intent=intent.name, tool=tool.name)
+        call = AIMessage(
+            content="",
+            name=FAST_PATH_AGENT,
+            tool_calls=[{"name": tool.name, "args": args, "id": call_id}],
+        )
+        return Command(
+            goto=END,
+            update={
+                "messages": [call, result, AIMessage(content=answer, name=FAST_PATH_AGENT)],
+                "active_agent": FAST_PATH_AGENT,
+            },
+        )
+
+    return fast_path
@@ -6,33 +6,64 @@ v1 graph  (build_graph):
 
 v2 graph  (build_v2_graph):
     START → [v2_primary_assistant] ──(handoff)──► [post_apply_assistant] → END
+                    │                                       ▲
+                    │      (multi-application query)        │ (< 2 applications)
+                    ├──(handoff)──► [application_fan_out] ──┘
+                    │                      │ Send × N
+                    │               [application_sub_run] → [synthesize_applications] → END
                     └─────────────────────────────────────────────────────► END
 
 Routing (v1):
   • candidate_primary answers directly for profile, assessment, job, and schema queries.
   • For application / journey / next-steps queries it calls transfer_to_job_application_agent
-    (Command with graph=Command.PARENT) to route in the parent StateGraph.
+    (Command with graph=Command.PARENT) to route in the parent StateGraph. Tool results
+    the primary already fetched this turn travel with the handoff in ``tool_context``
+    so job_application_agent does not fetch them again (see agents/tool_context.py).
 
 Routing (v2):
   • v2_primary_assistant is a thin router — it calls transfer_to_post_apply_assistant
     for all candidate domain queries and may answer trivial meta-questions directly.
   • post_apply_assistant runs with 12 tools covering profile, application, job, and
-    assessment domains. It is the only node that calls candidate-mcp tools in v2.
+    assessment domains.
+  • Questions about all of the candidate's applications are handed to
+    application_fan_out instead (see agents/fanout.py), which runs one scoped
+    post_apply sub-run per application in parallel and synthesizes the answer.
+
+Tool results:
+  Large ToolMessage payloads are offloaded to a content-addressed BlobStore by the
+  ToolNode wrapper and resolved back into full text only when each prompt is built,
+  so checkpoints carry a short reference instead of many KB per tool call.
+  Every ToolMessage also carries its wall-clock ``duration_ms`` in response_metadata.
+  post_apply_assistant calls are shared across a batch when the run config carries
+  a ``tool_cache`` (agents/tool_cache.py).
+
+Step budget:
+  Each tool-using agent has a per-turn tool-call budget (see agents/budget.py);
+  once it is spent, or the agent keeps repeating an identical call, the next LLM
+  call is made with tool_choice "none" and the agent answers from what it has.
 
 Production note:
   Replace MemorySaver with AsyncRedisSaver (langgraph-checkpoint-redis) for
   distributed deployments with multiple workers/pods.
 """
 
+from typing import Annotated
+
 import structlog
-from langchain_core.messages import SystemMessage
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import END, START, StateGraph
-from langgraph.prebuilt import create_react_agent
+from langgraph.prebuilt import InjectedState, ToolNode, create_react_agent
 from langgraph.types import Command
 
-from candidate_agent.agents.llm import build_llm
+from candidate_agent.agents.blob_store import BlobStore, offload_large_results, resolve_messages
+from candidate_agent.agents.fanout import LIST_TOOL_NAME, build_fanout_nodes, is_multi_application_query
+from candidate_agent.agents.fast_path import build_fast_path_node
+from candidate_agent.agents.budget import budget_model, enforce_budget
+from candidate_agent.agents.llm import build_llm, no_tool_choice
+from candidate_agent.agents.speculation import build_speculative_router_node
 from candidate_agent.agents.prompts import (
     build_job_app_prompt,
     build_post_apply_prompt,
@@ -40,6 +71,14 @@ from candidate_agent.agents.prompts import (
     build_v2_primary_prompt,
 )
 from candidate_agent.agents.state import CandidateAgentState, PostApplyAgentState
+from candidate_agent.agents.structured import ANSWER_TOOL_NAME, submit_structured_answer
+from candidate_agent.agents.tool_cache import shared_tool_cache
+from candidate_agent.agents.tool_context import (
+    collect_turn_tool_results,
+    render_tool_context,
+    reuse_tool_context,
+)
+from candidate_agent.agents.tool_timing import record_tool_timing
 from candidate_agent.config import Settings
 from candidate_agent.mcp.client import MCPToolRegistry
 
@@ -81,12 +120,73 @@ def _build_context_block(
     )
 
 
-def build_graph(registry: MCPToolRegistry, settings: Settings):
+def _chain_tool_wrappers(wrappers: list):
+    """Compose ToolNode ``awrap_tool_call`` hooks; the first wrapper is outermost."""
+
+    async def chained(request, execute):
+        async def call(index: int, req):
+            if index == len(wrappers):
+                return await execute(req)
+            return await wrappers[index](req, lambda r: call(index + 1, r))
+
+        return await call(0, request)
+
+    return chained
+
+
+def _tool_node(
+    tools: list,
+    settings: Settings,
+    blob_store: BlobStore | None,
+    wrappers: tuple = (),
+):
+    """Return a ToolNode running ``tools`` through the given wrappers.
+
+    Timing is always the outermost wrapper (so reused results report their real,
+    near-zero cost); large-result offloading is the innermost when a blob store is set.
+    The JSON-mode answer tool is always included (agents/structured.py).
+    """
+    chain = [record_tool_timing(), *wrappers]
+    if blob_store is not None:
+        chain.append(offload_large_results(blob_store, settings.tool_blob_min_bytes))
+    return ToolNode([*tools, submit_structured_answer], awrap_tool_call=_chain_tool_wrappers(chain))
+
+
+def _node_budget(settings: Settings, agent: str) -> int:
+    return settings.agent_tool_call_budgets.get(agent, settings.agent_tool_call_budget)
+
+
+def _budgeted_model(llm, tools: list, settings: Settings, agent: str, exempt: frozenset[str] = frozenset()):
+    """Dynamic model for ``agent`` that forces a final answer once its tool budget is spent."""
+    return budget_model(
+        llm,
+        tools,
+        agent=agent,
+        budget=_node_budget(settings, agent),
+        max_repeats=settings.agent_max_repeated_tool_calls,
+        no_tool_choice=no_tool_choice(settings),
+        structured_max_tokens=settings.structured_max_tokens,
+        exempt=exempt | {ANSWER_TOOL_NAME},
+    )
+
+
+def _budget_wrapper(settings: Settings, agent: str, exempt: frozenset[str] = frozenset()):
+    return enforce_budget(
+        agent=agent, budget=_node_budget(settings, agent), exempt=exempt | {ANSWER_TOOL_NAME}
+    )
+
+
+def build_graph(
+    registry: MCPToolRegistry,
+    settings: Settings,
+    blob_store: BlobStore | None = None,
+):
     """Compile the multi-agent StateGraph.
 
     Args:
-        registry: Pre-loaded MCP tool registry (all_tools + app_tools).
-        settings:  Application settings (LLM model, temperature, API key).
+        registry:   Pre-loaded MCP tool registry (all_tools + app_tools).
+        settings:   Application settings (LLM model, temperature, API key).
+        blob_store: Optional store for large tool results (None keeps them inline).
 
     Returns:
         A compiled LangGraph CompiledStateGraph ready to invoke.
@@ -97,7 +197,10 @@ def build_graph(registry: MCPToolRegistry, settings: Settings):
     # Returning Command with graph=Command.PARENT exits the react-agent subgraph
     # and routes in the parent StateGraph (our custom CandidateAgentState graph).
     @tool
-    def transfer_to_job_application_agent(reason: str) -> Command:  # type: ignore[return]
+    def transfer_to_job_application_agent(  # type: ignore[return]
+        reason: str,
+        state: Annotated[dict, InjectedState],
+    ) -> Command:
         """Transfer to the Job Application Status specialist agent.
 
         Use this when the user asks about:
@@ -110,10 +213,21 @@ def build_graph(registry: MCPToolRegistry, settings: Settings):
         Args:
             reason: Brief description of why you are transferring to this agent.
         """
-        logger.info("handoff_to_job_application_agent", reason=reason)
+        # The PARENT command drops the primary's own messages, so hand this turn's
+        # tool results over explicitly — the sub-agent reuses them instead of refetching.
+        tool_context = collect_turn_tool_results(
+            state["messages"],
+            exclude={"transfer_to_job_application_agent"},
+            turn_id=state.get("turn_id"),
+        )
+        logger.info(
+            "handoff_to_job_application_agent",
+            reason=reason,
+            carried_tool_results=len(tool_context),
+        )
         return Command(
             goto="job_application_agent",
-            update={"active_agent": "job_application_agent"},
+            update={"active_agent": "job_application_agent", "tool_context": tool_context},
             graph=Command.PARENT,
         )
 
@@ -131,21 +245,45 @@ def build_graph(registry: MCPToolRegistry, settings: Settings):
         job_app_enriched=bool(registry.workflow_states_json),
     )
 
+    # Callable prompts resolve out-of-band tool results before each LLM call
+    def primary_prompt_fn(state: CandidateAgentState):
+        return [SystemMessage(content=primary_prompt)] + resolve_messages(
+            state["messages"], blob_store
+        )
+
+    def job_app_prompt_fn(state: CandidateAgentState):
+        extra = render_tool_context(state.get("tool_context") or {}, blob_store)
+        return [SystemMessage(content=job_app_prompt + extra)] + resolve_messages(
+            state["messages"], blob_store
+        )
+
     # ── Job Application sub-agent ────────────────────────────────────────────
     job_app_agent = create_react_agent(
-        model=llm,
-        tools=registry.app_tools,
-        prompt=job_app_prompt,
+        model=_budgeted_model(llm, registry.app_tools, settings, "job_application_agent"),
+        tools=_tool_node(
+            registry.app_tools,
+            settings,
+            blob_store,
+            wrappers=(_budget_wrapper(settings, "job_application_agent"), reuse_tool_context()),
+        ),
+        prompt=job_app_prompt_fn,
         state_schema=CandidateAgentState,
         name="job_application_agent",
     )
 
     # ── Candidate Primary agent ──────────────────────────────────────────────
     # Has all tools plus the handoff tool.
+    primary_tools = [*registry.all_tools, transfer_to_job_application_agent]
+    handoff_exempt = frozenset({"transfer_to_job_application_agent"})
     primary_agent = create_react_agent(
-        model=llm,
-        tools=[*registry.all_tools, transfer_to_job_application_agent],
-        prompt=primary_prompt,
+        model=_budgeted_model(llm, primary_tools, settings, "candidate_primary", handoff_exempt),
+        tools=_tool_node(
+            primary_tools,
+            settings,
+            blob_store,
+            wrappers=(_budget_wrapper(settings, "candidate_primary", handoff_exempt),),
+        ),
+        prompt=primary_prompt_fn,
         state_schema=CandidateAgentState,
         name="candidate_primary",
     )
@@ -173,25 +311,59 @@ def build_graph(registry: MCPToolRegistry, settings: Settings):
     return graph
 
 
-def build_v2_graph(registry: MCPToolRegistry, settings: Settings):
+def build_v2_graph(
+    registry: MCPToolRegistry,
+    settings: Settings,
+    blob_store: BlobStore | None = None,
+):
     """Compile the v2 multi-agent StateGraph.
 
-    The v2 graph contains two nodes:
+    The v2 graph contains two core nodes:
     - v2_primary_assistant: thin router with only the handoff tool.
     - post_apply_assistant: specialist with 12 candidate-domain tools.
 
+    Optional nodes: the multi-application fan-out (V2_FANOUT_ENABLED),
+    v2_speculative_router (V2_SPECULATIVE_SPECIALIST), which runs router and
+    specialist concurrently for runs with ``configurable.speculative`` set, and
+    fast_path (V2_FAST_PATH_ENABLED), which answers single-tool questions from a
+    template before either of them runs.
+
     Args:
-        registry: Pre-loaded MCP tool registry (post_apply_tools populated).
-        settings:  Application settings (LLM model, temperature, API key).
+        registry:   Pre-loaded MCP tool registry (post_apply_tools populated).
+        settings:   Application settings (LLM model, temperature, API key).
+        blob_store: Optional store for large tool results (None keeps them inline).
 
     Returns:
         A compiled LangGraph CompiledStateGraph ready to invoke.
     """
     llm = build_llm(settings)
 
+    list_tool = next((t for t in registry.post_apply_tools if t.name == LIST_TOOL_NAME), None)
+    fanout_enabled = settings.v2_fanout_enabled and list_tool is not None
+
+    def handoff_target(state: dict) -> str:
+        """Node a handoff goes to — the fan-out path for all-applications questions.
+
+        JSON-mode turns skip the fan-out, whose synthesis step writes prose.
+        """
+        if (
+            fanout_enabled
+            and not state.get("application_id")
+            and state.get("response_format") != "json"
+        ):
+            question = next(
+                (m.content for m in reversed(state["messages"]) if isinstance(m, HumanMessage)), ""
+            )
+            if isinstance(question, str) and is_multi_application_query(question):
+                return "application_fan_out"
+        return "post_apply_assistant"
+
     # ── Handoff tool ─────────────────────────────────────────────────────────
     @tool
-    def transfer_to_post_apply_assistant(reason: str) -> Command:  # type: ignore[return]
+    def transfer_to_post_apply_assistant(  # type: ignore[return]
+        reason: str,
+        state: Annotated[dict, InjectedState],
+    ) -> Command:
         """Transfer to the Post-Apply Assistant specialist.
 
         Use this for ANY query about:
@@ -205,9 +377,10 @@ def build_v2_graph(registry: MCPToolRegistry, settings: Settings):
         Args:
             reason: Brief description of why you are transferring.
         """
-        logger.info("handoff_to_post_apply_assistant", reason=reason)
+        goto = handoff_target(state)
+        logger.info("handoff_to_post_apply_assistant", reason=reason, goto=goto)
         return Command(
-            goto="post_apply_assistant",
+            goto=goto,
             update={"active_agent": "post_apply_assistant"},
             graph=Command.PARENT,
         )
@@ -248,7 +421,9 @@ def build_v2_graph(registry: MCPToolRegistry, settings: Settings):
                 "all applications for this candidate."
             ),
         )
-        return [SystemMessage(content=v2_primary_base + extra)] + state["messages"]
+        return [SystemMessage(content=v2_primary_base + extra)] + resolve_messages(
+            state["messages"], blob_store
+        )
 
     def post_apply_prompt(state: PostApplyAgentState):
         extra = _build_context_block(
@@ -264,12 +439,19 @@ def build_v2_graph(registry: MCPToolRegistry, settings: Settings):
                 "application ID."
             ),
         )
-        return [SystemMessage(content=post_apply_base + extra)] + state["messages"]
+        return [SystemMessage(content=post_apply_base + extra)] + resolve_messages(
+            state["messages"], blob_store
+        )
 
     # ── post_apply_assistant (specialist, 12 tools) ──────────────────────────
     post_apply_agent = create_react_agent(
-        model=llm,
-        tools=registry.post_apply_tools,
+        model=_budgeted_model(llm, registry.post_apply_tools, settings, "post_apply_assistant"),
+        tools=_tool_node(
+            registry.post_apply_tools,
+            settings,
+            blob_store,
+            wrappers=(_budget_wrapper(settings, "post_apply_assistant"), shared_tool_cache()),
+        ),
         prompt=post_apply_prompt,
         state_schema=PostApplyAgentState,
         name="post_apply_assistant",
@@ -289,7 +471,88 @@ def build_v2_graph(registry: MCPToolRegistry, settings: Settings):
     builder.add_node("v2_primary_assistant", v2_primary_agent)
     builder.add_node("post_apply_assistant", post_apply_agent)
 
-    builder.add_edge(START, "v2_primary_assistant")
+    if fanout_enabled:
+        fan_out, sub_run, synthesize = build_fanout_nodes(
+            list_tool=list_tool,
+            post_apply_agent=post_apply_agent,
+            llm=llm,
+            persona_prompt=post_apply_base,
+            blob_store=blob_store,
+            min_blob_bytes=settings.tool_blob_min_bytes,
+            max_concurrency=settings.v2_fanout_max_concurrency,
+            max_applications=settings.v2_fanout_max_applications,
+        )
+        builder.add_node(
+            "application_fan_out",
+            fan_out,
+            destinations=("application_sub_run", "post_apply_assistant"),
+        )
+        builder.add_node("application_sub_run", sub_run)
+        builder.add_node("synthesize_applications", synthesize)
+        builder.add_edge("application_sub_run", "synthesize_applications")
+        builder.add_edge("synthesize_applications", END)
+
+    if settings.v2_speculative_specialist:
+        # Same router prompt, but the handoff ends the ReAct loop instead of routing,
+        # so v2_speculative_router can read the decision from the router's output.
+        @tool(
+            "transfer_to_post_apply_assistant",
+            description=transfer_to_post_apply_assistant.description,
+            return_direct=True,
+        )
+        def speculative_transfer(reason: str) -> str:
+            logger.info("handoff_to_post_apply_assistant", reason=reason, speculative=True)
+            return "Transferred to post_apply_assistant."
+
+        speculative_router_agent = create_react_agent(
+            model=llm,
+            tools=[speculative_transfer],
+            prompt=v2_primary_prompt,
+            state_schema=PostApplyAgentState,
+            name="v2_primary_assistant",
+        )
+        builder.add_node(
+            "v2_speculative_router",
+            build_speculative_router_node(
+                router_agent=speculative_router_agent,
+                specialist_agent=post_apply_agent,
+                handoff_tool_name=speculative_transfer.name,
+                handoff_target=handoff_target,
+                max_tokens=settings.v2_speculative_max_tokens,
+            ),
+            destinations=("post_apply_assistant", "application_fan_out") if fanout_enabled
+            else ("post_apply_assistant",),
+        )
+        builder.add_edge("v2_speculative_router", END)
+
+    entry_nodes = ["v2_primary_assistant"]
+    if settings.v2_speculative_specialist:
+        entry_nodes.append("v2_speculative_router")
+
+    def entry(config: RunnableConfig) -> str:
+        speculative = config.get("configurable", {}).get("speculative", False)
+        if speculative and settings.v2_speculative_specialist:
+            return "v2_speculative_router"
+        return "v2_primary_assistant"
+
+    if settings.v2_fast_path_enabled:
+        # Templated answers for single-tool questions; everything else goes to entry().
+        builder.add_node(
+            "fast_path",
+            build_fast_path_node(
+                tools=registry.post_apply_tools,
+                workflow_states_json=registry.workflow_states_json,
+                fallback=entry,
+                blob_store=blob_store,
+                min_blob_bytes=settings.tool_blob_min_bytes,
+            ),
+            destinations=(END, *entry_nodes),
+        )
+        builder.add_edge(START, "fast_path")
+    elif settings.v2_speculative_specialist:
+        builder.add_conditional_edges(START, lambda state, config: entry(config), entry_nodes)
+    else:
+        builder.add_edge(START, "v2_primary_assistant")
     # Primary edges to END when it answers trivial meta-questions directly.
     builder.add_edge("v2_primary_assistant", END)
     # post_apply_assistant edges to END after completing its candidate-facing response.
@@ -302,5 +565,8 @@ def build_v2_graph(registry: MCPToolRegistry, settings: Settings):
         "graph_compiled",
         version="v2",
         post_apply_tools=len(registry.post_apply_tools),
+        fanout_enabled=fanout_enabled,
+        speculative=settings.v2_speculative_specialist,
+        fast_path=settings.v2_fast_path_enabled,
     )
     return v2_graph
@@ -32,3 +32,8 @@ def build_llm(settings: Settings) -> BaseChatModel:
         temperature=settings.llm_temperature,
         api_key=settings.anthropic_api_key.get_secret_value(),  # type: ignore[union-attr]
     )
+
+
+def no_tool_choice(settings: Settings) -> str | dict:
+    """``tool_choice`` value that forbids tool calls for the configured provider."""
+    return "none" if settings.local_llm else {"type": "none"}
@@ -0,0 +1,217 @@
+"""Speculative specialist execution for the v2 graph (opt-in).
+
+Normally every domain question waits for a full v2_primary_assistant LLM call
+before post_apply_assistant starts. In speculative mode the
+``v2_speculative_router`` node starts both at once:
+
+  • router hands off           → the speculative specialist result is kept
+  • router answers directly    → the speculative run is cancelled (tokens wasted)
+  • specialist exceeds budget  → it is cancelled and, if the router hands off,
+                                 post_apply_assistant runs normally afterwards
+
+The router copy used here has a ``return_direct`` handoff tool instead of the
+Command.PARENT one, so its decision is read from its output messages rather
+than from graph routing.
+
+The budget is checked while the specialist generates, not only after each LLM
+call: the speculative specialist runs with its LLM streaming, and streamed
+output is counted (estimated at ~4 characters per token) until the call's
+exact usage arrives. A single long generation is therefore cut off once it
+passes V2_SPECULATIVE_MAX_TOKENS.
+
+Speculative mode is selected per run with ``configurable.speculative`` (the v2
+``/invoke`` route sets it from V2_SPECULATIVE_SPECIALIST). Streaming routes keep
+the sequential path so clients never see tokens from a run that gets cancelled.
+Counters are served at ``/api/runs/speculation`` and on ``/metrics``.
+"""
+
+import asyncio
+from dataclasses import asdict, dataclass
+from typing import Any, Callable
+from uuid import UUID
+
+import structlog
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables import RunnableConfig
+from langgraph.types import Command
+
+from candidate_agent.agents.usage import TokenCounter, with_handler
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class SpeculationStats:
+    """Process-wide counters for speculative runs (waste metrics)."""
+
+    started: int = 0
+    kept: int = 0
+    cancelled: int = 0        # router answered directly or routed to fan-out
+    budget_aborted: int = 0   # specialist exceeded V2_SPECULATIVE_MAX_TOKENS
+    failed: int = 0
+    kept_tokens: int = 0
+    wasted_tokens: int = 0
+
+    def snapshot(self) -> dict[str, int]:
+        return asdict(self)
+
+
+speculation_stats = SpeculationStats()
+
+
+CHARS_PER_TOKEN = 4  # estimate for streamed output whose usage is not reported yet
+
+
+class TokenBudget(TokenCounter):
+    """Token counter that flags when ``max_tokens`` is exceeded, mid-generation included."""
+
+    def __init__(self, max_tokens: int) -> None:
+        super().__init__()
+        self.max_tokens = max_tokens
+        self.exceeded = asyncio.Event()
+        self._streaming: dict[UUID, int] = {}  # run_id → estimated tokens streamed so far
+
+    @property
+    def spent(self) -> int:
+        """Exact usage of finished calls plus the estimate for calls still streaming."""
+        return self.tokens + sum(self._streaming.values())
+
+    def _check(self) -> None:
+        if self.spent > self.max_tokens:
+            self.exceeded.set()
+
+    async def on_llm_new_token(
+        self, token: str, *, chunk: Any = None, run_id: UUID, **kwargs: Any
+    ) -> None:
+        text = token
+        for call in getattr(getattr(chunk, "message", None), "tool_call_chunks", None) or []:
+            text += call.get("args") or ""
+        estimate = -(-len(text) // CHARS_PER_TOKEN)
+        self._streaming[run_id] = self._streaming.get(run_id, 0) + estimate
+        self._check()
+
+    async def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        await super().on_llm_error(error, run_id=run_id, **kwargs)
+        self._streaming.pop(run_id, None)
+
+    async def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        self._streaming.pop(run_id, None)
+        await super().on_llm_end(response, run_id=run_id, **kwargs)
+        self._check()
+
+
+async def _invoke_streaming(agent, state: dict, config: RunnableConfig) -> dict:
+    """``agent.ainvoke`` with its LLM calls streamed, so ``TokenBudget`` sees tokens as they arrive."""
+    final: dict = {}
+    async for mode, payload in agent.astream(state, config, stream_mode=["messages", "values"]):
+        if mode == "values":
+            final = payload
+    return final
+
+
+async def _cancel(task: asyncio.Task | None) -> None:
+    if task is None or task.done():
+        return
+    task.cancel()
+    try:
+        await task
+    except (asyncio.CancelledError, Exception):
+        pass
+
+
+def build_speculative_router_node(
+    *,
+    router_agent,
+    specialist_agent,
+    handoff_tool_name: str,
+    handoff_target: Callable[[dict], str],
+    max_tokens: int,
+):
+    """Return the ``v2_speculative_router`` node callable.
+
+    Args:
+        router_agent:      v2 router ReAct agent whose handoff tool is ``return_direct``.
+        specialist_agent:  post_apply_assistant ReAct agent.
+        handoff_tool_name: Name of the router's handoff tool.
+        handoff_target:    Maps state to the node a handoff goes to (post_apply or fan-out).
+        max_tokens:        Max tokens the speculative specialist may spend before the
+                           router has decided.
+    """
+
+    async def v2_speculative_router(state: dict, config: RunnableConfig):
+        n_input = len(state["messages"])
+        budget = TokenBudget(max_tokens)
+        speculation_stats.started += 1
+
+        router_task = asyncio.create_task(router_agent.ainvoke(state, config))
+        spec_task: asyncio.Task | None = asyncio.create_task(
+            _invoke_streaming(
+                specialist_agent,
+                {**state, "active_agent": "post_apply_assistant"},
+                with_handler(config, budget),
+            )
+        )
+        budget_task = asyncio.create_task(budget.exceeded.wait())
+
+        try:
+            await asyncio.wait({router_task, budget_task}, return_when=asyncio.FIRST_COMPLETED)
+            if not router_task.done():
+                # Specialist blew its budget before the router decided — stop paying for it
+                await _cancel(spec_task)
+                spec_task = None
+                speculation_stats.budget_aborted += 1
+                speculation_stats.wasted_tokens += budget.spent
+                logger.info("speculation_budget_exceeded", tokens=budget.spent, max_tokens=max_tokens)
+            router_out = await router_task
+        except BaseException:
+            await _cancel(spec_task)
+            raise
+        finally:
+            budget_task.cancel()
+
+        router_messages = router_out["messages"][n_input:]
+        handed_off = any(
+            tc["name"] == handoff_tool_name
+            for m in router_messages
+            if isinstance(m, AIMessage)
+            for tc in m.tool_calls
+        )
+
+        if not handed_off:
+            await _cancel(spec_task)
+            if spec_task is not None:
+                speculation_stats.cancelled += 1
+                speculation_stats.wasted_tokens += budget.spent
+            logger.info("speculation_discarded", reason="router_answered", wasted_tokens=budget.spent)
+            return {"messages": router_messages, "active_agent": "v2_primary_assistant"}
+
+        goto = handoff_target(state)
+        handoff_update = {"messages": router_messages, "active_agent": "post_apply_assistant"}
+        if goto != "post_apply_assistant":
+            await _cancel(spec_task)
+            if spec_task is not None:
+                speculation_stats.cancelled += 1
+                speculation_stats.wasted_tokens += budget.spent
+            logger.info("speculation_discarded", reason=goto, wasted_tokens=budget.spent)
+            return Command(goto=goto, update=handoff_update)
+
+        if spec_task is None:
+            return Command(goto="post_apply_assistant", update=handoff_update)
+
+        try:
+            spec_out = await spec_task
+        except Exception as exc:
+            speculation_stats.failed += 1
+            logger.warning("speculation_failed", error=str(exc))
+            return Command(goto="post_apply_assistant", update=handoff_update)
+
+        speculation_stats.kept += 1
+        speculation_stats.kept_tokens += budget.spent
+        logger.info("speculation_kept", tokens=budget.spent)
+        return {
+            "messages": router_messages + spec_out["messages"][n_input:],
+            "active_agent": "post_apply_assistant",
+        }
+
+    return v2_speculative_router
@@ -1,9 +1,12 @@
-from typing import Annotated
+from typing import Annotated, Sequence
 
+from langchain_core.messages import AnyMessage, HumanMessage
 from langgraph.graph import MessagesState
 from langgraph.managed.is_last_step import RemainingStepsManager
 from typing_extensions import NotRequired
 
+from candidate_agent.agents.fanout import merge_summaries
+
 
 class CandidateAgentState(MessagesState):
     """Shared state for the v1 multi-agent graph (primary + job_application_agent).
@@ -19,7 +22,13 @@ class CandidateAgentState(MessagesState):
     candidate_id: str   # The candidate this session is acting on behalf of
     correlation_id: str  # Trace ID propagated from the HTTP request
     active_agent: str   # Last agent to produce output ("candidate_primary" | "job_application_agent")
+    turn_id: NotRequired[str]  # Id of this turn's HumanMessage — bounds per-turn result extraction
+    tool_call_budget: NotRequired[int]  # Per-request cap on tool calls per agent this turn (0 = node default)
+    response_format: NotRequired[str]  # "text" (narrative) | "json" (agents/structured.py)
     remaining_steps: NotRequired[Annotated[int, RemainingStepsManager]]
+    # Tool results fetched by candidate_primary this turn, carried across the handoff
+    # (keyed by tool name + canonical args; reset at the start of every turn)
+    tool_context: NotRequired[dict[str, dict]]
 
 
 class PostApplyAgentState(MessagesState):
@@ -33,4 +42,25 @@ class PostApplyAgentState(MessagesState):
     application_id: str  # Optional: specific application the query is about
     correlation_id: str  # Trace ID propagated from the HTTP request
     active_agent: str    # Last agent to produce output ("v2_primary_assistant" | "post_apply_assistant")
+    turn_id: NotRequired[str]  # Id of this turn's HumanMessage — bounds per-turn result extraction
+    tool_call_budget: NotRequired[int]  # Per-request cap on tool calls per agent this turn (0 = node default)
+    response_format: NotRequired[str]  # "text" (narrative) | "json" (agents/structured.py)
     remaining_steps: NotRequired[Annotated[int, RemainingStepsManager]]
+    # Per-application findings collected by the fan-out path (reset on each fan-out)
+    application_summaries: NotRequired[Annotated[list[dict], merge_summaries]]
+
+
+def current_turn(messages: Sequence[AnyMessage], turn_id: str | None = None) -> list[AnyMessage]:
+    """Messages after the HumanMessage that opened the current turn, oldest first.
+
+    The turn starts at the message whose id is ``turn_id`` (set by the routes) or,
+    without one, at the last HumanMessage. Scanning stops there, so the cost is
+    proportional to the turn, not the thread.
+    """
+    turn: list[AnyMessage] = []
+    for msg in reversed(messages):
+        if (msg.id == turn_id) if turn_id else isinstance(msg, HumanMessage):
+            break
+        turn.append(msg)
+    turn.reverse()
+    return turn
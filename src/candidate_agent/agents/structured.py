@@ -0,0 +1,61 @@
+"""Structured JSON answers for machine consumers (``response_format="json"``).
+
+The prompts ask for empathetic narrative prose. Ops chatbots and developer
+tools only need the facts, and generating the prose is the slowest part of their
+calls. In JSON mode a specialist does not write a final message at all. It
+ends the turn by calling ``submit_structured_answer``, whose arguments are the
+``StructuredAnswer`` schema:
+
+  • the tool is ``return_direct``, so the ReAct loop ends as soon as it runs;
+  • the model is bound with tool_choice "any", so every step is a tool call and
+    no prose is generated. Once the step budget is spent, tool_choice names the
+    answer tool;
+  • every call is capped at STRUCTURED_MAX_TOKENS output tokens.
+
+The mode travels in graph state (``response_format``), like the request's
+tool budget, so one compiled graph serves both modes. api/turns.py reads the
+answer back from the tool call's arguments.
+"""
+
+from langchain_core.messages import AnyMessage, SystemMessage
+from langchain_core.tools import tool
+from pydantic import BaseModel, Field
+
+ANSWER_TOOL_NAME = "submit_structured_answer"
+
+STRUCTURED_INSTRUCTION = (
+    "\n\n## Response Format: JSON\n"
+    "This request comes from a program, not a person. Do not write prose, greetings or "
+    "explanations. Call data tools as needed. When you have the data, call "
+    f"{ANSWER_TOOL_NAME} once, on its own, with the facts. Answer in at most two "
+    "sentences. Put each data point in `facts` and use the exact values the tools returned."
+)
+
+
+class Fact(BaseModel):
+    name: str = Field(..., description="What the value is, e.g. 'application_status'")
+    value: str = Field(..., description="The value as returned by the tool")
+
+
+class StructuredAnswer(BaseModel):
+    answer: str = Field(..., description="Direct answer in at most two sentences")
+    facts: list[Fact] = Field(default_factory=list, description="Data points behind the answer")
+    next_steps: list[str] = Field(default_factory=list, description="Actions the candidate can take")
+    missing: list[str] = Field(
+        default_factory=list,
+        description="Information that was asked for but could not be retrieved",
+    )
+
+
+@tool(ANSWER_TOOL_NAME, args_schema=StructuredAnswer, return_direct=True)
+def submit_structured_answer(**answer) -> str:
+    """Submit the final answer to the request as structured data. Ends the turn."""
+    return StructuredAnswer.model_validate(answer).model_dump_json()
+
+
+def with_structured_instruction(messages: list[AnyMessage]) -> list[AnyMessage]:
+    """Append the JSON-mode instruction to the leading system prompt."""
+    if messages and isinstance(messages[0], SystemMessage):
+        head = SystemMessage(content=f"{messages[0].text}{STRUCTURED_INSTRUCTION}")
+        return [head, *messages[1:]]
+    return [SystemMessage(content=STRUCTURED_INSTRUCTION.lstrip()), *messages]
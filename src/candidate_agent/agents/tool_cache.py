@@ -0,0 +1,77 @@
+"""Run-scoped shared tool-result cache.
+
+Batch runs (``POST /api/v2/agent/invoke/batch``) put one ``ToolResultCache`` in
+``configurable.tool_cache`` for every item. Identical calls across items, such
+as the same ``getJob`` for candidates who applied to one role, then hit
+candidate-mcp once. Concurrent identical calls share a single in-flight request.
+
+Runs without a cache in their config (all interactive traffic) are unaffected,
+so results are never shared between unrelated requests.
+"""
+
+import asyncio
+
+import structlog
+from langchain_core.messages import ToolMessage
+from langgraph.prebuilt.tool_node import ToolCallRequest
+
+from candidate_agent.agents.tool_context import tool_key
+
+logger = structlog.get_logger(__name__)
+
+
+class ToolResultCache:
+    """Single-flight map from ``tool_key`` to the first successful ToolMessage."""
+
+    def __init__(self) -> None:
+        self._entries: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get_or_call(self, key: str, call):
+        """Return the cached result for ``key``, or await ``call()`` and cache it if successful."""
+        future = self._entries.get(key)
+        if future is not None:
+            self.hits += 1
+            return await asyncio.shield(future)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._entries[key] = future
+        try:
+            result = await call()
+        except BaseException as exc:
+            del self._entries[key]
+            future.set_exception(exc)
+            future.exception()  # mark retrieved — waiters re-raise it themselves
+            raise
+        if isinstance(result, ToolMessage) and result.status == "error":
+            del self._entries[key]  # errors are not shared; the next caller retries
+        future.set_result(result)
+        return result
+
+
+def shared_tool_cache():
+    """ToolNode ``awrap_tool_call`` hook serving calls from ``configurable.tool_cache``."""
+
+    async def _wrapper(request: ToolCallRequest, execute):
+        config = getattr(request.runtime, "config", None) or {}
+        cache: ToolResultCache | None = config.get("configurable", {}).get("tool_cache")
+        if cache is None:
+            return await execute(request)
+
+        call = request.tool_call
+        result = await cache.get_or_call(
+            tool_key(call["name"], call["args"]), lambda: execute(request)
+        )
+        if not isinstance(result, ToolMessage) or result.tool_call_id == call["id"]:
+            return result
+        return ToolMessage(
+            content=result.content,
+            name=call["name"],
+            tool_call_id=call["id"],
+            status=result.status,
+            additional_kwargs=result.additional_kwargs,
+        )
+
+    return _wrapper
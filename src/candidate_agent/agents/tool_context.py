@@ -0,0 +1,108 @@
+"""Carry tool results fetched by candidate_primary across the v1 handoff.
+
+candidate_primary often calls getApplicationsByCandidate or getApplicationStatus
+before calling transfer_to_job_application_agent. The Command.PARENT handoff
+only carries its explicit ``update``, so those results never reach
+job_application_agent, which then fetches the same data again.
+
+The handoff now snapshots this turn's tool results into ``tool_context`` on
+CandidateAgentState. job_application_agent consults it in two places:
+  • its prompt lists the already-fetched results, so the LLM can skip the call;
+  • its ToolNode wrapper answers an identical call (same tool, same args) from
+    the context instead of calling candidate-mcp.
+"""
+
+import json
+from typing import Any
+
+import structlog
+from langchain_core.messages import AIMessage, AnyMessage, ToolMessage
+from langgraph.prebuilt.tool_node import ToolCallRequest
+
+from candidate_agent.agents.blob_store import BlobStore, resolve_message
+from candidate_agent.agents.state import current_turn
+
+logger = structlog.get_logger(__name__)
+
+
+def tool_key(name: str, args: dict[str, Any]) -> str:
+    """Canonical cache key for a tool call — tool name plus sorted JSON args."""
+    return f"{name}:{json.dumps(args, sort_keys=True, separators=(',', ':'))}"
+
+
+def collect_turn_tool_results(
+    messages: list[AnyMessage], exclude: set[str], turn_id: str | None = None
+) -> dict[str, dict]:
+    """Return this turn's completed tool results keyed by ``tool_key``.
+
+    Only messages of the current turn are considered; tools in ``exclude``
+    (the handoff tools themselves) are skipped.
+    """
+    turn = current_turn(messages, turn_id)
+
+    calls = {
+        tc["id"]: tc
+        for msg in turn
+        if isinstance(msg, AIMessage)
+        for tc in msg.tool_calls
+        if tc["name"] not in exclude
+    }
+    context: dict[str, dict] = {}
+    for msg in turn:
+        if isinstance(msg, ToolMessage) and msg.status != "error" and msg.tool_call_id in calls:
+            call = calls[msg.tool_call_id]
+            context[tool_key(call["name"], call["args"])] = {
+                "name": call["name"],
+                "args": call["args"],
+                "content": msg.content,
+                "additional_kwargs": msg.additional_kwargs,
+            }
+    return context
+
+
+def render_tool_context(context: dict[str, dict], store: BlobStore | None) -> str:
+    """Render the context as a system-prompt section (blob references resolved)."""
+    if not context:
+        return ""
+    parts = []
+    for entry in context.values():
+        msg = resolve_message(
+            ToolMessage(
+                content=entry["content"],
+                name=entry["name"],
+                tool_call_id="context",
+                additional_kwargs=entry["additional_kwargs"],
+            ),
+            store,
+        )
+        content = msg.content if isinstance(msg.content, str) else json.dumps(msg.content)
+        parts.append(f"### {entry['name']}({json.dumps(entry['args'], sort_keys=True)})\n{content}")
+    return (
+        "\n\n## Data Already Retrieved This Turn\n"
+        "The primary agent fetched these results before handing off. Use them directly — "
+        "do not call the same tool again with the same arguments.\n\n" + "\n\n".join(parts)
+    )
+
+
+def reuse_tool_context():
+    """ToolNode ``awrap_tool_call`` hook answering duplicate calls from ``tool_context``."""
+
+    async def _wrapper(request: ToolCallRequest, execute):
+        context = (request.state or {}).get("tool_context") or {}
+        call = request.tool_call
+        entry = context.get(tool_key(call["name"], call["args"]))
+        if entry is None:
+            return await execute(request)
+        logger.info(
+            "tool_result_reused",
+            tool=call["name"],
+            saved_bytes=len(json.dumps(entry["content"])),
+        )
+        return ToolMessage(
+            content=entry["content"],
+            name=call["name"],
+            tool_call_id=call["id"],
+            additional_kwargs=entry["additional_kwargs"],
+        )
+
+    return _wrapper
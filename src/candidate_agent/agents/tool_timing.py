@@ -0,0 +1,26 @@
+"""Per-call tool latency recording.
+
+The ToolNode wrapper stamps each ToolMessage with ``response_metadata["duration_ms"]``
+so per-turn accounting (api/turns.py) can report tool latencies straight from the
+turn's messages without separate bookkeeping.
+"""
+
+import time
+
+from langchain_core.messages import ToolMessage
+from langgraph.prebuilt.tool_node import ToolCallRequest
+
+DURATION_KEY = "duration_ms"
+
+
+def record_tool_timing():
+    """ToolNode ``awrap_tool_call`` hook recording wall-clock duration per tool call."""
+
+    async def _wrapper(request: ToolCallRequest, execute):
+        started = time.perf_counter()
+        result = await execute(request)
+        if isinstance(result, ToolMessage):
+            result.response_metadata[DURATION_KEY] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    return _wrapper
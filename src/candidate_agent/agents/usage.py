@@ -0,0 +1,60 @@
+"""LLM token and latency accounting via callbacks.
+
+``TokenCounter`` sums ``usage_metadata.total_tokens`` over every LLM call in
+the runs it is attached to, and records each call's wall-clock latency (used by
+the admission controller's adaptive limit). ``with_handler`` attaches a handler to a run config
+without disturbing callbacks already present, such as the Langfuse handler.
+"""
+
+import time
+from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import AsyncCallbackHandler, BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables import RunnableConfig
+
+
+class TokenCounter(AsyncCallbackHandler):
+    """Callback summing LLM token usage and timing LLM calls across a run."""
+
+    def __init__(self) -> None:
+        self.tokens = 0
+        self.llm_latencies_ms: list[float] = []
+        self._started: dict[UUID, float] = {}
+
+    async def on_chat_model_start(
+        self, serialized: Any, messages: Any, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._started[run_id] = time.monotonic()
+
+    async def on_llm_start(
+        self, serialized: Any, prompts: Any, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._started[run_id] = time.monotonic()
+
+    async def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started.pop(run_id, None)
+
+    async def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            self.llm_latencies_ms.append((time.monotonic() - started) * 1000)
+        for generations in response.generations:
+            for gen in generations:
+                usage = getattr(getattr(gen, "message", None), "usage_metadata", None)
+                if usage:
+                    self.tokens += usage.get("total_tokens", 0)
+
+
+def with_handler(config: RunnableConfig, handler: BaseCallbackHandler) -> RunnableConfig:
+    """Return ``config`` with ``handler`` added to its callbacks (list or manager)."""
+    callbacks = config.get("callbacks")
+    if callbacks is None:
+        callbacks = [handler]
+    elif isinstance(callbacks, list):
+        callbacks = [*callbacks, handler]
+    else:
+        callbacks = callbacks.copy()
+        callbacks.add_handler(handler, inherit=True)
+    return {**config, "callbacks": callbacks}
@@ -0,0 +1,254 @@
+"""Admission control and load shedding for graph runs.
+
+Without a limit, a traffic spike starts every run at once. They all compete
+for the LLM and MCP, all slow down together, and all time out. The
+``AdmissionController`` sits in front of every graph run (invoke, stream, batch
+items, queued runs):
+
+  • at most ``limit`` runs execute at once; the rest wait in a bounded queue
+    (ADMISSION_MAX_QUEUE) for up to ADMISSION_QUEUE_TIMEOUT_SECONDS;
+  • waiting runs are granted slots round-robin by ``candidate_id``, and one
+    candidate holds at most ADMISSION_PER_CANDIDATE_MAX slots, so a single
+    caller cannot take every slot;
+  • a full queue or an expired wait answers 429 with a Retry-After estimated
+    from recent run durations;
+  • ``limit`` adapts (AIMD) between ADMISSION_MIN_LIMIT and
+    ADMISSION_MAX_LIMIT. At most every ADMISSION_ADJUST_INTERVAL_SECONDS, an
+    LLM latency above ADMISSION_TARGET_LLM_LATENCY_MS cuts the limit by 10%.
+    Otherwise the limit grows by one if runs had to queue.
+
+An empty ``candidate_id`` (internal callers) is exempt from the per-candidate
+cap but still takes its turn in the round-robin. ``stats()`` reports queue
+length, wait percentiles, and shed counts.
+"""
+
+import asyncio
+import math
+import time
+from collections import Counter, OrderedDict, deque
+from contextlib import asynccontextmanager
+
+import structlog
+from fastapi import HTTPException
+
+from candidate_agent.agents.usage import TokenCounter
+from candidate_agent.api.stats import percentile
+
+logger = structlog.get_logger(__name__)
+
+# Wait-time samples kept for the percentile figures in stats()
+_WAIT_SAMPLES = 1024
+
+# Smoothing for the LLM-latency and run-duration moving averages
+_EWMA_ALPHA = 0.2
+
+_DECREASE_FACTOR = 0.9
+
+
+class AdmissionController:
+    """Concurrency limit with a fair, bounded wait queue and an adaptive limit."""
+
+    def __init__(
+        self,
+        *,
+        limit: int,
+        min_limit: int,
+        max_limit: int,
+        max_queue: int,
+        queue_timeout: float,
+        per_candidate: int,
+        target_llm_latency_ms: float,
+        adjust_interval: float,
+    ) -> None:
+        self.limit = limit
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._max_queue = max_queue
+        self._queue_timeout = queue_timeout
+        self._per_candidate = per_candidate
+        self._target_latency = target_llm_latency_ms
+        self._adjust_interval = adjust_interval
+
+        self.in_flight = 0
+        self.queued = 0
+        self._running: Counter[str] = Counter()  # candidate_id → slots held
+        self._waiting: OrderedDict[str, deque[asyncio.Future]] = OrderedDict()  # round-robin order
+        self._waits: deque[float] = deque(maxlen=_WAIT_SAMPLES)
+        self._saturated = False  # some run queued since the last adjustment
+        self._last_adjust = time.monotonic()
+        self.llm_latency_ms: float | None = None
+        self.run_seconds: float | None = None
+        self.admitted = 0
+        self.shed: Counter[str] = Counter()  # by reason
+        self.limit_changes = 0
+
+    # ── admission ────────────────────────────────────────────────────────────
+
+    def _eligible(self, candidate_id: str) -> bool:
+        return (
+            not candidate_id
+            or self._per_candidate <= 0
+            or self._running[candidate_id] < self._per_candidate
+        )
+
+    def _start(self, candidate_id: str) -> None:
+        self.in_flight += 1
+        self._running[candidate_id] += 1
+        self.admitted += 1
+
+    def _release(self, candidate_id: str) -> None:
+        self.in_flight -= 1
+        self._running[candidate_id] -= 1
+        if self._running[candidate_id] <= 0:
+            del self._running[candidate_id]
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiting runs, one candidate at a time in rotation."""
+        while self.in_flight < self.limit and self.queued:
+            for candidate_id in list(self._waiting):
+                if not self._eligible(candidate_id):
+                    continue
+                waiters = self._waiting[candidate_id]
+                future = waiters.popleft()
+                self.queued -= 1
+                if waiters:
+                    self._waiting.move_to_end(candidate_id)
+                else:
+                    del self._waiting[candidate_id]
+                self._start(candidate_id)
+                future.set_result(None)
+                break
+            else:
+                return  # every waiting candidate is at its cap
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely to free up for a new arrival."""
+        per_run = self.run_seconds or 5.0
+        return max(1, math.ceil(per_run * (self.queued + 1) / max(1, self.limit)))
+
+    def _shed(self, reason: str, candidate_id: str) -> HTTPException:
+        self.shed[reason] += 1
+        logger.warning(
+            "admission_shed",
+            reason=reason,
+            candidate_id=candidate_id,
+            in_flight=self.in_flight,
+            queued=self.queued,
+            limit=self.limit,
+        )
+        return HTTPException(
+            status_code=429,
+            detail=f"Agent is at capacity ({reason}); retry later",
+            headers={"Retry-After": str(self.retry_after())},
+        )
+
+    def shed_if_full(self, candidate_id: str) -> None:
+        """Fast 429 before any work is started, when the run could not even queue."""
+        if self.in_flight >= self.limit and self.queued >= self._max_queue:
+            raise self._shed("queue_full", candidate_id)
+
+    async def acquire(self, candidate_id: str) -> float:
+        """Take a run slot, waiting in the fair queue if needed; returns the wait in ms."""
+        if (
+            self.in_flight < self.limit
+            and self._eligible(candidate_id)
+            and candidate_id not in self._waiting
+        ):
+            self._start(candidate_id)
+            self._waits.append(0.0)
+            return 0.0
+
+        self._saturated = True
+        if self.queued >= self._max_queue:
+            raise self._shed("queue_full", candidate_id)
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(candidate_id, deque()).append(future)
+        self.queued += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(future, self._queue_timeout)
+        except (TimeoutError, asyncio.CancelledError) as exc:
+            if future.done() and not future.cancelled():
+                self._release(candidate_id)  # granted just as we gave up
+            else:
+                waiters = self._waiting.get(candidate_id)
+                if waiters is not None and future in waiters:
+                    waiters.remove(future)
+                    self.queued -= 1
+                    if not waiters:
+                        del self._waiting[candidate_id]
+            if isinstance(exc, TimeoutError):
+                raise self._shed("queue_timeout", candidate_id) from None
+            raise
+        wait_ms = round((time.monotonic() - started) * 1000, 1)
+        self._waits.append(wait_ms)
+        return wait_ms
+
+    @asynccontextmanager
+    async def slot(self, candidate_id: str, counter: TokenCounter | None = None):
+        """Hold a run slot for the body; ``counter``'s LLM latencies feed the adaptive limit."""
+        await self.acquire(candidate_id)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.run_seconds = _ewma(self.run_seconds, time.monotonic() - started)
+            if counter is not None:
+                self.observe(counter.llm_latencies_ms)
+            self._release(candidate_id)
+
+    # ── adaptive limit ───────────────────────────────────────────────────────
+
+    def observe(self, llm_latencies_ms: list[float]) -> None:
+        """Fold in LLM call latencies and adjust the limit at most once per interval."""
+        for latency in llm_latencies_ms:
+            self.llm_latency_ms = _ewma(self.llm_latency_ms, latency)
+        if self._target_latency <= 0 or self.llm_latency_ms is None:
+            return
+        now = time.monotonic()
+        if now - self._last_adjust < self._adjust_interval:
+            return
+        self._last_adjust = now
+
+        if self.llm_latency_ms > self._target_latency:
+            new_limit = max(self._min_limit, min(self.limit - 1, int(self.limit * _DECREASE_FACTOR)))
+        elif self._saturated:
+            new_limit = min(self._max_limit, self.limit + 1)
+        else:
+            new_limit = self.limit
+        self._saturated = False
+
+        if new_limit != self.limit:
+            logger.info(
+                "admission_limit_changed",
+                old_limit=self.limit,
+                new_limit=new_limit,
+                llm_latency_ms=round(self.llm_latency_ms),
+            )
+            self.limit = new_limit
+            self.limit_changes += 1
+            self._dispatch()
+
+    def stats(self) -> dict:
+        waits = list(self._waits)
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "waiting_candidates": len(self._waiting),
+            "admitted": self.admitted,
+            "shed": dict(self.shed),
+            "limit_changes": self.limit_changes,
+            "llm_latency_ms_ewma": round(self.llm_latency_ms) if self.llm_latency_ms else None,
+            "queue_wait_ms": {
+                "p50": percentile(waits, 0.50),
+                "p95": percentile(waits, 0.95),
+                "max": max(waits) if waits else None,
+            },
+        }
+
+
+def _ewma(current: float | None, sample: float) -> float:
+    return sample if current is None else current + _EWMA_ALPHA * (sample - current)
@@ -0,0 +1,159 @@
+"""Cancellation of in-flight graph runs.
+
+Every run started by the agent routes is registered under its
+``correlation_id``. A run can then be stopped in two ways:
+
+  • every client of a ``/stream`` run disconnects. ``watch_disconnect`` polls
+    ``request.is_disconnected()`` because uvicorn silently drops writes to a
+    closed socket, so the run would otherwise go on to the end. The run's
+    channel (api/idempotency.py) cancels it once no subscriber is left;
+  • ``POST /api/runs/cancel/{correlation_id}``, for ``/invoke``, batch, and
+    queued-run callers.
+
+Cancelling a run cancels the asyncio task driving it. The CancelledError
+propagates through LangGraph into the pending LLM and MCP calls. The route
+sees ``RunCancelled``.
+
+``cancellation_stats`` counts cancelled runs by reason, the tokens they had
+already spent, and an estimate of the tokens saved (average tokens of a
+completed run minus what the cancelled run had spent).
+"""
+
+import asyncio
+from collections import Counter
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable
+
+import structlog
+from fastapi import Request
+from langchain_core.runnables import RunnableConfig
+
+from candidate_agent.agents.usage import TokenCounter, with_handler
+from candidate_agent.api.metrics import metrics_handler
+
+logger = structlog.get_logger(__name__)
+
+# How often streaming routes check whether the client is still connected
+DISCONNECT_POLL_SECONDS = 0.5
+
+
+class RunCancelled(Exception):
+    """The run was cancelled on purpose (client disconnect or cancel endpoint)."""
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(f"Run cancelled ({reason})")
+        self.reason = reason
+
+
+@dataclass
+class CancellationStats:
+    cancelled: Counter = field(default_factory=Counter)  # by reason
+    tokens_spent_cancelled: int = 0
+    estimated_tokens_saved: int = 0
+    completed_runs: int = 0
+    completed_tokens: int = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "cancelled": dict(self.cancelled),
+            "tokens_spent_cancelled": self.tokens_spent_cancelled,
+            "estimated_tokens_saved": self.estimated_tokens_saved,
+            "completed_runs": self.completed_runs,
+            "avg_tokens_per_completed_run": (
+                round(self.completed_tokens / self.completed_runs) if self.completed_runs else None
+            ),
+        }
+
+
+cancellation_stats = CancellationStats()
+
+
+@dataclass(eq=False)
+class ActiveRun:
+    correlation_id: str
+    task: asyncio.Task
+    counter: TokenCounter = field(default_factory=TokenCounter)
+    cancel_reason: str | None = None
+
+    def config(self, config: RunnableConfig) -> RunnableConfig:
+        """``config`` with this run's token counter and the metrics handler attached."""
+        return with_handler(with_handler(config, self.counter), metrics_handler)
+
+
+class RunRegistry:
+    """In-flight runs by ``correlation_id``, cancellable from any request."""
+
+    def __init__(self) -> None:
+        self._runs: dict[str, ActiveRun] = {}
+
+    def __contains__(self, correlation_id: str) -> bool:
+        return correlation_id in self._runs
+
+    @property
+    def running(self) -> int:
+        """Runs executing now: each batch item counts, queued async runs do not."""
+        return len(self._runs)
+
+    @asynccontextmanager
+    async def track(self, correlation_id: str):
+        """Register the current task as the run for ``correlation_id``.
+
+        Raises ``RunCancelled`` in place of the CancelledError when this
+        registry cancelled the run. Any other cancellation, such as shutdown,
+        propagates unchanged.
+        """
+        run = ActiveRun(correlation_id, asyncio.current_task())  # type: ignore[arg-type]
+        self._runs[correlation_id] = run
+        try:
+            yield run
+        except asyncio.CancelledError:
+            if run.cancel_reason is None or run.task.uncancel() > 0:
+                raise
+            cancellation_stats.cancelled[run.cancel_reason] += 1
+            cancellation_stats.tokens_spent_cancelled += run.counter.tokens
+            if cancellation_stats.completed_runs:
+                average = cancellation_stats.completed_tokens / cancellation_stats.completed_runs
+                cancellation_stats.estimated_tokens_saved += max(0, round(average - run.counter.tokens))
+            logger.info(
+                "run_cancelled",
+                correlation_id=correlation_id,
+                reason=run.cancel_reason,
+                tokens_spent=run.counter.tokens,
+            )
+            raise RunCancelled(run.cancel_reason) from None
+        else:
+            cancellation_stats.completed_runs += 1
+            cancellation_stats.completed_tokens += run.counter.tokens
+        finally:
+            if self._runs.get(correlation_id) is run:
+                del self._runs[correlation_id]
+
+    def cancel(self, correlation_id: str, reason: str) -> bool:
+        """Cancel the run registered under ``correlation_id``; False if none is running."""
+        run = self._runs.get(correlation_id)
+        if run is None or run.task.done() or run.cancel_reason is not None:
+            return False
+        run.cancel_reason = reason
+        run.task.cancel()
+        return True
+
+
+async def watch_disconnect(
+    request: Request,
+    events: AsyncIterator[tuple[str, dict]],
+    on_disconnect: Callable[[], None],
+) -> AsyncIterator[tuple[str, dict]]:
+    """Relay ``events``, calling ``on_disconnect`` if the client disconnects first."""
+
+    async def watch() -> None:
+        while not await request.is_disconnected():
+            await asyncio.sleep(DISCONNECT_POLL_SECONDS)
+        on_disconnect()
+
+    watcher = asyncio.create_task(watch())
+    try:
+        async for item in events:
+            yield item
+    finally:
+        watcher.cancel()
@@ -1,6 +1,16 @@
 from fastapi import Request
 
+from candidate_agent.agents.blob_store import BlobStore
 from candidate_agent.agents.graph import build_graph, build_v2_graph  # noqa: F401
+from candidate_agent.api.admission import AdmissionController
+from candidate_agent.api.cancellation import RunRegistry
+from candidate_agent.api.drain import RunTracker
+from candidate_agent.api.health_probe import HealthProber
+from candidate_agent.api.idempotency import IdempotencyStore
+from candidate_agent.api.jobs import JobQueue
+from candidate_agent.api.run_guard import RunGuard
+from candidate_agent.api.thread_locks import ThreadLocks
+from candidate_agent.api.tracing import RunTracer
 from candidate_agent.config import Settings
 from candidate_agent.mcp.client import MCPToolRegistry
 
@@ -20,6 +30,60 @@ def get_registry(request: Request) -> MCPToolRegistry:
     return request.app.state.mcp_registry
 
 
+def get_run_tracker(request: Request) -> RunTracker:
+    """FastAPI dependency: returns the in-flight run tracker used for graceful drain."""
+    return request.app.state.run_tracker
+
+
+def get_run_registry(request: Request) -> RunRegistry:
+    """FastAPI dependency: returns the registry of cancellable in-flight runs."""
+    return request.app.state.run_registry
+
+
+def get_idempotency_store(request: Request) -> IdempotencyStore:
+    """FastAPI dependency: returns the correlation_id idempotency store."""
+    return request.app.state.idempotency
+
+
+def get_job_queue(request: Request) -> JobQueue:
+    """FastAPI dependency: returns the async run queue from app state."""
+    return request.app.state.job_queue
+
+
+def get_thread_locks(request: Request) -> ThreadLocks:
+    """FastAPI dependency: returns the per-thread run locks."""
+    return request.app.state.thread_locks
+
+
+def get_admission(request: Request) -> AdmissionController:
+    """FastAPI dependency: returns the graph-run admission controller."""
+    return request.app.state.admission
+
+
+def get_run_guard(request: Request) -> RunGuard:
+    """FastAPI dependency: returns the registry + thread lock + admission bundle for runs."""
+    return RunGuard(
+        request.app.state.run_registry,
+        request.app.state.thread_locks,
+        request.app.state.admission,
+    )
+
+
+def get_blob_store(request: Request) -> BlobStore | None:
+    """FastAPI dependency: returns the tool-result blob store (None when disabled)."""
+    return request.app.state.blob_store
+
+
+def get_health_prober(request: Request) -> HealthProber:
+    """FastAPI dependency: returns the background dependency prober."""
+    return request.app.state.health_prober
+
+
 def get_settings(request: Request) -> Settings:
     """FastAPI dependency: returns app settings from app state."""
     return request.app.state.settings
+
+
+def get_tracer(request: Request) -> RunTracer:
+    """FastAPI dependency: returns the sampled Langfuse run tracer."""
+    return request.app.state.tracer
@@ -0,0 +1,135 @@
+"""Graceful drain — finish in-flight runs and hand off thread state before exit.
+
+Drain has three steps:
+  1. stop accepting new graph runs (``/invoke`` and ``/stream`` answer 503),
+  2. wait up to DRAIN_GRACE_SECONDS for in-flight runs to finish, then close
+     open WebSocket sessions with 1012 so clients reconnect elsewhere,
+  3. export live thread checkpoints to CHECKPOINT_SNAPSHOT_PATH, which the
+     next process imports at startup.
+
+Drain is triggered by ``POST /drain`` (wire it to the pod's preStop hook) and,
+as a fallback, by lifespan shutdown. It runs at most once per process.
+``/drain`` takes the pod out of service, so only loopback callers (or callers
+presenting DRAIN_TOKEN) may trigger it; see api/routes/lifecycle.py.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import structlog
+from fastapi import HTTPException
+
+from candidate_agent.agents.blob_store import InMemoryBlobStore
+from candidate_agent.agents.checkpoint_snapshot import export_checkpoints
+
+logger = structlog.get_logger(__name__)
+
+
+class RunTracker:
+    """Counts in-flight graph runs and rejects new ones once draining starts."""
+
+    def __init__(self) -> None:
+        self._inflight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._sessions_closing = asyncio.Event()
+        self.draining = False
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+    def reject_if_draining(self) -> None:
+        """Raise 503 if the process is draining; call before starting a new run."""
+        if self.draining:
+            raise HTTPException(
+                status_code=503,
+                detail="Server is draining; retry on another instance",
+                headers={"Retry-After": "1", "Connection": "close"},
+            )
+
+    @asynccontextmanager
+    async def track(self):
+        """``async with tracker.track():`` — count the enclosed run as in flight.
+
+        Stream routes enter this inside the SSE generator so the run stays
+        tracked until the last event is sent.
+        """
+        self.begin()
+        try:
+            yield
+        finally:
+            self.end()
+
+    def begin(self) -> None:
+        """Count one run as in flight; pair with ``end()``.
+
+        For runs whose lifetime is not one ``async with`` block — the job queue
+        counts a queued run from submission until its worker finishes it.
+        """
+        self._inflight += 1
+        self._idle.clear()
+
+    def end(self) -> None:
+        self._inflight -= 1
+        if self._inflight == 0:
+            self._idle.set()
+
+    async def wait_idle(self, timeout: float) -> bool:
+        """Wait until no runs are in flight. Returns False if ``timeout`` elapsed first."""
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+            return True
+        except TimeoutError:
+            return False
+
+    def close_sessions(self) -> None:
+        """Tell open WebSocket sessions to close; drain calls this once in-flight runs are done."""
+        self._sessions_closing.set()
+
+    async def wait_sessions_closing(self) -> None:
+        await self._sessions_closing.wait()
+
+
+async def drain(app_state) -> dict:
+    """Run the three drain steps once; later calls return the first call's outcome."""
+    if getattr(app_state, "drain_task", None) is None:
+        app_state.drain_task = asyncio.create_task(_drain(app_state))
+    return await asyncio.shield(app_state.drain_task)
+
+
+async def _drain(app_state) -> dict:
+    settings = app_state.settings
+    tracker: RunTracker = app_state.run_tracker
+    started = time.monotonic()
+
+    tracker.draining = True
+    logger.info("drain_started", inflight=tracker.inflight, grace_seconds=settings.drain_grace_seconds)
+
+    completed = await tracker.wait_idle(settings.drain_grace_seconds)
+    if not completed:
+        logger.warning("drain_grace_expired", inflight=tracker.inflight)
+    tracker.close_sessions()
+
+    exported = 0
+    if settings.checkpoint_snapshot_path:
+        try:
+            blob_store = getattr(app_state, "blob_store", None)
+            exported = await export_checkpoints(
+                {"v1": app_state.graph.checkpointer, "v2": app_state.v2_graph.checkpointer},
+                settings.checkpoint_snapshot_path,
+                # The memory store dies with this process; the disk store is shared
+                inline_blobs=blob_store if isinstance(blob_store, InMemoryBlobStore) else None,
+            )
+        except Exception as exc:
+            logger.error("checkpoint_export_failed", error=str(exc), exc_info=True)
+
+    outcome = {
+        "drained": completed,
+        "inflight": tracker.inflight,
+        "threads_exported": exported,
+        "duration_ms": round((time.monotonic() - started) * 1000),
+    }
+    logger.info("drain_complete", **outcome)
+    return outcome
@@ -0,0 +1,188 @@
+"""Background dependency prober behind ``/livez``, ``/readyz`` and ``/health``.
+
+``/health`` used to open a new ``httpx.AsyncClient`` and probe candidate-mcp
+inline, with the 30s MCP connect timeout. Every Kubernetes probe therefore hit
+MCP, and a slow MCP made the probe itself hang. ``HealthProber`` runs the checks
+on a timer instead, using one shared client, and the endpoints answer from its
+cached state:
+
+  • ``mcp`` — GET MCP_SERVER_URL. Any status below 500 means up; the stateless
+    MCP endpoint rejects bare GETs with 4xx.
+  • ``llm`` — GET the model-list endpoint of the configured LLM: Anthropic
+    ``/v1/models``, or ``{LOCAL_LLM_BASE_URL}/models``. It spends no tokens.
+    401/403 counts as down, because no run could succeed.
+
+Every check keeps a rolling window of latencies (HEALTH_PROBE_WINDOW samples)
+as a fixed-bucket histogram with p50/p95. The prober also measures event-loop
+lag (how late its own timer fires), which ``/livez`` reports.
+
+``readiness()`` turns the cached state into ``ready`` / ``degraded`` /
+``not_ready`` plus reasons. A dependency becomes ``not_ready`` only after
+HEALTH_FAILURE_THRESHOLD consecutive failures, so a single blip degrades
+rather than flaps the pod out of the Service.
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+import httpx
+import structlog
+
+from candidate_agent.api.stats import percentile
+from candidate_agent.config import Settings
+
+logger = structlog.get_logger(__name__)
+
+# Histogram upper bounds in ms; the last bucket is +Inf
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_ANTHROPIC_MODELS_URL = "https://api.anthropic.com/v1/models"
+
+
+@dataclass
+class ProbeState:
+    name: str
+    url: str
+    window: int
+    ok: bool | None = None  # None until the first check completes
+    checked_at: float | None = None  # time.monotonic()
+    latency_ms: float | None = None
+    consecutive_failures: int = 0
+    last_error: str | None = None
+    samples: deque[float] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.samples = deque(maxlen=self.window)
+
+    def record(self, ok: bool, latency_ms: float, error: str | None) -> None:
+        self.ok = ok
+        self.checked_at = time.monotonic()
+        self.latency_ms = round(latency_ms, 1)
+        self.samples.append(latency_ms)
+        self.consecutive_failures = 0 if ok else self.consecutive_failures + 1
+        self.last_error = error
+
+    def histogram(self) -> dict[str, int]:
+        counts = dict.fromkeys([*(str(b) for b in LATENCY_BUCKETS_MS), "+Inf"], 0)
+        for sample in self.samples:
+            bucket = next((str(b) for b in LATENCY_BUCKETS_MS if sample <= b), "+Inf")
+            counts[bucket] += 1
+        return counts
+
+    def snapshot(self) -> dict:
+        samples = list(self.samples)
+        return {
+            "ok": self.ok,
+            "age_seconds": (
+                round(time.monotonic() - self.checked_at, 1) if self.checked_at else None
+            ),
+            "latency_ms": self.latency_ms,
+            "p50_ms": _round(percentile(samples, 0.50)),
+            "p95_ms": _round(percentile(samples, 0.95)),
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+            "histogram_ms": self.histogram(),
+        }
+
+
+class HealthProber:
+    """Periodically probes MCP and the LLM endpoint; all reads are from cache."""
+
+    def __init__(self, settings: Settings) -> None:
+        self._interval = settings.health_probe_interval_seconds
+        self._timeout = settings.health_probe_timeout_seconds
+        self._failure_threshold = settings.health_failure_threshold
+        self._slow_ms = settings.health_slow_probe_ms
+        window = settings.health_probe_window
+        self.mcp = ProbeState("mcp", settings.mcp_server_url, window)
+        if settings.local_llm:
+            self.llm = ProbeState("llm", settings.local_llm_base_url.rstrip("/") + "/models", window)
+            self._llm_headers = {"Authorization": f"Bearer {settings.local_llm_api_key}"}
+        else:
+            self.llm = ProbeState("llm", _ANTHROPIC_MODELS_URL, window)
+            key = settings.anthropic_api_key.get_secret_value() if settings.anthropic_api_key else ""
+            self._llm_headers = {"x-api-key": key, "anthropic-version": "2023-06-01"}
+        self.loop_lag_ms = 0.0
+        self._client: httpx.AsyncClient | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._client = httpx.AsyncClient(timeout=self._timeout)
+        self._task = asyncio.create_task(self._run())
+        logger.info("health_prober_started", interval_seconds=self._interval)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+
+    async def _run(self) -> None:
+        while True:
+            await self.probe_once()
+            expected = time.monotonic() + self._interval
+            await asyncio.sleep(self._interval)
+            self.loop_lag_ms = round(max(0.0, time.monotonic() - expected) * 1000, 1)
+
+    async def probe_once(self) -> None:
+        await asyncio.gather(
+            self._probe(self.mcp, {}, auth_is_failure=False),
+            self._probe(self.llm, self._llm_headers, auth_is_failure=True),
+        )
+
+    async def _probe(self, state: ProbeState, headers: dict, *, auth_is_failure: bool) -> None:
+        started = time.monotonic()
+        error = None
+        try:
+            resp = await self._client.get(state.url, headers=headers)  # type: ignore[union-attr]
+            ok = resp.status_code < 500 and not (
+                auth_is_failure and resp.status_code in (401, 403)
+            )
+            if not ok:
+                error = f"HTTP {resp.status_code}"
+        except Exception as exc:
+            ok, error = False, f"{type(exc).__name__}: {exc}"
+        state.record(ok, (time.monotonic() - started) * 1000, error)
+        if not ok:
+            logger.warning(
+                f"{state.name}_health_check_failed",
+                url=state.url,
+                error=error,
+                consecutive_failures=state.consecutive_failures,
+            )
+
+    def readiness(self, *, draining: bool) -> tuple[str, list[str]]:
+        """``(status, reasons)`` with status ``ready``, ``degraded`` or ``not_ready``."""
+        hard: list[str] = []
+        soft: list[str] = []
+        if draining:
+            hard.append("draining")
+        stale_after = 3 * self._interval + self._timeout
+        for state in (self.mcp, self.llm):
+            if state.ok is None:
+                hard.append(f"{state.name}_not_probed_yet")
+                continue
+            if state.consecutive_failures >= self._failure_threshold:
+                hard.append(f"{state.name}_unreachable ({state.last_error})")
+            elif not state.ok:
+                soft.append(f"{state.name}_probe_failed ({state.last_error})")
+            if time.monotonic() - state.checked_at > stale_after:  # type: ignore[operator]
+                soft.append(f"{state.name}_probe_stale")
+            p95 = percentile(list(state.samples), 0.95)
+            if p95 is not None and p95 > self._slow_ms:
+                soft.append(f"{state.name}_slow (p95 {round(p95)} ms)")
+        if self.loop_lag_ms > self._slow_ms:
+            soft.append(f"event_loop_lag ({self.loop_lag_ms} ms)")
+        if hard:
+            return "not_ready", hard + soft
+        return ("degraded" if soft else "ready"), soft
+
+    def snapshot(self) -> dict:
+        return {"mcp": self.mcp.snapshot(), "llm": self.llm.snapshot()}
+
+
+def _round(value: float | None) -> float | None:
+    return round(value, 1) if value is not None else None
@@ -0,0 +1,143 @@
+"""Read-only, paginated thread history from the checkpointer.
+
+Support tooling used to send a new turn just to see a conversation, which
+costs an LLM run and changes the thread. ``read_history`` reads the thread's
+latest checkpoint instead and returns one page of turns. A turn is a
+HumanMessage and everything after it, with the agents that replied and the
+tools they called.
+
+Pagination runs from the newest turn backwards. The cursor is the index of
+the oldest message already returned. Threads are append-only, so a cursor
+stays valid while new turns are added. Only the page is converted. The cost of
+a request is therefore proportional to the page size, not the thread length.
+Tool results can be left out (``include_tool_output=false``): they are most of
+a thread's bytes, and only their size is reported.
+
+MemorySaver keeps every thread in process memory already. Reading a checkpoint
+decodes its ``messages`` channel, a transient list that is freed when the
+request ends. True range reads need a saver that stores messages one per row.
+The cursor contract already fits one.
+"""
+
+from typing import Sequence
+
+from langchain_core.messages import AIMessage, AnyMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.base import BaseCheckpointSaver
+
+from candidate_agent.agents.blob_store import BLOB_REF_KEY, BlobStore, resolve_message
+from candidate_agent.agents.tool_timing import DURATION_KEY
+from candidate_agent.api.schemas import (
+    HistoryMessage,
+    HistoryToolCall,
+    HistoryTurn,
+    ThreadHistoryResponse,
+    ToolTiming,
+)
+from candidate_agent.api.turns import extract_turn, message_text
+
+
+def turn_spans(
+    messages: Sequence[AnyMessage], before: int | None, limit: int
+) -> tuple[list[tuple[int, int]], int | None]:
+    """``[start, end)`` spans of up to ``limit`` turns ending before ``before``.
+
+    Returns the spans oldest first and the cursor for the next, older page.
+    Only the messages of the page are visited.
+    """
+    end = len(messages) if before is None else min(before, len(messages))
+    spans: list[tuple[int, int]] = []
+    while end > 0 and len(spans) < limit:
+        start = end - 1
+        while start > 0 and not isinstance(messages[start], HumanMessage):
+            start -= 1
+        spans.append((start, end))
+        end = start
+    spans.reverse()
+    return spans, (end or None)
+
+
+def _history_message(
+    index: int,
+    msg: AnyMessage,
+    include_tool_output: bool,
+    blob_store: BlobStore | None,
+) -> HistoryMessage:
+    ref = msg.additional_kwargs.get(BLOB_REF_KEY)
+    content: str | None
+    if isinstance(msg, ToolMessage) and not include_tool_output:
+        content = None
+        size = ref["size"] if ref else len(message_text(msg).encode("utf-8"))
+    else:
+        if ref is not None:
+            msg = resolve_message(msg, blob_store)
+        content = message_text(msg)
+        size = len(content.encode("utf-8"))
+    return HistoryMessage(
+        index=index,
+        type=msg.type,
+        name=msg.name,
+        content=content,
+        content_bytes=size,
+        tool_calls=[
+            HistoryToolCall(id=tc.get("id"), name=tc["name"], args=tc.get("args") or {})
+            for tc in getattr(msg, "tool_calls", None) or []
+        ],
+        tool_call_id=getattr(msg, "tool_call_id", None),
+        duration_ms=msg.response_metadata.get(DURATION_KEY),
+    )
+
+
+def _history_turn(
+    messages: Sequence[AnyMessage],
+    start: int,
+    end: int,
+    include_tool_output: bool,
+    blob_store: BlobStore | None,
+) -> HistoryTurn:
+    span = messages[start:end]
+    first = span[0]
+    opened = isinstance(first, HumanMessage)
+    result = extract_turn(span, first.id if opened else None)
+    agents: list[str] = []
+    for msg in span:
+        if isinstance(msg, AIMessage) and msg.name and msg.name not in agents:
+            agents.append(msg.name)
+    return HistoryTurn(
+        index=start,
+        turn_id=first.id if opened else None,
+        message=message_text(first) if opened else None,
+        response=result.response_text,
+        agents=agents,
+        tool_calls=[ToolTiming(name=tc.name, duration_ms=tc.duration_ms) for tc in result.tool_calls],
+        messages=[
+            _history_message(start + offset, msg, include_tool_output, blob_store)
+            for offset, msg in enumerate(span)
+        ],
+    )
+
+
+async def read_history(
+    saver: BaseCheckpointSaver,
+    thread_id: str,
+    *,
+    cursor: int | None,
+    limit: int,
+    include_tool_output: bool,
+    blob_store: BlobStore | None,
+) -> ThreadHistoryResponse | None:
+    """One page of ``thread_id``'s turns, or None if the thread has no checkpoint."""
+    tup = await saver.aget_tuple({"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}})
+    if tup is None:
+        return None
+    messages: list[AnyMessage] = tup.checkpoint["channel_values"].get("messages", [])
+    spans, next_cursor = turn_spans(messages, cursor, limit)
+    return ThreadHistoryResponse(
+        thread_id=thread_id,
+        checkpoint_id=tup.checkpoint["id"],
+        total_messages=len(messages),
+        turns=[
+            _history_turn(messages, start, end, include_tool_output, blob_store)
+            for start, end in spans
+        ],
+        next_cursor=next_cursor,
+    )
@@ -0,0 +1,396 @@
+"""Idempotent ``/invoke`` and ``/stream`` keyed by ``correlation_id``.
+
+Gateway retries resend the same ``correlation_id`` while the first attempt is
+still running. Without this layer every retry would start another graph run and
+append a duplicate turn to the thread. Here a retry for a known key
+
+  • attaches to the in-flight run: an invoke waits for the same result; a
+    stream replays the events so far, then follows the live run;
+  • gets the completed result for IDEMPOTENCY_TTL_SECONDS after the run
+    finishes: an invoke returns the cached response; a stream replays the
+    recorded events.
+
+Keys are ``(route, correlation_id)``, e.g. ``("v2/stream", "abc")``. A retry
+must send the same body. Reusing a ``correlation_id`` with a different body
+answers 422. Only successful runs are kept. After a failure or cancellation the
+key is released, so the next retry starts a new run.
+
+Streamed runs execute in their own task and publish into a ``RunChannel``, so
+the run is not tied to the connection that started it. The run is cancelled
+when the last subscriber disconnects and nobody re-attaches within
+IDEMPOTENCY_REATTACH_GRACE_SECONDS. That grace period is what lets a gateway
+that gave up on the first connection pick the run up again.
+
+Resuming. Token chunks are coalesced (SSE_COALESCE_MS / SSE_COALESCE_BYTES,
+see api/sse.py) before they reach the channel, so one event is one SSE frame.
+A channel numbers its events from 1 (the SSE ``id:`` field) and keeps the last
+STREAM_REPLAY_MAX_EVENTS of them, for IDEMPOTENCY_TTL_SECONDS after a
+successful run. A reconnect that sends ``Last-Event-ID`` gets only the events
+after that id, then the live run. If the run is gone, it answers 410 rather
+than silently running the turn again.
+
+Next to the ring, a channel keeps a transcript of the whole run. Events the
+ring has dropped are replayed from it, with consecutive tokens joined into one
+event that carries the id of its last chunk. A retry without ``Last-Event-ID``
+therefore always gets the full run, however long it was, and neither a resume
+nor a slow reader falls off the end of the ring.
+"""
+
+import asyncio
+import bisect
+import hashlib
+import json
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, NoReturn
+
+import structlog
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from candidate_agent.api.cancellation import RunRegistry
+from candidate_agent.api.sse import coalesce_tokens
+
+logger = structlog.get_logger(__name__)
+
+Key = tuple[str, str]  # (route, correlation_id)
+
+
+def request_fingerprint(req: BaseModel) -> str:
+    """Hash of the fields the client actually sent, minus ``correlation_id``.
+
+    Server-generated defaults (a fresh ``thread_id``) are left out, so a
+    verbatim retry of a body without ``thread_id`` still matches.
+    """
+    body = req.model_dump(exclude_unset=True, exclude={"correlation_id"})
+    return hashlib.sha256(json.dumps(body, sort_keys=True, default=str).encode()).hexdigest()
+
+
+@dataclass(eq=False)
+class _Subscriber:
+    closed: bool = False
+
+
+class RunChannel:
+    """One streamed run's events, numbered from 1 and kept in a ring buffer.
+
+    The buffer holds the last ``max_events`` events. Older events are served
+    from ``transcript``, so a subscriber can start after any sequence number.
+    """
+
+    def __init__(self, correlation_id: str, max_events: int) -> None:
+        self.correlation_id = correlation_id
+        self.events: deque[tuple[int, str, dict]] = deque(maxlen=max_events)
+        # Whole run: [last seq, event, data], or [last seq, "token", one part per seq]
+        # for a run of consecutive tokens
+        self.transcript: list[list] = []
+        self.last_seq = 0
+        self.done = False
+        self.task: asyncio.Task | None = None
+        self._wake = asyncio.Event()
+        self._subscribers = 0
+        self._abandon_timer: asyncio.TimerHandle | None = None
+
+    @property
+    def first_seq(self) -> int:
+        """Sequence number of the oldest buffered event."""
+        return self.events[0][0] if self.events else self.last_seq + 1
+
+    @property
+    def succeeded(self) -> bool:
+        return self.done and bool(self.events) and self.events[-1][1] == "done"
+
+    def publish(self, item: tuple[str, dict]) -> None:
+        self.last_seq += 1
+        self.events.append((self.last_seq, *item))
+        event, data = item
+        if event == "token" and self.transcript and self.transcript[-1][1] == "token":
+            entry = self.transcript[-1]
+            entry[0] = self.last_seq
+            entry[2].append(data["content"])
+        elif event == "token":
+            self.transcript.append([self.last_seq, event, [data["content"]]])
+        else:
+            self.transcript.append([self.last_seq, event, data])
+        self._notify()
+
+    def _from_transcript(self, after: int) -> tuple[str, dict, int]:
+        """What follows event ``after`` up to the end of its transcript entry, as ``(event, data, seq)``."""
+        index = bisect.bisect_left(self.transcript, after + 1, key=lambda entry: entry[0])
+        seq, event, data = self.transcript[index]
+        if event == "token":
+            start = seq - len(data) + 1
+            data = {"content": "".join(data[after + 1 - start :])}
+        return event, data, seq
+
+    def close(self) -> None:
+        self.done = True
+        self._notify()
+
+    def _notify(self) -> None:
+        self._wake.set()
+        self._wake = asyncio.Event()
+
+    def detach(self, subscriber: _Subscriber) -> None:
+        """End ``subscriber``'s stream (its client went away)."""
+        subscriber.closed = True
+        self._notify()
+
+    async def subscribe(
+        self,
+        subscriber: _Subscriber,
+        on_abandoned: Callable[[], None],
+        grace: float,
+        after: int = 0,
+    ) -> AsyncIterator[tuple[str, dict, int]]:
+        """Yield ``(event, data, seq)`` for events after ``after``, then live ones.
+
+        Ends when the run or the subscriber does. ``on_abandoned`` runs if the
+        run is still going ``grace`` seconds after the last subscriber left.
+        """
+        self._subscribers += 1
+        if self._abandon_timer is not None:
+            self._abandon_timer.cancel()
+            self._abandon_timer = None
+        try:
+            seq = after + 1  # next event to send
+            while not subscriber.closed:
+                while seq <= self.last_seq:
+                    if seq < self.first_seq:
+                        # The ring has moved on: continue from the transcript
+                        entry = self._from_transcript(seq - 1)
+                        yield entry
+                        seq = entry[2] + 1
+                        continue
+                    _, event, data = self.events[seq - self.first_seq]
+                    yield event, data, seq
+                    seq += 1
+                if self.done:
+                    return
+                await self._wake.wait()
+        finally:
+            self._subscribers -= 1
+            if self._subscribers == 0 and not self.done:
+                self._abandon_timer = asyncio.get_running_loop().call_later(
+                    grace, self._abandoned, on_abandoned
+                )
+
+    def _abandoned(self, on_abandoned: Callable[[], None]) -> None:
+        self._abandon_timer = None
+        if self._subscribers == 0 and not self.done:
+            on_abandoned()
+
+
+@dataclass(eq=False)
+class _Entry:
+    fingerprint: str
+    future: asyncio.Future | None = None  # invoke
+    channel: RunChannel | None = None  # stream
+
+
+@dataclass
+class IdempotencyStats:
+    started: int = 0
+    attached: int = 0  # retry joined an in-flight run
+    replayed: int = 0  # retry served from a completed run
+    resumed: int = 0  # reconnect with Last-Event-ID
+    resume_gone: int = 0  # reconnect for a run no longer kept (410)
+    conflicts: int = 0  # same correlation_id, different body (422)
+    by_route: dict[str, int] = field(default_factory=dict)  # retries per route
+
+
+class IdempotencyStore:
+    """In-flight and recently completed runs by ``(route, correlation_id)``."""
+
+    def __init__(
+        self,
+        runs: RunRegistry,
+        ttl: float,
+        max_entries: int,
+        reattach_grace: float,
+        replay_max_events: int,
+        coalesce_ms: float = 30.0,
+        coalesce_bytes: int = 0,
+    ) -> None:
+        """``coalesce_bytes=0`` records every token chunk as its own event."""
+        self._runs = runs
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._grace = reattach_grace
+        self._replay_max_events = replay_max_events
+        self._coalesce_ms = coalesce_ms
+        self._coalesce_bytes = coalesce_bytes
+        self._entries: dict[Key, _Entry] = {}
+        self._finished: OrderedDict[Key, float] = OrderedDict()  # key → finished_at
+        self.stats = IdempotencyStats()
+
+    def _lookup(self, key: Key, fingerprint: str) -> _Entry | None:
+        self._expire()
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.fingerprint != fingerprint:
+            self.stats.conflicts += 1
+            raise HTTPException(
+                status_code=422,
+                detail=f"correlation_id {key[1]!r} was already used for a different request",
+            )
+        self.stats.by_route[key[0]] = self.stats.by_route.get(key[0], 0) + 1
+        return entry
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self._ttl
+        while self._finished:
+            key, finished_at = next(iter(self._finished.items()))
+            if finished_at > cutoff and len(self._finished) <= self._max_entries:
+                break
+            del self._finished[key]
+            self._entries.pop(key, None)
+
+    def _finish(self, key: Key, entry: _Entry, succeeded: bool) -> None:
+        if self._entries.get(key) is not entry:
+            return
+        if succeeded:
+            self._finished[key] = time.monotonic()
+        else:
+            del self._entries[key]  # let the next retry start over
+
+    async def invoke(
+        self,
+        key: Key,
+        fingerprint: str,
+        run: Callable[[], Awaitable[Any]],
+    ) -> tuple[Any, bool]:
+        """Return ``(result, replayed)``, running ``run()`` only if ``key`` is new."""
+        entry = self._lookup(key, fingerprint)
+        if entry is not None and entry.future is not None:
+            if entry.future.done():
+                self.stats.replayed += 1
+            else:
+                self.stats.attached += 1
+            logger.info("idempotent_replay", route=key[0], correlation_id=key[1])
+            return await asyncio.shield(entry.future), True
+
+        self.stats.started += 1
+        entry = _Entry(fingerprint, future=asyncio.get_running_loop().create_future())
+        self._entries[key] = entry
+        try:
+            result = await run()
+        except BaseException as exc:
+            self._finish(key, entry, succeeded=False)
+            entry.future.set_exception(exc)
+            entry.future.exception()  # mark retrieved — waiters re-raise it themselves
+            raise
+        self._finish(key, entry, succeeded=True)
+        entry.future.set_result(result)
+        return result, False
+
+    def stream(
+        self,
+        key: Key,
+        fingerprint: str,
+        events: Callable[[], AsyncIterator[tuple[str, dict]]],
+        after: int | None = None,
+    ) -> tuple[AsyncIterator[tuple[str, dict, int]], Callable[[], None], bool]:
+        """Subscribe to the run for ``key``, starting ``events()`` in a task if it is new.
+
+        ``after`` is the client's ``Last-Event-ID``: replay starts after it, and
+        a run that is no longer kept answers 410 instead of starting over.
+        Returns ``(subscription, detach, replayed)``. Call ``detach`` when the
+        client disconnects.
+        """
+        entry = self._lookup(key, fingerprint)
+        replayed = entry is not None and entry.channel is not None
+        if replayed:
+            channel = entry.channel
+            if channel.done:
+                self.stats.replayed += 1
+            else:
+                self.stats.attached += 1
+            logger.info("idempotent_replay", route=key[0], correlation_id=key[1])
+        elif after is not None:
+            self._gone(key, after)
+        else:
+            source = events()  # may raise (e.g. 409) before anything is registered
+            if self._coalesce_bytes > 0:
+                source = coalesce_tokens(
+                    source, coalesce_ms=self._coalesce_ms, coalesce_bytes=self._coalesce_bytes
+                )
+            self.stats.started += 1
+            channel = RunChannel(key[1], self._replay_max_events)
+            entry = _Entry(fingerprint, channel=channel)
+            self._entries[key] = entry
+            channel.task = asyncio.create_task(self._produce(key, entry, source))
+
+        subscription, detach = self._subscribe(key, channel, after or 0)
+        return subscription, detach, replayed
+
+    def resume(
+        self, key: Key, after: int
+    ) -> tuple[AsyncIterator[tuple[str, dict, int]], Callable[[], None]]:
+        """Follow an existing stream run from event ``after`` on; 410 if it is gone."""
+        self._expire()
+        entry = self._entries.get(key)
+        if entry is None or entry.channel is None:
+            self._gone(key, after)
+        return self._subscribe(key, entry.channel, after)
+
+    def _subscribe(
+        self, key: Key, channel: RunChannel, after: int
+    ) -> tuple[AsyncIterator[tuple[str, dict, int]], Callable[[], None]]:
+        if after:
+            self.stats.resumed += 1
+            logger.info(
+                "stream_resume",
+                route=key[0],
+                correlation_id=key[1],
+                last_event_id=after,
+                missed=channel.last_seq - after,
+            )
+        subscriber = _Subscriber()
+        subscription = channel.subscribe(
+            subscriber,
+            on_abandoned=lambda: self._runs.cancel(key[1], "client_disconnect"),
+            grace=self._grace,
+            after=after,
+        )
+        return subscription, lambda: channel.detach(subscriber)
+
+    def _gone(self, key: Key, after: int) -> NoReturn:
+        self.stats.resume_gone += 1
+        raise HTTPException(
+            status_code=410,
+            detail=(
+                f"Run {key[1]!r} is no longer kept, so it cannot resume after event {after}; "
+                "retry without Last-Event-ID to start a new run"
+            ),
+        )
+
+    async def _produce(
+        self, key: Key, entry: _Entry, events: AsyncIterator[tuple[str, dict]]
+    ) -> None:
+        channel = entry.channel
+        try:
+            async for item in events:
+                channel.publish(item)
+        except Exception as exc:
+            logger.error("stream_run_error", correlation_id=key[1], error=str(exc), exc_info=True)
+            channel.publish(("error", {"detail": str(exc)}))
+        finally:
+            channel.close()
+            self._finish(key, entry, succeeded=channel.succeeded)
+
+    def snapshot(self) -> dict:
+        self._expire()
+        return {
+            "started": self.stats.started,
+            "attached": self.stats.attached,
+            "replayed": self.stats.replayed,
+            "resumed": self.stats.resumed,
+            "resume_gone": self.stats.resume_gone,
+            "conflicts": self.stats.conflicts,
+            "retries_by_route": dict(self.stats.by_route),
+            "in_flight": len(self._entries) - len(self._finished),
+            "retained_results": len(self._finished),
+        }
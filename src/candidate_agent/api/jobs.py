@@ -0,0 +1,214 @@
+"""In-process run queue — submit now, poll for the result later.
+
+A long ``/invoke`` holds the client's HTTP connection for the whole LLM run.
+Gateway timeouts then trigger retries that repeat the work. The run endpoints
+(api/routes/runs.py) enqueue the run instead and return a ``run_id`` at once.
+A fixed pool of worker tasks executes queued runs, and results are kept for
+JOB_RESULT_TTL_SECONDS so clients can poll for them.
+
+  • The queue is bounded (JOB_QUEUE_MAX_DEPTH). A full queue answers 429 with Retry-After.
+  • A queued run counts as in flight for graceful drain from the moment it is
+    submitted, so drain waits for queued work as well as running work.
+  • Submits are idempotent per ``correlation_id``, like ``/invoke`` (api/idempotency.py):
+    a retried submit gets the queued, running or succeeded job back instead of a second
+    one; a different body under the same id is a 422. Failed and cancelled runs release
+    their id so the next retry starts over.
+  • Runs cancelled via ``POST /api/runs/cancel/{correlation_id}`` or by shutdown finish
+    with status ``cancelled`` and are counted apart from failures.
+  • ``stats()`` reports queue depth, busy workers, and queue-wait percentiles.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+from uuid import uuid4
+
+import structlog
+from fastapi import HTTPException
+
+from candidate_agent.api.cancellation import RunCancelled
+from candidate_agent.api.drain import RunTracker
+from candidate_agent.api.stats import percentile
+
+logger = structlog.get_logger(__name__)
+
+# Queue-wait samples kept for the percentile figures in stats()
+_WAIT_SAMPLES = 1024
+
+Key = tuple[str, str]  # (kind, correlation_id)
+
+
+@dataclass(eq=False)
+class Job:
+    kind: str
+    run: Callable[[], Awaitable[Any]]
+    key: Key | None = None
+    fingerprint: str = ""
+    run_id: str = field(default_factory=lambda: str(uuid4()))
+    status: str = "queued"  # queued | running | succeeded | failed | cancelled
+    submitted_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    result: Any = None
+    error: str | None = None
+
+    @property
+    def queue_wait_ms(self) -> float | None:
+        if self.started_at is None:
+            return None
+        return round((self.started_at - self.submitted_at) * 1000, 1)
+
+
+class JobQueue:
+    """Bounded FIFO of runs executed by ``workers`` tasks, with TTL'd results."""
+
+    def __init__(self, tracker: RunTracker, max_depth: int, workers: int, result_ttl: float) -> None:
+        self._tracker = tracker
+        self._queue: asyncio.Queue[Job] = asyncio.Queue(maxsize=max_depth)
+        self._jobs: dict[str, Job] = {}
+        self._by_key: dict[Key, Job] = {}  # live or succeeded job per correlation_id
+        self._finished: OrderedDict[str, float] = OrderedDict()  # run_id → finished_at
+        self._waits: deque[float] = deque(maxlen=_WAIT_SAMPLES)
+        self._workers = workers
+        self._tasks: list[asyncio.Task] = []
+        self._result_ttl = result_ttl
+        self.busy = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.deduplicated = 0  # retried submits answered with the existing job
+        self.conflicts = 0  # same correlation_id, different body (422)
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self._workers)]
+        logger.info("job_workers_started", workers=self._workers, max_depth=self._queue.maxsize)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        # Anything still queued will never run — release its drain count
+        while not self._queue.empty():
+            job = self._queue.get_nowait()
+            job.status, job.error = "cancelled", "Server shut down before the run started"
+            self.cancelled += 1
+            self._release(job)
+            self._tracker.end()
+
+    def submit(
+        self,
+        kind: str,
+        run: Callable[[], Awaitable[Any]],
+        correlation_id: str | None = None,
+        fingerprint: str = "",
+    ) -> tuple[Job, bool]:
+        """Enqueue ``run`` (a zero-arg coroutine factory) and return ``(job, deduplicated)``.
+
+        A submit whose ``correlation_id`` already has a queued, running or succeeded
+        job of the same ``kind`` returns that job instead (422 if ``fingerprint``
+        differs). 503 when draining, 429 when full.
+        """
+        self._expire()
+        key = (kind, correlation_id) if correlation_id else None
+        existing = self._by_key.get(key) if key else None
+        if existing is not None:
+            if existing.fingerprint != fingerprint:
+                self.conflicts += 1
+                raise HTTPException(
+                    status_code=422,
+                    detail=f"correlation_id {correlation_id!r} was already used for a different request",
+                )
+            self.deduplicated += 1
+            logger.info("run_submit_deduplicated", run_id=existing.run_id, correlation_id=correlation_id)
+            return existing, True
+
+        self._tracker.reject_if_draining()
+        job = Job(kind=kind, run=run, key=key, fingerprint=fingerprint)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise HTTPException(
+                status_code=429,
+                detail="Run queue is full; retry later",
+                headers={"Retry-After": "5"},
+            ) from None
+        self._tracker.begin()
+        self._jobs[job.run_id] = job
+        if key:
+            self._by_key[key] = job
+        return job, False
+
+    def get(self, run_id: str) -> Job | None:
+        self._expire()
+        return self._jobs.get(run_id)
+
+    def _expire(self) -> None:
+        cutoff = time.time() - self._result_ttl
+        while self._finished:
+            run_id, finished_at = next(iter(self._finished.items()))
+            if finished_at > cutoff:
+                break
+            del self._finished[run_id]
+            job = self._jobs.pop(run_id, None)
+            if job is not None:
+                self._release(job)
+
+    def _release(self, job: Job) -> None:
+        """Free ``job``'s correlation_id for a new submit."""
+        if job.key and self._by_key.get(job.key) is job:
+            del self._by_key[job.key]
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job = await self._queue.get()
+            job.status, job.started_at = "running", time.time()
+            self._waits.append(job.queue_wait_ms or 0.0)
+            self.busy += 1
+            try:
+                job.result = await job.run()
+                job.status = "succeeded"
+                self.completed += 1
+            except asyncio.CancelledError:
+                job.status, job.error = "cancelled", "Run cancelled during shutdown"
+                self.cancelled += 1
+                self._release(job)
+                raise
+            except RunCancelled as exc:
+                job.status, job.error = "cancelled", str(exc)
+                self.cancelled += 1
+                self._release(job)
+                logger.info("job_cancelled", run_id=job.run_id, kind=job.kind, reason=exc.reason)
+            except Exception as exc:
+                job.status, job.error = "failed", f"Agent error: {exc}"
+                self.failed += 1
+                self._release(job)
+                logger.warning("job_failed", run_id=job.run_id, kind=job.kind, error=str(exc))
+            finally:
+                job.finished_at = time.time()
+                job.run = None  # drop the closure (request, graph refs) once done
+                self._finished[job.run_id] = job.finished_at
+                self.busy -= 1
+                self._tracker.end()
+                self._queue.task_done()
+
+    def stats(self) -> dict:
+        waits = list(self._waits)
+        return {
+            "queue_depth": self._queue.qsize(),
+            "max_depth": self._queue.maxsize,
+            "workers": self._workers,
+            "busy_workers": self.busy,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "deduplicated": self.deduplicated,
+            "conflicts": self.conflicts,
+            "retained_results": len(self._finished),
+            "queue_wait_ms": {
+                "p50": percentile(waits, 0.50),
+                "p95": percentile(waits, 0.95),
+                "max": max(waits) if waits else None,
+            },
+        }
@@ -0,0 +1,303 @@
+"""In-process metrics served at ``/metrics`` in the Prometheus text format.
+
+Until now the service produced only structlog lines. This module keeps a few
+counters and fixed-bucket histograms in memory and renders them on scrape.
+It needs no client library. Everything is recorded on the event loop:
+one dict lookup and a bucket increment per observation.
+
+  • HTTP — ``HTTPMetricsMiddleware`` times every request by method, route
+    template and status. For ``/stream`` the time runs until the last byte
+    is sent, i.e. the whole stream.
+  • Graph, tools, LLM — ``metrics_handler`` is an inline callback handler.
+    ``ActiveRun.config`` (api/cancellation.py) attaches it to every guarded
+    run, next to the token counter. It records:
+      - graph node durations, labelled by node path (``post_apply_assistant``,
+        ``post_apply_assistant/tools``, …);
+      - tool call latency and errors by tool name. Tool-cache hits never reach
+        MCP and are not counted;
+      - LLM latency, time to first token and input/output/cache tokens by
+        model. TTFT is only known for streamed calls (the ``/stream`` and
+        WebSocket routes).
+  • Read at scrape time (api/routes/metrics.py): gauges such as in-flight runs
+    and queue depth, and the counters other modules already keep in their
+    ``*_stats`` objects or controllers (cancellations, admission sheds, PII
+    redactions, …), so ``/metrics`` is the one place to read them all.
+
+Durations are in seconds, following Prometheus conventions.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Mapping
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import ToolMessage
+from langchain_core.outputs import LLMResult
+
+PREFIX = "candidate_agent_"
+
+# Histogram upper bounds in seconds; the last bucket is +Inf
+REQUEST_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+TOOL_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+@dataclass
+class Counter:
+    name: str
+    help: str
+    labelnames: tuple[str, ...] = ()
+    values: dict[tuple[str, ...], float] = field(default_factory=dict)
+
+    type_name = "counter"
+
+    @classmethod
+    def of(cls, name: str, help: str, label: str, counts: Mapping[str, float]) -> "Counter":
+        """A one-label family read from an existing ``*_stats`` counter at scrape time."""
+        return cls(name, help, (label,), {(key,): value for key, value in counts.items()})
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        name = PREFIX + self.name
+        lines = [f"# HELP {name} {self.help}", f"# TYPE {name} {self.type_name}"]
+        for labels, value in self.values.items():
+            lines.append(f"{name}{_labels(self.labelnames, labels)} {value:g}")
+        return lines
+
+
+class Gauge(Counter):
+    """A current value (in-flight runs, queue depth) rather than a running total."""
+
+    type_name = "gauge"
+
+
+@dataclass
+class Histogram:
+    name: str
+    help: str
+    labelnames: tuple[str, ...] = ()
+    buckets: tuple[float, ...] = REQUEST_BUCKETS
+    # labels → [count per bucket (+Inf last), sum]
+    values: dict[tuple[str, ...], list[float]] = field(default_factory=dict)
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+                break
+        else:
+            series[len(self.buckets)] += 1
+        series[-1] += value
+
+    def render(self) -> list[str]:
+        name = PREFIX + self.name
+        lines = [f"# HELP {name} {self.help}", f"# TYPE {name} histogram"]
+        for labels, series in self.values.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series):
+                cumulative += count
+                le = f'le="{bound:g}"' if bound != "+Inf" else 'le="+Inf"'
+                lines.append(f"{name}_bucket{_labels(self.labelnames, labels, le)} {cumulative:g}")
+            lines.append(f"{name}_sum{_labels(self.labelnames, labels)} {series[-1]:.6f}")
+            lines.append(f"{name}_count{_labels(self.labelnames, labels)} {cumulative:g}")
+        return lines
+
+
+http_request_seconds = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status")
+)
+node_seconds = Histogram("graph_node_duration_seconds", "Graph node duration", ("node",))
+tool_seconds = Histogram("tool_call_duration_seconds", "Tool call latency", ("tool",), TOOL_BUCKETS)
+tool_errors = Counter("tool_call_errors_total", "Tool calls that raised or returned an error", ("tool",))
+llm_seconds = Histogram("llm_call_duration_seconds", "LLM call latency", ("model",))
+llm_ttft_seconds = Histogram(
+    "llm_time_to_first_token_seconds", "Time to first streamed token of an LLM call", ("model",)
+)
+llm_tokens = Counter(
+    "llm_tokens_total", "LLM tokens by type (input, output, cache_read, cache_creation)", ("model", "type")
+)
+llm_errors = Counter("llm_call_errors_total", "LLM calls that raised", ("model",))
+
+METRICS: list[Counter | Histogram] = [
+    http_request_seconds,
+    node_seconds,
+    tool_seconds,
+    tool_errors,
+    llm_seconds,
+    llm_ttft_seconds,
+    llm_tokens,
+    llm_errors,
+]
+
+
+def render(collected: Iterable[Counter] = ()) -> str:
+    """The exposition text: every metric above, plus ``collected`` ones built at scrape time."""
+    lines: list[str] = []
+    for metric in (*METRICS, *collected):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ── Graph / tool / LLM callbacks ─────────────────────────────────────────────
+
+
+def _node_path(checkpoint_ns: str) -> str:
+    """``post_apply_assistant:<id>|tools:<id>`` → ``post_apply_assistant/tools``."""
+    return "/".join(part.split(":", 1)[0] for part in checkpoint_ns.split("|"))
+
+
+def _model_name(metadata: dict | None, invocation_params: dict | None, serialized: Any) -> str:
+    model = (metadata or {}).get("ls_model_name")
+    if not model and invocation_params:
+        model = invocation_params.get("model") or invocation_params.get("model_name")
+    if not model and isinstance(serialized, dict):
+        model = serialized.get("name")
+    return str(model or "unknown")
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Inline (no executor hop) handler timing graph nodes, tool calls and LLM calls."""
+
+    run_inline = True
+
+    def __init__(self) -> None:
+        self._nodes: dict[UUID, tuple[str, float]] = {}
+        self._tools: dict[UUID, tuple[str, float]] = {}
+        self._llms: dict[UUID, list] = {}  # run_id → [model, started, first token seen]
+
+    # Graph nodes: the chain run LangGraph starts for each node task. A subgraph
+    # also starts a run of its own with the same namespace; that one is skipped.
+    def on_chain_start(
+        self, serialized: Any, inputs: Any, *, run_id: UUID, metadata: dict | None = None, **kwargs: Any
+    ) -> None:
+        if not metadata or metadata.get("langgraph_node") != kwargs.get("name"):
+            return
+        ns = metadata.get("langgraph_checkpoint_ns")
+        if ns and metadata.get("checkpoint_ns") != ns:
+            self._nodes[run_id] = (_node_path(ns), time.perf_counter())
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._nodes.pop(run_id, None)
+        if started is not None:
+            node_seconds.observe(time.perf_counter() - started[1], started[0])
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self.on_chain_end(None, run_id=run_id)  # handoffs end nodes by raising
+
+    def on_tool_start(self, serialized: Any, input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        name = kwargs.get("name") or (serialized or {}).get("name") or "unknown"
+        self._tools[run_id] = (name, time.perf_counter())
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._tools.pop(run_id, None)
+        if started is None:
+            return
+        tool_seconds.observe(time.perf_counter() - started[1], started[0])
+        if isinstance(output, ToolMessage) and output.status == "error":
+            tool_errors.inc(started[0])
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._tools.pop(run_id, None)
+        if started is not None:
+            tool_seconds.observe(time.perf_counter() - started[1], started[0])
+            tool_errors.inc(started[0])
+
+    def on_chat_model_start(
+        self,
+        serialized: Any,
+        messages: Any,
+        *,
+        run_id: UUID,
+        metadata: dict | None = None,
+        invocation_params: dict | None = None,
+        **kwargs: Any,
+    ) -> None:
+        self._llms[run_id] = [_model_name(metadata, invocation_params, serialized), time.perf_counter(), False]
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        call = self._llms.get(run_id)
+        if call is not None and not call[2]:
+            call[2] = True
+            llm_ttft_seconds.observe(time.perf_counter() - call[1], call[0])
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        call = self._llms.pop(run_id, None)
+        if call is None:
+            return
+        model = call[0]
+        llm_seconds.observe(time.perf_counter() - call[1], model)
+        for generations in response.generations:
+            for gen in generations:
+                usage = getattr(getattr(gen, "message", None), "usage_metadata", None)
+                if not usage:
+                    continue
+                llm_tokens.inc(model, "input", amount=usage.get("input_tokens", 0))
+                llm_tokens.inc(model, "output", amount=usage.get("output_tokens", 0))
+                details = usage.get("input_token_details") or {}
+                for kind in ("cache_read", "cache_creation"):
+                    if details.get(kind):
+                        llm_tokens.inc(model, kind, amount=details[kind])
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        call = self._llms.pop(run_id, None)
+        if call is not None:
+            llm_seconds.observe(time.perf_counter() - call[1], call[0])
+            llm_errors.inc(call[0])
+
+
+metrics_handler = MetricsCallbackHandler()
+
+
+# ── HTTP ─────────────────────────────────────────────────────────────────────
+
+
+class HTTPMetricsMiddleware:
+    """ASGI middleware timing HTTP requests until the last body chunk is sent."""
+
+    def __init__(self, app: Callable) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = "500"
+        done = False
+
+        def observe() -> None:
+            nonlocal done
+            done = True
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            http_request_seconds.observe(time.perf_counter() - started, scope["method"], path, status)
+
+        async def send_wrapper(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body") and not done:
+                observe()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not done:  # client went away mid-stream, or the app raised
+                observe()
@@ -0,0 +1,314 @@
+"""Incremental PII redaction for streamed agent output.
+
+Redacting a finished response means buffering all of it, which gives up the
+time-to-first-token benefit of ``/stream``. ``StreamRedactor`` works on the
+token stream instead. It keeps back only the text that could still turn into a
+match and releases everything before it as soon as it is safe:
+
+  • Known identifiers: candidate ids, emails, phone numbers and similar values
+    read from the turn's tool results (``observe``), plus the request's
+    candidate_id. They are matched with an Aho-Corasick automaton that steps
+    one character at a time and keeps its state across chunks. The automaton
+    state's depth is exactly the number of trailing characters that may still
+    begin a match.
+  • Email addresses and phone numbers: matched with regexes over the text not
+    yet released. The trailing word (and a trailing run of phone digits) is
+    held, because the next chunk may extend it.
+
+Lookahead is bounded by ``max_lookahead`` characters. A longer unbroken run is
+released without being checked across its cut. Each character is stepped
+through the automaton once and scanned by the regexes while held, so the cost
+is linear in the output length. Matches become ``[REDACTED_<KIND>]``.
+
+Every source of tokens (stream namespace) has its own scanner: the router, the
+specialist, the fan-out synthesis. Tokens from different sources therefore
+never join into a false match. ``flush`` releases everything held. The streaming engine calls it
+before every non-token event and at the end of the turn.
+
+Only streamed output is redacted. The checkpointed thread, ``/invoke``
+responses and thread history keep the original text.
+"""
+
+import json
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Hashable, Iterable, Iterator
+
+import structlog
+from langchain_core.messages import ToolMessage
+
+from candidate_agent.agents.blob_store import BlobStore, resolve_message
+from candidate_agent.agents.fanout import tool_text
+from candidate_agent.config import Settings
+
+logger = structlog.get_logger(__name__)
+
+DEFAULT_MAX_LOOKAHEAD = 256
+MIN_IDENTIFIER_LENGTH = 4  # shorter values would redact ordinary words and numbers
+
+# Keys whose string values in a tool result are treated as identifiers
+IDENTIFIER_KEYS = frozenset(
+    {
+        "candidateid",
+        "email",
+        "emailaddress",
+        "phone",
+        "phonenumber",
+        "mobile",
+        "nationalid",
+        "ssn",
+        "passportnumber",
+        "dateofbirth",
+        "address",
+    }
+)
+
+_EMAIL = re.compile(
+    r"(?<![\w.%+-])[\w.%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}(?![\w-])"
+)
+_PHONE = re.compile(
+    r"(?<![\w+])(?:\+\d{1,3}[ .-]?)?(?:\(\d{1,4}\)[ .-]?)?\d{2,4}(?:[ .-]?\d{2,4}){1,5}(?!\w)"
+)
+_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_EMAIL_TAIL = re.compile(r"[\w.%+@-]*$")
+_PHONE_TAIL = re.compile(r"(?<![\w+])[+(]?\d[\d().\- ]*$")
+_WORD = re.compile(r"\w")
+
+
+@dataclass
+class RedactionStats:
+    """Process-wide redaction counters."""
+
+    redactions: Counter = field(default_factory=Counter)  # by kind
+    forced_releases: int = 0  # runs longer than the lookahead, released unchecked
+
+    def snapshot(self) -> dict:
+        return {"redactions": dict(self.redactions), "forced_releases": self.forced_releases}
+
+
+redaction_stats = RedactionStats()
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton over lowercase literals, stepped one character at a time."""
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        self.depth: list[int] = [0]
+        self.out: list[tuple[int, ...]] = [()]  # lengths of the patterns ending here
+        for pattern in patterns:
+            self._add(pattern.lower())
+        self._link()
+
+    def _add(self, pattern: str) -> None:
+        state = 0
+        for ch in pattern:
+            nxt = self.goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.depth.append(self.depth[state] + 1)
+                self.out.append(())
+                self.goto[state][ch] = nxt
+            state = nxt
+        self.out[state] += (len(pattern),)
+
+    def _link(self) -> None:
+        queue = list(self.goto[0].values())
+        for state in queue:  # breadth-first; the list grows while iterating
+            for ch, nxt in self.goto[state].items():
+                fail = self.fail[state]
+                while fail and ch not in self.goto[fail]:
+                    fail = self.fail[fail]
+                self.fail[nxt] = self.goto[fail].get(ch, 0)
+                self.out[nxt] += self.out[self.fail[nxt]]
+                queue.append(nxt)
+
+    def step(self, state: int, ch: str) -> int:
+        ch = ch.lower()
+        while state and ch not in self.goto[state]:
+            state = self.fail[state]
+        return self.goto[state].get(ch, 0)
+
+
+def identifiers_in(payload: Any) -> set[str]:
+    """String values under ``IDENTIFIER_KEYS`` anywhere in a decoded tool result."""
+    found: set[str] = set()
+
+    def walk(node: Any) -> None:
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if isinstance(value, (str, int)) and key.lower() in IDENTIFIER_KEYS:
+                    text = str(value).strip()
+                    if len(text) >= MIN_IDENTIFIER_LENGTH:
+                        found.add(text)
+                else:
+                    walk(value)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+
+    walk(payload)
+    return found
+
+
+@dataclass
+class _Scanner:
+    """Unreleased text of one token source and the automaton state at its end."""
+
+    pending: str = ""
+    state: int = 0
+    literal_spans: list[tuple[int, int]] = field(default_factory=list)  # in ``pending``
+    before: str = ""  # last released character, for the regexes' lookbehind
+
+
+class StreamRedactor:
+    """Per-turn redactor; see the module docstring."""
+
+    def __init__(
+        self,
+        *,
+        literals: Iterable[str] = (),
+        blob_store: BlobStore | None = None,
+        max_lookahead: int = DEFAULT_MAX_LOOKAHEAD,
+    ) -> None:
+        self._literals = {v for v in literals if v and len(v) >= MIN_IDENTIFIER_LENGTH}
+        self._automaton = AhoCorasick(self._literals)
+        self._blob_store = blob_store
+        self._max_lookahead = max_lookahead
+        self._scanners: dict[Hashable, _Scanner] = {}
+
+    # ── Identifiers ──────────────────────────────────────────────────────────
+
+    def observe(self, message: ToolMessage) -> None:
+        """Learn identifiers from a tool result; later output redacts them."""
+        if message.status == "error":
+            return
+        try:
+            payload = json.loads(tool_text(resolve_message(message, self._blob_store).content))
+        except ValueError:
+            return
+        new = {v for v in identifiers_in(payload) if v not in self._literals}
+        if new:
+            logger.debug("pii_identifiers_learned", tool=message.name, count=len(new))
+            self.add_literals(new)
+
+    def add_literals(self, literals: Iterable[str]) -> None:
+        self._literals.update(v for v in literals if len(v) >= MIN_IDENTIFIER_LENGTH)
+        self._automaton = AhoCorasick(self._literals)
+        for scanner in self._scanners.values():  # held text is short: rescan it
+            text, scanner.pending, scanner.state, scanner.literal_spans = scanner.pending, "", 0, []
+            self._advance(scanner, text)
+
+    # ── Streaming ────────────────────────────────────────────────────────────
+
+    @property
+    def held(self) -> int:
+        """Characters currently held back, across all sources."""
+        return sum(len(scanner.pending) for scanner in self._scanners.values())
+
+    def feed(self, text: str, source: Hashable = ()) -> str:
+        """Add a chunk from ``source``; return the text now safe to send (may be "")."""
+        scanner = self._scanners.setdefault(source, _Scanner())
+        self._advance(scanner, text)
+        pending = scanner.pending
+        hold = len(pending) - self._automaton.depth[scanner.state]
+        tail = _EMAIL_TAIL.search(pending)
+        hold = min(hold, tail.start())  # type: ignore[union-attr]
+        phone_tail = _PHONE_TAIL.search(pending, max(0, hold - self._max_lookahead))
+        if phone_tail:
+            hold = min(hold, phone_tail.start())
+        if len(pending) - hold > self._max_lookahead:
+            redaction_stats.forced_releases += 1
+            hold = len(pending) - self._max_lookahead
+        return self._release(scanner, hold, final=False)
+
+    def flush(self) -> Iterator[str]:
+        """Release all held text, one string per source that had any."""
+        for scanner in self._scanners.values():
+            if scanner.pending:
+                yield self._release(scanner, len(scanner.pending), final=True)
+            scanner.state = 0
+
+    def _advance(self, scanner: _Scanner, text: str) -> None:
+        """Step the automaton over ``text`` and append it to the held text."""
+        automaton = self._automaton
+        offset = len(scanner.pending)
+        state = scanner.state
+        if len(automaton.goto) > 1:
+            out = automaton.out
+            for i, ch in enumerate(text, offset + 1):
+                state = automaton.step(state, ch)
+                for length in out[state]:
+                    scanner.literal_spans.append((i - length, i))
+        scanner.state = state
+        scanner.pending += text
+
+    def _matches(self, scanner: _Scanner, final: bool) -> list[tuple[int, int, str]]:
+        """Complete matches in the held text as ``(start, end, kind)``, sorted by start."""
+        pending = scanner.pending
+        text = scanner.before + pending  # one character of context for the lookbehinds
+        shift = len(scanner.before)
+        found: list[tuple[int, int, str]] = []
+        for start, end in scanner.literal_spans:
+            before = text[start + shift - 1] if start + shift else ""
+            after = pending[end] if end < len(pending) else ""
+            if not final and not after and _WORD.match(pending[end - 1]):
+                continue  # may continue into the next chunk
+            word_start, word_end = _WORD.match(pending[start]), _WORD.match(pending[end - 1])
+            if (word_start and before and _WORD.match(before)) or (word_end and after and _WORD.match(after)):
+                continue  # part of a longer word or id
+            found.append((start, end, "ID"))
+        for match in _EMAIL.finditer(text, shift):
+            found.append((match.start() - shift, match.end() - shift, "EMAIL"))
+        for match in _PHONE.finditer(text, shift):
+            digits = sum(ch.isdigit() for ch in match.group())
+            if 10 <= digits <= 15 and not _ISO_DATE.match(match.group()):
+                found.append((match.start() - shift, match.end() - shift, "PHONE"))
+        found.sort()
+        return found
+
+    def _release(self, scanner: _Scanner, hold: int, *, final: bool) -> str:
+        """Release ``pending[:hold]`` with its matches replaced; keep the rest held."""
+        matches = self._matches(scanner, final)
+        for start, end, _kind in reversed(matches):  # never cut through a match
+            if start < hold < end:
+                hold = start
+        if hold <= 0:
+            return ""
+
+        pending = scanner.pending
+        parts: list[str] = []
+        cursor = 0
+        for start, end, kind in matches:
+            if end > hold:
+                break
+            if start < cursor:  # overlaps an earlier match (an identifier that is an email)
+                cursor = max(cursor, end)
+                continue
+            parts.append(pending[cursor:start])
+            parts.append(f"[REDACTED_{kind}]")
+            redaction_stats.redactions[kind] += 1
+            cursor = end
+        parts.append(pending[cursor:hold])
+
+        scanner.before = pending[hold - 1]
+        scanner.pending = pending[hold:]
+        scanner.literal_spans = [(s - hold, e - hold) for s, e in scanner.literal_spans if s >= hold]
+        return "".join(parts)
+
+
+def stream_redactor(
+    settings: Settings, candidate_id: str, blob_store: BlobStore | None
+) -> StreamRedactor | None:
+    """A redactor for one streamed turn, or None when PII_REDACTION_ENABLED is off."""
+    if not settings.pii_redaction_enabled:
+        return None
+    return StreamRedactor(
+        literals=[candidate_id],
+        blob_store=blob_store,
+        max_lookahead=settings.pii_redaction_max_lookahead,
+    )
@@ -1,69 +1,71 @@
 """Agent endpoints: synchronous invoke and SSE streaming."""
 
-import json
 from typing import AsyncGenerator
+from uuid import uuid4
 
 import structlog
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
 from fastapi.responses import StreamingResponse
-from langchain_core.messages import AIMessage, HumanMessage
-
-from candidate_agent.api.dependencies import get_graph
+from langchain_core.messages import HumanMessage
+
+from candidate_agent.agents.blob_store import BlobStore
+from candidate_agent.api.cancellation import RunCancelled, watch_disconnect
+from candidate_agent.api.dependencies import (
+    get_blob_store,
+    get_graph,
+    get_idempotency_store,
+    get_run_guard,
+    get_run_tracker,
+    get_settings,
+)
+from candidate_agent.api.drain import RunTracker
+from candidate_agent.api.idempotency import IdempotencyStore, request_fingerprint
+from candidate_agent.api.redaction import stream_redactor
+from candidate_agent.api.run_guard import RunGuard
 from candidate_agent.api.schemas import InvokeRequest, InvokeResponse, StreamRequest
+from candidate_agent.api.sse import SSE_HEADERS, sse_frames
+from candidate_agent.api.streaming import V1_STREAM, stream_turn
+from candidate_agent.api.turns import extract_turn
+from candidate_agent.config import Settings
 
 logger = structlog.get_logger(__name__)
 
 router = APIRouter(tags=["agent"])
 
 
-def _build_input(message: str, candidate_id: str, correlation_id: str) -> dict:
+def _build_input(
+    message: str,
+    candidate_id: str,
+    correlation_id: str,
+    max_tool_calls: int | None = None,
+    response_format: str = "text",
+) -> dict:
     """Build the initial graph state for a new turn."""
+    turn_id = str(uuid4())
     return {
-        "messages": [HumanMessage(content=message)],
+        "messages": [HumanMessage(content=message, id=turn_id)],
+        "turn_id": turn_id,
+        "tool_call_budget": max_tool_calls or 0,
+        "response_format": response_format,
         "candidate_id": candidate_id,
         "correlation_id": correlation_id,
         "active_agent": "candidate_primary",
+        "tool_context": {},
     }
 
 
 def _extract_result(final_state: dict, thread_id: str, correlation_id: str) -> InvokeResponse:
-    """Pull the last AIMessage and tool-call names from the final graph state."""
-    messages = final_state.get("messages", [])
-
-    # Last AI message is the final answer
-    response_text = ""
-    for msg in reversed(messages):
-        if isinstance(msg, AIMessage) and msg.content:
-            response_text = (
-                msg.content if isinstance(msg.content, str)
-                else " ".join(
-                    block.get("text", "") for block in msg.content
-                    if isinstance(block, dict) and block.get("type") == "text"
-                )
-            )
-            break
-
-    # Collect all tool names that were called
-    tool_calls: list[str] = []
-    for msg in messages:
-        if isinstance(msg, AIMessage) and msg.tool_calls:
-            tool_calls.extend(tc["name"] for tc in msg.tool_calls)
-
-    return InvokeResponse(
+    """Build the response from this turn's messages only (see api/turns.py)."""
+    turn = extract_turn(final_state.get("messages", []), final_state.get("turn_id"))
+    return turn.to_response(
         thread_id=thread_id,
         correlation_id=correlation_id,
-        response=response_text,
         agent_used=final_state.get("active_agent", "candidate_primary"),
-        tool_calls=tool_calls,
     )
 
 
-@router.post("/invoke", response_model=InvokeResponse)
-async def invoke(req: InvokeRequest, graph=Depends(get_graph)) -> InvokeResponse:
-    """Run the multi-agent graph synchronously and return the final response.
-
-    Blocks until the agent produces a final answer. Use `/stream` for token-level streaming.
-    """
+async def _invoke_v1(graph, req: InvokeRequest, guard: RunGuard) -> InvokeResponse:
+    """Run one v1 turn to completion; errors propagate to the caller."""
     log = logger.bind(
         thread_id=req.thread_id,
         correlation_id=req.correlation_id,
@@ -74,21 +76,81 @@ async def invoke(req: InvokeRequest, graph=Depends(get_graph)) -> InvokeResponse
     config = {"configurable": {"thread_id": req.thread_id}}
 
     try:
-        final_state = await graph.ainvoke(
-            _build_input(req.message, req.candidate_id, req.correlation_id),
-            config=config,
-        )
+        async with guard.enter(
+            correlation_id=req.correlation_id,
+            thread_id=req.thread_id,
+            candidate_id=req.candidate_id,
+        ) as run:
+            final_state = await graph.ainvoke(
+                _build_input(
+                    req.message,
+                    req.candidate_id,
+                    req.correlation_id,
+                    req.max_tool_calls,
+                    req.response_format,
+                ),
+                config=run.config(config),
+            )
+    except (RunCancelled, HTTPException):
+        raise
     except Exception as exc:
         log.error("invoke_error", error=str(exc), exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Agent error: {exc}") from exc
+        raise
 
     result = _extract_result(final_state, req.thread_id, req.correlation_id)
     log.info("invoke_complete", agent_used=result.agent_used, tool_calls=result.tool_calls)
     return result
 
 
+@router.post("/invoke", response_model=InvokeResponse)
+async def invoke(
+    req: InvokeRequest,
+    response: Response,
+    graph=Depends(get_graph),
+    tracker: RunTracker = Depends(get_run_tracker),
+    guard: RunGuard = Depends(get_run_guard),
+    idempotency: IdempotencyStore = Depends(get_idempotency_store),
+) -> InvokeResponse:
+    """Run the multi-agent graph synchronously and return the final response.
+
+    Blocks until the agent produces a final answer. Use `/stream` for token-level
+    streaming, or `POST /api/v1/agent/runs` to submit and poll. Answers 499 if
+    the run is cancelled via `POST /api/runs/cancel/{correlation_id}`. A retry
+    with the same ``correlation_id`` and body gets this run's result instead of
+    starting a new run. ``response_format="json"`` returns a short structured
+    answer in ``structured`` instead of narrative prose.
+    """
+    tracker.reject_if_draining()
+    try:
+        async with tracker.track():
+            result, replayed = await idempotency.invoke(
+                ("v1/invoke", req.correlation_id),
+                request_fingerprint(req),
+                lambda: _invoke_v1(graph, req, guard),
+            )
+    except HTTPException:
+        raise
+    except RunCancelled as exc:
+        raise HTTPException(status_code=499, detail=str(exc)) from exc
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Agent error: {exc}") from exc
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
+
+
 @router.post("/stream")
-async def stream(req: StreamRequest, graph=Depends(get_graph)) -> StreamingResponse:
+async def stream(
+    req: StreamRequest,
+    request: Request,
+    last_event_id: int | None = Header(None, ge=0),
+    graph=Depends(get_graph),
+    tracker: RunTracker = Depends(get_run_tracker),
+    settings: Settings = Depends(get_settings),
+    guard: RunGuard = Depends(get_run_guard),
+    idempotency: IdempotencyStore = Depends(get_idempotency_store),
+    blob_store: BlobStore | None = Depends(get_blob_store),
+) -> StreamingResponse:
     """Stream agent events as Server-Sent Events (SSE).
 
     Event types emitted:
@@ -96,7 +158,12 @@ async def stream(req: StreamRequest, graph=Depends(get_graph)) -> StreamingRespo
     - ``tool_call`` — tool invocation start (data: {name: str})
     - ``handoff``   — agent handoff (data: {from: str, to: str})
     - ``done``      — stream complete (data: {active_agent: str, tool_calls: [str]})
-    - ``error``     — unhandled error (data: {detail: str})
+    - ``error``     — unhandled error or cancellation (data: {detail: str})
+
+    A retry with the same ``correlation_id`` and body replays this run's
+    events instead of starting a new run (see api/idempotency.py). Frames carry
+    ``id:`` lines; with a ``Last-Event-ID`` header the retry resumes after that
+    event, or answers 410 if the run is no longer kept.
     """
     log = logger.bind(
         thread_id=req.thread_id,
@@ -104,67 +171,64 @@ async def stream(req: StreamRequest, graph=Depends(get_graph)) -> StreamingRespo
         candidate_id=req.candidate_id,
     )
     log.info("stream_start")
+    tracker.reject_if_draining()
 
     config = {"configurable": {"thread_id": req.thread_id}}
-    input_state = _build_input(req.message, req.candidate_id, req.correlation_id)
-
-    async def event_generator() -> AsyncGenerator[str, None]:
-        tool_calls_seen: list[str] = []
-        active_agent = "candidate_primary"
-
-        try:
-            async for event in graph.astream_events(input_state, config=config, version="v2"):
-                event_name = event.get("event", "")
-                event_data = event.get("data", {})
-                node_name = event.get("name", "")
-
-                if event_name == "on_chat_model_stream":
-                    chunk = event_data.get("chunk")
-                    if chunk and chunk.content:
-                        content = (
-                            chunk.content if isinstance(chunk.content, str)
-                            else "".join(
-                                b.get("text", "")
-                                for b in chunk.content
-                                if isinstance(b, dict) and b.get("type") == "text"
-                            )
-                        )
-                        if content:
-                            yield f"data: {json.dumps({'event': 'token', 'data': {'content': content}})}\n\n"
-
-                elif event_name == "on_tool_start":
-                    tool_name = node_name or event.get("run_id", "unknown")
-                    tool_calls_seen.append(tool_name)
-                    yield f"data: {json.dumps({'event': 'tool_call', 'data': {'name': tool_name}})}\n\n"
-
-                elif event_name == "on_chain_start" and "job_application_agent" in node_name:
-                    active_agent = "job_application_agent"
-                    yield (
-                        f"data: {json.dumps({'event': 'handoff', 'data': {'from': 'candidate_primary', 'to': 'job_application_agent'}})}\n\n"
-                    )
-
-                elif event_name == "on_chain_end" and node_name in (
-                    "candidate_primary",
-                    "job_application_agent",
-                ):
-                    # Track which agent last produced output
-                    active_agent = node_name
-
-            yield (
-                f"data: {json.dumps({'event': 'done', 'data': {'active_agent': active_agent, 'tool_calls': tool_calls_seen}})}\n\n"
-            )
-            log.info("stream_complete", active_agent=active_agent, tool_calls=tool_calls_seen)
+    input_state = _build_input(req.message, req.candidate_id, req.correlation_id, req.max_tool_calls)
+
+    async def events() -> AsyncGenerator[tuple[str, dict], None]:
+        async with tracker.track():
+            try:
+                async with guard.enter(
+                    correlation_id=req.correlation_id,
+                    thread_id=req.thread_id,
+                    candidate_id=req.candidate_id,
+                ) as run:
+                    async for item in stream_turn(
+                        graph,
+                        input_state,
+                        run.config(config),
+                        V1_STREAM,
+                        log,
+                        stream_redactor(settings, req.candidate_id, blob_store),
+                    ):
+                        yield item
+            except RunCancelled as exc:
+                yield "error", {"detail": str(exc)}
+            except HTTPException as exc:  # 409 thread busy / 429 at capacity
+                yield "error", {"detail": exc.detail}
+
+    def start() -> AsyncGenerator[tuple[str, dict], None]:
+        guard.fast_fail(thread_id=req.thread_id, candidate_id=req.candidate_id)
+        return events()
+
+    subscription, detach, replayed = idempotency.stream(
+        ("v1/stream", req.correlation_id), request_fingerprint(req), start, last_event_id
+    )
+    return StreamingResponse(
+        # Tokens were coalesced before the channel recorded them: one event, one frame
+        sse_frames(watch_disconnect(request, subscription, detach), coalesce_bytes=0),
+        media_type="text/event-stream",
+        headers={**SSE_HEADERS, "Idempotent-Replayed": "true"} if replayed else SSE_HEADERS,
+    )
+
 
-        except Exception as exc:
-            log.error("stream_error", error=str(exc), exc_info=True)
-            yield f"data: {json.dumps({'event': 'error', 'data': {'detail': str(exc)}})}\n\n"
+@router.get("/stream/{correlation_id}")
+async def resume_stream(
+    correlation_id: str,
+    request: Request,
+    last_event_id: int = Header(0, ge=0),
+    idempotency: IdempotencyStore = Depends(get_idempotency_store),
+) -> StreamingResponse:
+    """Resume the ``/stream`` run for ``correlation_id`` after ``Last-Event-ID``.
 
+    Replays the buffered events after that id, then follows the live run. No
+    new run is started: 410 if the run is no longer kept.
+    """
+    subscription, detach = idempotency.resume(("v1/stream", correlation_id), last_event_id)
     return StreamingResponse(
-        event_generator(),
+        # Tokens were coalesced before the channel recorded them: one event, one frame
+        sse_frames(watch_disconnect(request, subscription, detach), coalesce_bytes=0),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",  # Disable Nginx buffering
-        },
+        headers={**SSE_HEADERS, "Idempotent-Replayed": "true"},
     )
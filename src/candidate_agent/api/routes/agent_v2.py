@@ -5,42 +5,64 @@ post_apply_assistant) and accepts an optional ``application_id`` field that is
 passed into the PostApplyAgentState.
 """
 
+import asyncio
 import json
 from typing import AsyncGenerator
+from uuid import uuid4
 
 import structlog
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
 from fastapi.responses import StreamingResponse
-from langchain_core.messages import AIMessage, HumanMessage
-from langfuse.langchain import CallbackHandler
- 
-from candidate_agent.api.dependencies import get_v2_graph
-from candidate_agent.api.schemas import InvokeResponse, V2InvokeRequest, V2StreamRequest
-import os
-
-
-LANGFUSE_SECRET_KEY="sk-lf-1205fdff-cde4-409a-9b14-b9798dfa1ec0"
-LANGFUSE_PUBLIC_KEY="pk-lf-77cf9a70-8fe4-4d9e-9cde-3d8aab018b72"
-LANGFUSE_BASE_URL="http://localhost:3000"
-
-os.environ["LANGFUSE_SECRET_KEY"] = LANGFUSE_SECRET_KEY
-os.environ["LANGFUSE_PUBLIC_KEY"] = LANGFUSE_PUBLIC_KEY
-os.environ["LANGFUSE_BASE_URL"] = LANGFUSE_BASE_URL
+from langchain_core.messages import HumanMessage
+
+from candidate_agent.agents.blob_store import BlobStore
+from candidate_agent.agents.tool_cache import ToolResultCache
+from candidate_agent.api.cancellation import RunCancelled, watch_disconnect
+from candidate_agent.api.dependencies import (
+    get_blob_store,
+    get_idempotency_store,
+    get_run_guard,
+    get_run_tracker,
+    get_settings,
+    get_tracer,
+    get_v2_graph,
+)
+from candidate_agent.api.drain import RunTracker
+from candidate_agent.api.idempotency import IdempotencyStore, request_fingerprint
+from candidate_agent.api.redaction import stream_redactor
+from candidate_agent.api.run_guard import RunGuard
+from candidate_agent.api.schemas import (
+    InvokeResponse,
+    V2BatchInvokeRequest,
+    V2InvokeRequest,
+    V2StreamRequest,
+)
+from candidate_agent.api.sse import SSE_HEADERS, sse_frames
+from candidate_agent.api.streaming import V2_STREAM, stream_turn
+from candidate_agent.api.tracing import RunTracer, traced_events
+from candidate_agent.api.turns import extract_turn
+from candidate_agent.config import Settings
 
 logger = structlog.get_logger(__name__)
 
 router = APIRouter(tags=["agent-v2"])
-langfuse_handler = CallbackHandler()
+
 
 def _build_v2_input(
     message: str,
     candidate_id: str,
     application_id: str,
     correlation_id: str,
+    max_tool_calls: int | None = None,
+    response_format: str = "text",
 ) -> dict:
     """Build the initial v2 graph state for a new turn."""
+    turn_id = str(uuid4())
     return {
-        "messages": [HumanMessage(content=message)],
+        "messages": [HumanMessage(content=message, id=turn_id)],
+        "turn_id": turn_id,
+        "tool_call_budget": max_tool_calls or 0,
+        "response_format": response_format,
         "candidate_id": candidate_id,
         "application_id": application_id,
         "correlation_id": correlation_id,
@@ -49,43 +71,28 @@ def _build_v2_input(
 
 
 def _extract_result(final_state: dict, thread_id: str, correlation_id: str) -> InvokeResponse:
-    """Pull the last AIMessage and tool-call names from the final v2 graph state."""
-    messages = final_state.get("messages", [])
-
-    response_text = ""
-    for msg in reversed(messages):
-        if isinstance(msg, AIMessage) and msg.content:
-            response_text = (
-                msg.content if isinstance(msg.content, str)
-                else " ".join(
-                    block.get("text", "")
-                    for block in msg.content
-                    if isinstance(block, dict) and block.get("type") == "text"
-                )
-            )
-            break
-
-    tool_calls: list[str] = []
-    for msg in messages:
-        if isinstance(msg, AIMessage) and msg.tool_calls:
-            tool_calls.extend(tc["name"] for tc in msg.tool_calls)
-
-    return InvokeResponse(
+    """Build the response from this turn's messages only (see api/turns.py)."""
+    turn = extract_turn(final_state.get("messages", []), final_state.get("turn_id"))
+    return turn.to_response(
         thread_id=thread_id,
         correlation_id=correlation_id,
-        response=response_text,
         agent_used=final_state.get("active_agent", "v2_primary_assistant"),
-        tool_calls=tool_calls,
     )
 
 
-@router.post("/invoke", response_model=InvokeResponse)
-async def v2_invoke(req: V2InvokeRequest, graph=Depends(get_v2_graph)) -> InvokeResponse:
-    """Run the v2 agent graph synchronously and return the final response.
+async def _invoke_v2(
+    graph,
+    req: V2InvokeRequest,
+    settings: Settings,
+    guard: RunGuard,
+    tracer: RunTracer,
+    route: str,
+    tool_cache: ToolResultCache | None = None,
+    trace_opt_in: bool = False,
+) -> InvokeResponse:
+    """Run one v2 turn to completion; errors propagate to the caller.
 
-    Routes through v2_primary_assistant → post_apply_assistant for all
-    candidate domain queries. The post_apply_assistant speaks directly to
-    the candidate in plain, empathetic language.
+    ``route`` selects the trace sample rate (api/tracing.py).
     """
     log = logger.bind(
         thread_id=req.thread_id,
@@ -95,26 +102,185 @@ async def v2_invoke(req: V2InvokeRequest, graph=Depends(get_v2_graph)) -> Invoke
     )
     log.info("v2_invoke_start")
 
-    config = {"configurable": {"thread_id": req.thread_id}, "callbacks": [langfuse_handler]}
+    configurable = {
+        "thread_id": req.thread_id,
+        # Speculative specialist is invoke-only: nothing is streamed, so a
+        # cancelled speculative run is never visible to the client.
+        "speculative": settings.v2_speculative_specialist,
+    }
+    if tool_cache is not None:
+        configurable["tool_cache"] = tool_cache
+
+    async with tracer.run(
+        route,
+        input=req.message,
+        opt_in=trace_opt_in,
+        thread_id=req.thread_id,
+        correlation_id=req.correlation_id,
+        candidate_id=req.candidate_id,
+    ) as trace:
+        config = {"configurable": configurable, "callbacks": trace.callbacks}
+        try:
+            async with guard.enter(
+                correlation_id=req.correlation_id,
+                thread_id=req.thread_id,
+                candidate_id=req.candidate_id,
+            ) as run:
+                final_state = await graph.ainvoke(
+                    _build_v2_input(
+                        req.message,
+                        req.candidate_id,
+                        req.application_id,
+                        req.correlation_id,
+                        req.max_tool_calls,
+                        req.response_format,
+                    ),
+                    config=run.config(config),
+                )
+        except (RunCancelled, HTTPException):
+            raise
+        except Exception as exc:
+            log.error("v2_invoke_error", error=str(exc), exc_info=True)
+            raise
+
+        result = _extract_result(final_state, req.thread_id, req.correlation_id)
+        trace.output = result.response
+    log.info("v2_invoke_complete", agent_used=result.agent_used, tool_calls=result.tool_calls)
+    return result
+
+
+@router.post("/invoke", response_model=InvokeResponse)
+async def v2_invoke(
+    req: V2InvokeRequest,
+    response: Response,
+    x_trace: bool = Header(False, description="true traces this run in full"),
+    graph=Depends(get_v2_graph),
+    tracker: RunTracker = Depends(get_run_tracker),
+    settings: Settings = Depends(get_settings),
+    guard: RunGuard = Depends(get_run_guard),
+    idempotency: IdempotencyStore = Depends(get_idempotency_store),
+    tracer: RunTracer = Depends(get_tracer),
+) -> InvokeResponse:
+    """Run the v2 agent graph synchronously and return the final response.
 
+    Routes through v2_primary_assistant → post_apply_assistant for all
+    candidate domain queries. The post_apply_assistant speaks directly to
+    the candidate in plain, empathetic language. Answers 499 if the run is
+    cancelled via `POST /api/runs/cancel/{correlation_id}`. A retry with the
+    same ``correlation_id`` and body gets this run's result instead of starting
+    a new run. ``response_format="json"`` returns a short structured answer in
+    ``structured`` instead of narrative prose.
+    """
+    tracker.reject_if_draining()
     try:
-        final_state = await graph.ainvoke(
-            _build_v2_input(
-                req.message, req.candidate_id, req.application_id, req.correlation_id
-            ),
-            config=config,
-        )
+        async with tracker.track():
+            result, replayed = await idempotency.invoke(
+                ("v2/invoke", req.correlation_id),
+                request_fingerprint(req),
+                lambda: _invoke_v2(
+                    graph, req, settings, guard, tracer, "v2/invoke", trace_opt_in=x_trace
+                ),
+            )
+    except HTTPException:
+        raise
+    except RunCancelled as exc:
+        raise HTTPException(status_code=499, detail=str(exc)) from exc
     except Exception as exc:
-        log.error("v2_invoke_error", error=str(exc), exc_info=True)
         raise HTTPException(status_code=500, detail=f"Agent error: {exc}") from exc
-
-    result = _extract_result(final_state, req.thread_id, req.correlation_id)
-    log.info("v2_invoke_complete", agent_used=result.agent_used, tool_calls=result.tool_calls)
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
     return result
 
 
+@router.post("/invoke/batch")
+async def v2_invoke_batch(
+    req: V2BatchInvokeRequest,
+    x_trace: bool = Header(False, description="true traces every item in full"),
+    graph=Depends(get_v2_graph),
+    tracker: RunTracker = Depends(get_run_tracker),
+    settings: Settings = Depends(get_settings),
+    guard: RunGuard = Depends(get_run_guard),
+    tracer: RunTracer = Depends(get_tracer),
+) -> StreamingResponse:
+    """Run many v2 invoke requests concurrently and stream results as NDJSON.
+
+    One line per item, in completion order:
+    - ``{"index": int, "status": "ok", "result": InvokeResponse}``
+    - ``{"index": int, "status": "error", "thread_id": str, "correlation_id": str, "detail": str}``
+
+    A failing item never affects the others. All items share one tool-result
+    cache, so identical MCP calls across candidates (e.g. the same ``getJob``)
+    are made once per batch. Each item can be cancelled by its ``correlation_id``.
+    """
+    if len(req.items) > settings.v2_batch_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch has {len(req.items)} items; the limit is {settings.v2_batch_max_items}",
+        )
+    tracker.reject_if_draining()
+
+    concurrency = min(
+        req.max_concurrency or settings.v2_batch_max_concurrency, settings.v2_batch_max_concurrency
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+    tool_cache = ToolResultCache()
+    log = logger.bind(items=len(req.items), max_concurrency=concurrency)
+    log.info("v2_batch_start")
+
+    async def run_item(index: int, item: V2InvokeRequest) -> dict:
+        async with semaphore:
+            try:
+                result = await _invoke_v2(
+                    graph, item, settings, guard, tracer, "v2/invoke/batch", tool_cache, x_trace
+                )
+            except Exception as exc:
+                return {
+                    "index": index,
+                    "status": "error",
+                    "thread_id": item.thread_id,
+                    "correlation_id": item.correlation_id,
+                    "detail": f"Agent error: {exc}",
+                }
+        return {"index": index, "status": "ok", "result": result.model_dump()}
+
+    async def lines() -> AsyncGenerator[str, None]:
+        async with tracker.track():
+            tasks = [asyncio.create_task(run_item(i, item)) for i, item in enumerate(req.items)]
+            failed = 0
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    line = await next_done
+                    failed += line["status"] == "error"
+                    yield json.dumps(line) + "\n"
+            finally:
+                # Client went away or the batch finished — never leave item runs behind
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+            log.info(
+                "v2_batch_complete",
+                failed=failed,
+                tool_cache_hits=tool_cache.hits,
+                tool_cache_misses=tool_cache.misses,
+            )
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 @router.post("/stream")
-async def v2_stream(req: V2StreamRequest, graph=Depends(get_v2_graph)) -> StreamingResponse:
+async def v2_stream(
+    req: V2StreamRequest,
+    request: Request,
+    last_event_id: int | None = Header(None, ge=0),
+    x_trace: bool = Header(False, description="true traces this run in full"),
+    graph=Depends(get_v2_graph),
+    tracker: RunTracker = Depends(get_run_tracker),
+    settings: Settings = Depends(get_settings),
+    guard: RunGuard = Depends(get_run_guard),
+    idempotency: IdempotencyStore = Depends(get_idempotency_store),
+    blob_store: BlobStore | None = Depends(get_blob_store),
+    tracer: RunTracer = Depends(get_tracer),
+) -> StreamingResponse:
     """Stream v2 agent events as Server-Sent Events (SSE).
 
     Event types emitted:
@@ -122,7 +288,12 @@ async def v2_stream(req: V2StreamRequest, graph=Depends(get_v2_graph)) -> Stream
     - ``tool_call`` — tool invocation start (data: {name: str})
     - ``handoff``   — agent handoff (data: {from: str, to: str})
     - ``done``      — stream complete (data: {active_agent: str, tool_calls: [str]})
-    - ``error``     — unhandled error (data: {detail: str})
+    - ``error``     — unhandled error or cancellation (data: {detail: str})
+
+    A retry with the same ``correlation_id`` and body replays this run's
+    events instead of starting a new run (see api/idempotency.py). Frames carry
+    ``id:`` lines; with a ``Last-Event-ID`` header the retry resumes after that
+    event, or answers 410 if the run is no longer kept.
     """
     log = logger.bind(
         thread_id=req.thread_id,
@@ -131,68 +302,81 @@ async def v2_stream(req: V2StreamRequest, graph=Depends(get_v2_graph)) -> Stream
         application_id=req.application_id,
     )
     log.info("v2_stream_start")
+    tracker.reject_if_draining()
 
-    config = {"configurable": {"thread_id": req.thread_id}, "callbacks": [langfuse_handler]}
     input_state = _build_v2_input(
-        req.message, req.candidate_id, req.application_id, req.correlation_id
+        req.message,
+        req.candidate_id,
+        req.application_id,
+        req.correlation_id,
+        req.max_tool_calls,
     )
 
-    async def event_generator() -> AsyncGenerator[str, None]:
-        tool_calls_seen: list[str] = []
-        active_agent = "v2_primary_assistant"
-
-        try:
-            async for event in graph.astream_events(input_state, config=config, version="v2"):
-                event_name = event.get("event", "")
-                event_data = event.get("data", {})
-                node_name = event.get("name", "")
-
-                if event_name == "on_chat_model_stream":
-                    chunk = event_data.get("chunk")
-                    if chunk and chunk.content:
-                        content = (
-                            chunk.content if isinstance(chunk.content, str)
-                            else "".join(
-                                b.get("text", "")
-                                for b in chunk.content
-                                if isinstance(b, dict) and b.get("type") == "text"
-                            )
-                        )
-                        if content:
-                            yield f"data: {json.dumps({'event': 'token', 'data': {'content': content}})}\n\n"
-
-                elif event_name == "on_tool_start":
-                    tool_name = node_name or event.get("run_id", "unknown")
-                    tool_calls_seen.append(tool_name)
-                    yield f"data: {json.dumps({'event': 'tool_call', 'data': {'name': tool_name}})}\n\n"
-
-                elif event_name == "on_chain_start" and "post_apply_assistant" in node_name:
-                    active_agent = "post_apply_assistant"
-                    yield (
-                        f"data: {json.dumps({'event': 'handoff', 'data': {'from': 'v2_primary_assistant', 'to': 'post_apply_assistant'}})}\n\n"
-                    )
-
-                elif event_name == "on_chain_end" and node_name in (
-                    "v2_primary_assistant",
-                    "post_apply_assistant",
-                ):
-                    active_agent = node_name
-
-            yield (
-                f"data: {json.dumps({'event': 'done', 'data': {'active_agent': active_agent, 'tool_calls': tool_calls_seen}})}\n\n"
-            )
-            log.info("v2_stream_complete", active_agent=active_agent, tool_calls=tool_calls_seen)
+    async def events() -> AsyncGenerator[tuple[str, dict], None]:
+        async with tracker.track(), tracer.run(
+            "v2/stream",
+            input=req.message,
+            opt_in=x_trace,
+            thread_id=req.thread_id,
+            correlation_id=req.correlation_id,
+            candidate_id=req.candidate_id,
+        ) as trace:
+            config = {"configurable": {"thread_id": req.thread_id}, "callbacks": trace.callbacks}
+            try:
+                async with guard.enter(
+                    correlation_id=req.correlation_id,
+                    thread_id=req.thread_id,
+                    candidate_id=req.candidate_id,
+                ) as run:
+                    async for item in traced_events(
+                        stream_turn(
+                            graph,
+                            input_state,
+                            run.config(config),
+                            V2_STREAM,
+                            log,
+                            stream_redactor(settings, req.candidate_id, blob_store),
+                        ),
+                        trace,
+                    ):
+                        yield item
+            except RunCancelled as exc:
+                yield "error", {"detail": str(exc)}
+            except HTTPException as exc:  # 409 thread busy / 429 at capacity
+                yield "error", {"detail": exc.detail}
+
+    def start() -> AsyncGenerator[tuple[str, dict], None]:
+        guard.fast_fail(thread_id=req.thread_id, candidate_id=req.candidate_id)
+        return events()
+
+    subscription, detach, replayed = idempotency.stream(
+        ("v2/stream", req.correlation_id), request_fingerprint(req), start, last_event_id
+    )
+    return StreamingResponse(
+        # Tokens were coalesced before the channel recorded them: one event, one frame
+        sse_frames(watch_disconnect(request, subscription, detach), coalesce_bytes=0),
+        media_type="text/event-stream",
+        headers={**SSE_HEADERS, "Idempotent-Replayed": "true"} if replayed else SSE_HEADERS,
+    )
 
-        except Exception as exc:
-            log.error("v2_stream_error", error=str(exc), exc_info=True)
-            yield f"data: {json.dumps({'event': 'error', 'data': {'detail': str(exc)}})}\n\n"
 
+@router.get("/stream/{correlation_id}")
+async def v2_resume_stream(
+    correlation_id: str,
+    request: Request,
+    last_event_id: int = Header(0, ge=0),
+    settings: Settings = Depends(get_settings),
+    idempotency: IdempotencyStore = Depends(get_idempotency_store),
+) -> StreamingResponse:
+    """Resume the ``/stream`` run for ``correlation_id`` after ``Last-Event-ID``.
+
+    Replays the buffered events after that id, then follows the live run. No
+    new run is started: 410 if the run is no longer kept.
+    """
+    subscription, detach = idempotency.resume(("v2/stream", correlation_id), last_event_id)
     return StreamingResponse(
-        event_generator(),
+        # Tokens were coalesced before the channel recorded them: one event, one frame
+        sse_frames(watch_disconnect(request, subscription, detach), coalesce_bytes=0),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        },
+        headers={**SSE_HEADERS, "Idempotent-Replayed": "true"},
     )
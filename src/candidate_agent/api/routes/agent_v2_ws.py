@@ -0,0 +1,235 @@
+"""v2 WebSocket session: successive turns on one connection.
+
+``/api/v2/agent/stream`` costs one HTTP request per turn, and the client cannot
+send anything while a stream is open. ``/api/v2/agent/ws`` binds one
+connection to a ``thread_id`` and ``candidate_id`` (query parameters; the
+thread is generated if omitted) and runs a turn for every message the client
+sends.
+
+Client → server (JSON text frames):
+  - ``{"type": "message", "message": str, "correlation_id"?: str,
+       "application_id"?: str, "max_tool_calls"?: int, "trace"?: bool}`` — start a
+    turn (``trace: true`` traces it in full, see api/tracing.py)
+  - ``{"type": "cancel", "correlation_id"?: str}`` — cancel that turn, or every
+    running turn on this connection
+
+Server → client: the SSE event schema plus the turn's ``correlation_id``:
+``{"event": ..., "data": {...}, "correlation_id": ...}`` (omitted on
+connection-level frames). Event types are
+token, tool_call, handoff, done, and error, plus ``session`` (sent once, with the
+thread id) and ``heartbeat`` (every WS_HEARTBEAT_SECONDS). Token chunks are
+coalesced and, with PII_REDACTION_ENABLED, redacted exactly as on the SSE routes.
+
+Turns go through the same RunGuard as every other run. A message sent while a
+turn is still running follows THREAD_LOCK_POLICY: by default it waits its
+turn. Closing the connection cancels the connection's running turns.
+
+On drain the server closes the connection with 1012 (service restart) so the
+client reconnects to another instance: as soon as the client sends a frame, or
+once drain has waited for in-flight runs. Running turns finish first, within
+DRAIN_GRACE_SECONDS.
+"""
+
+import asyncio
+import contextlib
+import json
+from uuid import uuid4
+
+import structlog
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, WebSocketException
+from starlette.status import WS_1012_SERVICE_RESTART, WS_1013_TRY_AGAIN_LATER
+from starlette.websockets import WebSocketState
+
+from candidate_agent.api.cancellation import RunCancelled
+from candidate_agent.api.drain import RunTracker
+from candidate_agent.api.redaction import stream_redactor
+from candidate_agent.api.routes.agent_v2 import _build_v2_input
+from candidate_agent.api.run_guard import RunGuard
+from candidate_agent.api.sse import coalesce_tokens, event_json
+from candidate_agent.api.streaming import V2_STREAM, stream_turn
+from candidate_agent.api.tracing import RunTracer, traced_events
+from candidate_agent.config import Settings
+
+logger = structlog.get_logger(__name__)
+
+router = APIRouter(tags=["agent-v2"])
+
+# Outbound frames buffered per connection before turns wait for the client
+_OUTBOUND_MAX = 256
+
+# How long a draining connection waits for queued frames to reach the client
+_DRAIN_FLUSH_SECONDS = 5.0
+
+
+@router.websocket("/ws")
+async def v2_session(
+    websocket: WebSocket,
+    candidate_id: str = "",
+    application_id: str = "",
+    thread_id: str = "",
+) -> None:
+    """Run v2 turns over one WebSocket; see the module docstring for the protocol."""
+    state = websocket.app.state
+    settings: Settings = state.settings
+    tracker: RunTracker = state.run_tracker
+    tracer: RunTracer = state.tracer
+    guard = RunGuard(state.run_registry, state.thread_locks, state.admission)
+    graph = state.v2_graph
+
+    if tracker.draining:
+        raise WebSocketException(code=WS_1013_TRY_AGAIN_LATER, reason="Server is draining")
+    await websocket.accept()
+
+    thread_id = thread_id or str(uuid4())
+    log = logger.bind(thread_id=thread_id, candidate_id=candidate_id)
+    log.info("v2_ws_open")
+
+    outbound: asyncio.Queue[bytes] = asyncio.Queue(maxsize=_OUTBOUND_MAX)
+    turns: dict[str, asyncio.Task] = {}
+
+    async def send(event: str, data: dict, correlation_id: str | None = None) -> None:
+        extra = {"correlation_id": correlation_id} if correlation_id else {}
+        await outbound.put(event_json(event, data, **extra))
+
+    async def writer() -> None:
+        while True:
+            frame = await outbound.get()
+            await websocket.send_text(frame.decode())
+            outbound.task_done()
+
+    async def heartbeat() -> None:
+        while True:
+            await asyncio.sleep(settings.ws_heartbeat_seconds)
+            await send("heartbeat", {})
+
+    async def run_turn(msg: dict, correlation_id: str) -> None:
+        turn_log = log.bind(correlation_id=correlation_id)
+        input_state = _build_v2_input(
+            msg["message"],
+            candidate_id,
+            msg.get("application_id", application_id),
+            correlation_id,
+            msg.get("max_tool_calls"),
+        )
+
+        async def events():
+            async with tracker.track(), tracer.run(
+                "v2/ws",
+                input=msg["message"],
+                opt_in=msg.get("trace") is True,
+                thread_id=thread_id,
+                correlation_id=correlation_id,
+                candidate_id=candidate_id,
+            ) as trace:
+                config = {"configurable": {"thread_id": thread_id}, "callbacks": trace.callbacks}
+                try:
+                    async with guard.enter(
+                        correlation_id=correlation_id,
+                        thread_id=thread_id,
+                        candidate_id=candidate_id,
+                    ) as run:
+                        async for item in traced_events(
+                            stream_turn(
+                                graph,
+                                input_state,
+                                run.config(config),
+                                V2_STREAM,
+                                turn_log,
+                                stream_redactor(settings, candidate_id, state.blob_store),
+                            ),
+                            trace,
+                        ):
+                            yield item
+                except RunCancelled as exc:
+                    yield "error", {"detail": str(exc)}
+                except HTTPException as exc:  # 409 thread busy / 429 at capacity
+                    yield "error", {"detail": exc.detail, "status": exc.status_code}
+
+        try:
+            async for event, data in coalesce_tokens(
+                events(),
+                coalesce_ms=settings.sse_coalesce_ms,
+                coalesce_bytes=max(1, settings.sse_coalesce_bytes),
+            ):
+                await send(event, data, correlation_id)
+        finally:
+            turns.pop(correlation_id, None)
+
+    def start_turn(msg: dict) -> None:
+        correlation_id = msg.get("correlation_id") or str(uuid4())
+        if not isinstance(msg.get("message"), str) or not msg["message"]:
+            raise ValueError("'message' must be a non-empty string")
+        max_tool_calls = msg.get("max_tool_calls")
+        if max_tool_calls is not None and (not isinstance(max_tool_calls, int) or max_tool_calls < 1):
+            raise ValueError("'max_tool_calls' must be a positive integer")
+        if correlation_id in turns:
+            raise ValueError(f"turn {correlation_id!r} is already running on this connection")
+        turns[correlation_id] = asyncio.create_task(run_turn(msg, correlation_id))
+
+    def cancel_turns(correlation_id: str | None, reason: str) -> None:
+        targets = [correlation_id] if correlation_id else list(turns)
+        for cid in targets:
+            if cid in turns:  # never another connection's run
+                guard.runs.cancel(cid, reason)
+
+    async def close_for_drain() -> None:
+        """Let this connection's turns finish and flush their frames, then close with 1012."""
+        log.info("v2_ws_drain_close", running_turns=len(turns))
+        if turns:
+            finished = asyncio.gather(*turns.values(), return_exceptions=True)
+            # Drain stops waiting for in-flight runs after its grace period; so do we
+            closing = asyncio.create_task(tracker.wait_sessions_closing())
+            await asyncio.wait([finished, closing], return_when=asyncio.FIRST_COMPLETED)
+            closing.cancel()
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(outbound.join(), _DRAIN_FLUSH_SECONDS)
+        if websocket.application_state == WebSocketState.CONNECTED:
+            await websocket.close(
+                code=WS_1012_SERVICE_RESTART, reason="Server is draining; reconnect to another instance"
+            )
+
+    async def drain_watch() -> None:
+        await tracker.wait_sessions_closing()
+        await close_for_drain()
+
+    background = [
+        asyncio.create_task(writer()),
+        asyncio.create_task(heartbeat()),
+        asyncio.create_task(drain_watch()),
+    ]
+    await send("session", {"thread_id": thread_id})
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            if tracker.draining:
+                await close_for_drain()
+                break
+            msg = None
+            try:
+                try:
+                    msg = json.loads(raw)
+                except json.JSONDecodeError as exc:
+                    raise ValueError(f"invalid JSON: {exc}") from None
+                if not isinstance(msg, dict):
+                    raise ValueError("frames must be JSON objects")
+                kind = msg.get("type", "message")
+                if kind == "message":
+                    start_turn(msg)
+                elif kind == "cancel":
+                    cancel_turns(msg.get("correlation_id"), "client_cancel")
+                else:
+                    raise ValueError(f"unknown frame type {kind!r}")
+            except ValueError as exc:
+                correlation_id = msg.get("correlation_id") if isinstance(msg, dict) else None
+                await send("error", {"detail": str(exc)}, correlation_id)
+    except WebSocketDisconnect:
+        pass
+    except RuntimeError:  # receive after the server side closed
+        pass
+    finally:
+        cancel_turns(None, "client_disconnect")
+        # A turn may be blocked on the outbound queue now that the writer is gone
+        for task in [*turns.values(), *background]:
+            task.cancel()
+        await asyncio.gather(*turns.values(), *background, return_exceptions=True)
+        log.info("v2_ws_close")
@@ -1,11 +1,15 @@
-"""Health check endpoints."""
+"""Health check endpoints.
+
+All three answer from the background prober's cached state (api/health_probe.py)
+and never call MCP or the LLM themselves.
+"""
 
-import httpx
 import structlog
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 
-from candidate_agent.api.dependencies import get_settings
-from candidate_agent.api.schemas import HealthResponse
+from candidate_agent.api.dependencies import get_health_prober, get_settings
+from candidate_agent.api.health_probe import HealthProber
+from candidate_agent.api.schemas import HealthResponse, LivenessResponse, ReadinessResponse
 from candidate_agent.config import Settings
 
 logger = structlog.get_logger(__name__)
@@ -14,31 +18,36 @@ router = APIRouter(tags=["health"])
 
 
 @router.get("/health", response_model=HealthResponse)
-async def health(settings: Settings = Depends(get_settings)) -> HealthResponse:
+async def health(
+    settings: Settings = Depends(get_settings),
+    prober: HealthProber = Depends(get_health_prober),
+) -> HealthResponse:
     """Liveness + MCP server reachability check.
 
     Returns 200 regardless of MCP connectivity so the process stays alive;
-    ``mcp_connected`` indicates actual connectivity status.
+    ``mcp_connected`` is the result of the latest background MCP probe.
     """
-    mcp_ok = await _check_mcp(settings.mcp_server_url, settings.mcp_connect_timeout)
     return HealthResponse(
         status="healthy",
-        mcp_connected=mcp_ok,
+        mcp_connected=prober.mcp.ok is True,
         llm_model=settings.llm_model,
     )
 
 
-async def _check_mcp(url: str, timeout: int) -> bool:
-    """Probe the MCP server with a minimal HTTP GET.
+@router.get("/livez", response_model=LivenessResponse)
+async def livez(prober: HealthProber = Depends(get_health_prober)) -> LivenessResponse:
+    """Liveness probe: the event loop is serving requests. Never checks dependencies."""
+    return LivenessResponse(status="alive", loop_lag_ms=prober.loop_lag_ms)
 
-    The stateless MCP endpoint returns 4xx on GET (it expects POST + SSE), but a
-    connection-refused or DNS failure indicates the server is down.
-    """
-    try:
-        async with httpx.AsyncClient(timeout=float(timeout)) as client:
-            resp = await client.get(url)
-            # 4xx means the server is up but rejected the bare GET — that's fine.
-            return resp.status_code < 500
-    except Exception as exc:
-        logger.warning("mcp_health_check_failed", url=url, error=str(exc))
-        return False
+
+@router.get("/readyz", response_model=ReadinessResponse)
+async def readyz(
+    request: Request,
+    response: Response,
+    prober: HealthProber = Depends(get_health_prober),
+) -> ReadinessResponse:
+    """Readiness probe: 503 when not ready; 200 with reasons when degraded."""
+    status, reasons = prober.readiness(draining=request.app.state.run_tracker.draining)
+    if status == "not_ready":
+        response.status_code = 503
+    return ReadinessResponse(status=status, reasons=reasons, checks=prober.snapshot())
@@ -0,0 +1,54 @@
+"""Process lifecycle endpoints (graceful drain)."""
+
+import ipaddress
+import secrets
+
+import structlog
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+
+from candidate_agent.api.dependencies import get_settings
+from candidate_agent.api.drain import drain
+from candidate_agent.config import Settings
+
+logger = structlog.get_logger(__name__)
+
+router = APIRouter(tags=["lifecycle"])
+
+
+def _is_local(request: Request) -> bool:
+    """True for a loopback peer that is not relaying someone else's request."""
+    if request.client is None or "x-forwarded-for" in request.headers:
+        return False
+    try:
+        return ipaddress.ip_address(request.client.host).is_loopback
+    except ValueError:
+        return False
+
+
+def authorize_drain(
+    request: Request,
+    x_drain_token: str | None = Header(None),
+    settings: Settings = Depends(get_settings),
+) -> None:
+    """403 unless the caller presents DRAIN_TOKEN or, with no token configured, is local."""
+    if settings.drain_token is not None:
+        allowed = secrets.compare_digest(
+            (x_drain_token or "").encode(), settings.drain_token.get_secret_value().encode()
+        )
+    else:
+        allowed = _is_local(request)
+    if not allowed:
+        logger.warning("drain_forbidden", client=request.client.host if request.client else None)
+        raise HTTPException(status_code=403, detail="Drain is restricted to the pod itself")
+
+
+@router.post("/drain", dependencies=[Depends(authorize_drain)])
+async def drain_endpoint(request: Request) -> dict:
+    """Stop accepting runs, wait for in-flight runs, and export thread checkpoints.
+
+    Intended for the pod's preStop hook, which calls it over loopback. Set
+    DRAIN_TOKEN to require an ``X-Drain-Token`` header instead. Blocks until
+    the drain completes (at most DRAIN_GRACE_SECONDS plus the snapshot write)
+    and is idempotent.
+    """
+    return await drain(request.app.state)
@@ -0,0 +1,118 @@
+"""Prometheus scrape endpoint (api/metrics.py)."""
+
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+
+from candidate_agent.agents.budget import budget_stats
+from candidate_agent.agents.fast_path import fast_path_stats
+from candidate_agent.agents.speculation import speculation_stats
+from candidate_agent.api import metrics
+from candidate_agent.api.cancellation import cancellation_stats
+from candidate_agent.api.metrics import Counter, Gauge
+from candidate_agent.api.redaction import redaction_stats
+
+router = APIRouter(tags=["metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def collected(state) -> list[Counter]:
+    """Gauges and counters read from app state and the ``*_stats`` objects at scrape time."""
+    admission = state.admission
+    jobs = state.job_queue.stats()
+    return [
+        Gauge("runs_in_flight", "Runs currently executing", values={(): state.run_registry.running}),
+        Gauge(
+            "drain_pending_runs",
+            "Requests and queued async runs a drain would wait for",
+            values={(): state.run_tracker.inflight},
+        ),
+        Gauge("admission_queued", "Runs waiting for an admission slot", values={(): admission.queued}),
+        Gauge("admission_limit", "Current adaptive concurrency limit", values={(): admission.limit}),
+        Gauge(
+            "job_queue_depth",
+            "Async runs waiting for a worker",
+            values={(): jobs["queue_depth"]},
+        ),
+        Counter.of(
+            "async_runs_total",
+            "Queued runs finished, by outcome; deduplicated counts retried submits",
+            "outcome",
+            {key: jobs[key] for key in ("completed", "failed", "cancelled", "deduplicated")},
+        ),
+        Counter("admission_admitted_total", "Runs admitted", values={(): admission.admitted}),
+        Counter.of("admission_shed_total", "Runs shed with 429, by reason", "reason", admission.shed),
+        Counter.of("runs_cancelled_total", "Cancelled runs by reason", "reason", cancellation_stats.cancelled),
+        Counter(
+            "cancelled_run_tokens_total",
+            "Tokens spent by runs that were then cancelled",
+            values={(): cancellation_stats.tokens_spent_cancelled},
+        ),
+        Counter(
+            "cancelled_run_tokens_saved_total",
+            "Estimated tokens not spent because runs were cancelled",
+            values={(): cancellation_stats.estimated_tokens_saved},
+        ),
+        Counter.of(
+            "budget_forced_answers_total",
+            "Final answers forced by the tool-call budget, by agent",
+            "agent",
+            budget_stats.forced_final,
+        ),
+        Counter.of(
+            "budget_rejected_tool_calls_total",
+            "Tool calls refused past the budget, by agent",
+            "agent",
+            budget_stats.rejected_calls,
+        ),
+        Counter.of(
+            "budget_repeated_tool_calls_total",
+            "Identical tool calls answered from the earlier result, by agent",
+            "agent",
+            budget_stats.repeated_calls,
+        ),
+        Counter.of(
+            "fast_path_answers_total",
+            "v2 turns answered from a template, by intent",
+            "intent",
+            fast_path_stats.answered,
+        ),
+        Counter.of(
+            "fast_path_fallbacks_total",
+            "Fast-path matches handed back to the router, by reason",
+            "reason",
+            fast_path_stats.fallbacks,
+        ),
+        Counter(
+            "speculative_runs_total",
+            "Speculative specialist runs started",
+            values={(): speculation_stats.started},
+        ),
+        Counter.of(
+            "speculative_outcomes_total",
+            "Speculative specialist runs by outcome",
+            "outcome",
+            {
+                outcome: getattr(speculation_stats, outcome)
+                for outcome in ("kept", "cancelled", "budget_aborted", "failed")
+            },
+        ),
+        Counter.of(
+            "speculative_tokens_total",
+            "Tokens spent by speculative specialists, kept or wasted",
+            "kind",
+            {"kept": speculation_stats.kept_tokens, "wasted": speculation_stats.wasted_tokens},
+        ),
+        Counter.of("pii_redactions_total", "Streamed PII redactions by kind", "kind", redaction_stats.redactions),
+        Counter(
+            "pii_forced_releases_total",
+            "Streamed text released unchecked after exceeding the redaction lookahead",
+            values={(): redaction_stats.forced_releases},
+        ),
+    ]
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def scrape(request: Request) -> PlainTextResponse:
+    """All metrics in the Prometheus text format."""
+    return PlainTextResponse(metrics.render(collected(request.app.state)), media_type=CONTENT_TYPE)
@@ -0,0 +1,198 @@
+"""Asynchronous run endpoints: submit a turn, then poll for its result.
+
+The submit routes accept the same bodies as the matching ``/invoke`` routes,
+enqueue the run on the in-process JobQueue (api/jobs.py), and return 202 with a
+``run_id`` without waiting for the LLM. Clients poll ``GET /api/runs/{run_id}``
+until the status is ``succeeded``, ``failed`` or ``cancelled``. Results are kept for
+JOB_RESULT_TTL_SECONDS after the run finishes.
+"""
+
+import structlog
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+
+from candidate_agent.agents.budget import budget_stats
+from candidate_agent.agents.fast_path import fast_path_stats
+from candidate_agent.agents.speculation import speculation_stats
+from candidate_agent.api.admission import AdmissionController
+from candidate_agent.api.cancellation import RunRegistry, cancellation_stats
+from candidate_agent.api.dependencies import (
+    get_graph,
+    get_idempotency_store,
+    get_job_queue,
+    get_admission,
+    get_run_guard,
+    get_run_registry,
+    get_settings,
+    get_thread_locks,
+    get_tracer,
+    get_v2_graph,
+)
+from candidate_agent.api.idempotency import IdempotencyStore, request_fingerprint
+from candidate_agent.api.jobs import Job, JobQueue
+from candidate_agent.api.routes.agent import _invoke_v1
+from candidate_agent.api.routes.agent_v2 import _invoke_v2
+from candidate_agent.api.schemas import (
+    InvokeRequest,
+    RunStatusResponse,
+    RunSubmitResponse,
+    V2InvokeRequest,
+)
+from candidate_agent.api.run_guard import RunGuard
+from candidate_agent.api.thread_locks import ThreadLocks
+from candidate_agent.api.tracing import RunTracer
+from candidate_agent.config import Settings
+
+logger = structlog.get_logger(__name__)
+
+router = APIRouter(tags=["runs"])
+
+
+def _submitted(
+    submitted: tuple[Job, bool], jobs: JobQueue, thread_id: str, correlation_id: str, response: Response
+) -> RunSubmitResponse:
+    job, deduplicated = submitted
+    response.headers["Location"] = f"/api/runs/{job.run_id}"
+    if deduplicated:
+        response.headers["Idempotent-Replayed"] = "true"
+    else:
+        logger.info("run_submitted", run_id=job.run_id, kind=job.kind, correlation_id=correlation_id)
+    return RunSubmitResponse(
+        run_id=job.run_id,
+        status=job.status,
+        thread_id=thread_id,
+        correlation_id=correlation_id,
+        queue_depth=jobs.stats()["queue_depth"],
+    )
+
+
+@router.post("/api/v1/agent/runs", response_model=RunSubmitResponse, status_code=202)
+async def submit_v1_run(
+    req: InvokeRequest,
+    response: Response,
+    graph=Depends(get_graph),
+    jobs: JobQueue = Depends(get_job_queue),
+    guard: RunGuard = Depends(get_run_guard),
+) -> RunSubmitResponse:
+    """Queue a v1 turn and return its ``run_id`` immediately (429 when the queue is full).
+
+    A retry with the same ``correlation_id`` returns the existing run.
+    """
+    submitted = jobs.submit(
+        "v1", lambda: _invoke_v1(graph, req, guard), req.correlation_id, request_fingerprint(req)
+    )
+    return _submitted(submitted, jobs, req.thread_id, req.correlation_id, response)
+
+
+@router.post("/api/v2/agent/runs", response_model=RunSubmitResponse, status_code=202)
+async def submit_v2_run(
+    req: V2InvokeRequest,
+    response: Response,
+    x_trace: bool = Header(False, description="true traces this run in full"),
+    graph=Depends(get_v2_graph),
+    jobs: JobQueue = Depends(get_job_queue),
+    settings: Settings = Depends(get_settings),
+    guard: RunGuard = Depends(get_run_guard),
+    tracer: RunTracer = Depends(get_tracer),
+) -> RunSubmitResponse:
+    """Queue a v2 turn and return its ``run_id`` immediately (429 when the queue is full).
+
+    A retry with the same ``correlation_id`` returns the existing run.
+    """
+    submitted = jobs.submit(
+        "v2",
+        lambda: _invoke_v2(graph, req, settings, guard, tracer, "v2/runs", trace_opt_in=x_trace),
+        req.correlation_id,
+        request_fingerprint(req),
+    )
+    return _submitted(submitted, jobs, req.thread_id, req.correlation_id, response)
+
+
+@router.get("/api/runs/stats")
+async def run_queue_stats(jobs: JobQueue = Depends(get_job_queue)) -> dict:
+    """Queue depth, busy workers, outcome counts, and queue-wait percentiles."""
+    return jobs.stats()
+
+
+@router.post("/api/runs/cancel/{correlation_id}")
+async def cancel_run(correlation_id: str, runs: RunRegistry = Depends(get_run_registry)) -> dict:
+    """Cancel the in-flight run started with ``correlation_id``.
+
+    Works for invoke, stream, batch item, and queued runs. Pending LLM and MCP
+    calls are cancelled; the run's caller receives 499 (or a failed status /
+    error line). ``cancelled`` is false if no such run is in flight.
+    """
+    cancelled = runs.cancel(correlation_id, "api")
+    logger.info("run_cancel_requested", correlation_id=correlation_id, cancelled=cancelled)
+    return {"correlation_id": correlation_id, "cancelled": cancelled}
+
+
+@router.get("/api/runs/cancellations")
+async def cancellation_counters() -> dict:
+    """Cancelled runs by reason, tokens they had spent, and estimated tokens saved."""
+    return cancellation_stats.snapshot()
+
+
+@router.get("/api/runs/budget")
+async def budget_counters() -> dict:
+    """Per-agent forced final answers, refused calls, and repeated calls served from the turn."""
+    return budget_stats.snapshot()
+
+
+@router.get("/api/runs/fast-path")
+async def fast_path_counters() -> dict:
+    """Templated answers by intent and fallbacks to the router by reason."""
+    return fast_path_stats.snapshot()
+
+
+@router.get("/api/runs/speculation")
+async def speculation_counters() -> dict:
+    """Speculative specialist runs kept, cancelled, or over budget, and the tokens each spent."""
+    return speculation_stats.snapshot()
+
+
+@router.get("/api/runs/idempotency")
+async def idempotency_counters(store: IdempotencyStore = Depends(get_idempotency_store)) -> dict:
+    """Runs started, retries attached to in-flight runs or replayed, body conflicts."""
+    return store.snapshot()
+
+
+@router.get("/api/runs/thread-locks")
+async def thread_lock_stats(locks: ThreadLocks = Depends(get_thread_locks)) -> dict:
+    """Per-thread lock policy, outcomes, and lock-wait percentiles."""
+    return locks.stats()
+
+
+@router.get("/api/runs/admission")
+async def admission_stats(admission: AdmissionController = Depends(get_admission)) -> dict:
+    """Concurrency limit, in-flight and queued runs, shed counts, and queue-wait percentiles."""
+    return admission.stats()
+
+
+@router.get("/api/runs/tracing")
+async def tracing_stats(tracer: RunTracer = Depends(get_tracer)) -> dict:
+    """Trace sample rates, sampling decisions per route, tail captures, and export drops."""
+    return tracer.snapshot()
+
+
+@router.get("/api/runs/{run_id}", response_model=RunStatusResponse)
+async def get_run(run_id: str, jobs: JobQueue = Depends(get_job_queue)) -> RunStatusResponse:
+    """Current status of a submitted run, with its result once finished.
+
+    404 for unknown run ids and for results older than JOB_RESULT_TTL_SECONDS.
+    """
+    job = jobs.get(run_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired run_id")
+    duration_ms = (
+        round((job.finished_at - job.started_at) * 1000, 1)
+        if job.finished_at is not None and job.started_at is not None
+        else None
+    )
+    return RunStatusResponse(
+        run_id=job.run_id,
+        status=job.status,
+        queue_wait_ms=job.queue_wait_ms,
+        duration_ms=duration_ms,
+        result=job.result,
+        error=job.error,
+    )
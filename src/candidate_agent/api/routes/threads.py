@@ -0,0 +1,58 @@
+"""Read-only thread history endpoints (see api/history.py)."""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from candidate_agent.agents.blob_store import BlobStore
+from candidate_agent.api.dependencies import get_blob_store, get_graph, get_v2_graph
+from candidate_agent.api.history import read_history
+from candidate_agent.api.schemas import ThreadHistoryResponse
+
+router = APIRouter(tags=["threads"])
+
+
+async def _history(
+    graph, thread_id: str, cursor: int | None, limit: int, include_tool_output: bool, blob_store
+) -> ThreadHistoryResponse:
+    page = await read_history(
+        graph.checkpointer,
+        thread_id,
+        cursor=cursor,
+        limit=limit,
+        include_tool_output=include_tool_output,
+        blob_store=blob_store,
+    )
+    if page is None:
+        raise HTTPException(status_code=404, detail=f"Thread {thread_id!r} not found")
+    return page
+
+
+@router.get("/api/v1/agent/threads/{thread_id}/history", response_model=ThreadHistoryResponse)
+async def v1_thread_history(
+    thread_id: str,
+    cursor: int | None = Query(None, ge=0, description="next_cursor of the previous page"),
+    limit: int = Query(20, ge=1, le=100, description="Turns per page"),
+    include_tool_output: bool = Query(True, description="false omits tool result payloads"),
+    graph=Depends(get_graph),
+    blob_store: BlobStore | None = Depends(get_blob_store),
+) -> ThreadHistoryResponse:
+    """Turns of a v1 thread, newest page first, read from the checkpointer.
+
+    Does not run the agent or modify the thread.
+    """
+    return await _history(graph, thread_id, cursor, limit, include_tool_output, blob_store)
+
+
+@router.get("/api/v2/agent/threads/{thread_id}/history", response_model=ThreadHistoryResponse)
+async def v2_thread_history(
+    thread_id: str,
+    cursor: int | None = Query(None, ge=0, description="next_cursor of the previous page"),
+    limit: int = Query(20, ge=1, le=100, description="Turns per page"),
+    include_tool_output: bool = Query(True, description="false omits tool result payloads"),
+    graph=Depends(get_v2_graph),
+    blob_store: BlobStore | None = Depends(get_blob_store),
+) -> ThreadHistoryResponse:
+    """Turns of a v2 thread, newest page first, read from the checkpointer.
+
+    Does not run the agent or modify the thread.
+    """
+    return await _history(graph, thread_id, cursor, limit, include_tool_output, blob_store)
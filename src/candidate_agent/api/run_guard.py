@@ -0,0 +1,41 @@
+"""The controls every graph run passes through, in one place.
+
+``RunGuard.enter`` wraps a run in three layers:
+
+  1. ``RunRegistry.track``  — cancellable by ``correlation_id`` (api/cancellation.py)
+  2. ``ThreadLocks.hold``   — one turn per ``thread_id`` (api/thread_locks.py)
+  3. ``AdmissionController.slot`` — global concurrency limit (api/admission.py)
+
+The thread lock is taken before the admission slot. A turn queued behind
+another turn on its thread therefore does not occupy a run slot while it waits.
+All waits happen inside ``track``, so a waiting run can be cancelled too.
+"""
+
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from candidate_agent.api.admission import AdmissionController
+from candidate_agent.api.cancellation import ActiveRun, RunRegistry
+from candidate_agent.api.thread_locks import ThreadLocks
+
+
+@dataclass(frozen=True)
+class RunGuard:
+    runs: RunRegistry
+    locks: ThreadLocks
+    admission: AdmissionController
+
+    @asynccontextmanager
+    async def enter(self, *, correlation_id: str, thread_id: str, candidate_id: str):
+        """Register, serialize, and admit one run; yields its ``ActiveRun``."""
+        async with (
+            self.runs.track(correlation_id) as run,
+            self.locks.hold(thread_id, correlation_id),
+            self.admission.slot(candidate_id, run.counter),
+        ):
+            yield run  # type: ActiveRun
+
+    def fast_fail(self, *, thread_id: str, candidate_id: str) -> None:
+        """Raise 409/429 up front when the run would be refused anyway (stream routes)."""
+        self.locks.reject_if_busy(thread_id)
+        self.admission.shed_if_full(candidate_id)
@@ -1,7 +1,10 @@
+from typing import Literal
 from uuid import uuid4
 
 from pydantic import BaseModel, Field
 
+from candidate_agent.agents.structured import StructuredAnswer
+
 
 class InvokeRequest(BaseModel):
     message: str = Field(..., description="User message to the agent")
@@ -17,6 +20,23 @@ class InvokeRequest(BaseModel):
         default_factory=lambda: str(uuid4()),
         description="Request trace ID for observability. Auto-generated if omitted.",
     )
+    max_tool_calls: int | None = Field(
+        default=None,
+        ge=1,
+        description="Cap on tool calls per agent for this turn (lowers the server default only)",
+    )
+    response_format: Literal["text", "json"] = Field(
+        default="text",
+        description="json: skip the narrative and return a short structured answer in `structured`",
+    )
+
+
+class ToolTiming(BaseModel):
+    name: str
+    duration_ms: float | None = Field(
+        default=None,
+        description="Wall-clock tool latency; null when it was not recorded",
+    )
 
 
 class InvokeResponse(BaseModel):
@@ -29,7 +49,15 @@ class InvokeResponse(BaseModel):
     )
     tool_calls: list[str] = Field(
         default_factory=list,
-        description="Names of tools invoked during this run",
+        description="Names of tools invoked during this turn",
+    )
+    tool_timings: list[ToolTiming] = Field(
+        default_factory=list,
+        description="Per-call tool latencies for this turn, in call order",
+    )
+    structured: StructuredAnswer | None = Field(
+        default=None,
+        description="Structured answer when response_format was json (null if the agent answered in prose)",
     )
 
 
@@ -38,6 +66,26 @@ class StreamRequest(BaseModel):
     candidate_id: str = Field(default="")
     thread_id: str = Field(default_factory=lambda: str(uuid4()))
     correlation_id: str = Field(default_factory=lambda: str(uuid4()))
+    max_tool_calls: int | None = Field(default=None, ge=1)
+
+
+class RunSubmitResponse(BaseModel):
+    run_id: str
+    status: str = Field(..., description="queued")
+    thread_id: str
+    correlation_id: str
+    queue_depth: int = Field(..., description="Runs waiting ahead of (and including) this one")
+
+
+class RunStatusResponse(BaseModel):
+    run_id: str
+    status: str = Field(..., description="queued | running | succeeded | failed | cancelled")
+    queue_wait_ms: float | None = Field(
+        default=None, description="Time spent queued before a worker took the run"
+    )
+    duration_ms: float | None = Field(default=None, description="Execution time, once finished")
+    result: InvokeResponse | None = Field(default=None, description="Set when status is succeeded")
+    error: str | None = Field(default=None, description="Set when status is failed or cancelled")
 
 
 class HealthResponse(BaseModel):
@@ -47,6 +95,61 @@ class HealthResponse(BaseModel):
     version: str = "1.0.0"
 
 
+class LivenessResponse(BaseModel):
+    status: str = Field(..., description="alive")
+    loop_lag_ms: float = Field(..., description="How late the prober's last timer fired")
+
+
+class ReadinessResponse(BaseModel):
+    status: str = Field(..., description="ready | degraded | not_ready (503)")
+    reasons: list[str] = Field(default_factory=list, description="Why the pod is not fully ready")
+    checks: dict[str, dict] = Field(
+        default_factory=dict,
+        description="Per-dependency cached probe state, latency percentiles and histogram",
+    )
+
+
+class HistoryToolCall(BaseModel):
+    id: str | None = None
+    name: str
+    args: dict = Field(default_factory=dict)
+
+
+class HistoryMessage(BaseModel):
+    index: int = Field(..., description="Position in the thread (threads are append-only)")
+    type: str = Field(..., description="human | ai | tool | system")
+    name: str | None = Field(default=None, description="Agent (ai) or tool (tool) name")
+    content: str | None = Field(
+        default=None,
+        description="Message text; null for tool results when include_tool_output=false",
+    )
+    content_bytes: int = Field(..., description="Size of the full content, even when omitted")
+    tool_calls: list[HistoryToolCall] = Field(default_factory=list)
+    tool_call_id: str | None = None
+    duration_ms: float | None = Field(default=None, description="Tool latency (tool messages)")
+
+
+class HistoryTurn(BaseModel):
+    index: int = Field(..., description="Index of the turn's first message")
+    turn_id: str | None = Field(default=None, description="Id of the turn's HumanMessage")
+    message: str | None = Field(default=None, description="The user message that opened the turn")
+    response: str = Field(default="", description="Final agent response text")
+    agents: list[str] = Field(default_factory=list, description="Agents that replied, in order")
+    tool_calls: list[ToolTiming] = Field(default_factory=list)
+    messages: list[HistoryMessage] = Field(default_factory=list)
+
+
+class ThreadHistoryResponse(BaseModel):
+    thread_id: str
+    checkpoint_id: str = Field(..., description="Checkpoint the page was read from")
+    total_messages: int
+    turns: list[HistoryTurn] = Field(..., description="Oldest first")
+    next_cursor: int | None = Field(
+        default=None,
+        description="Pass as ``cursor`` for the next (older) page; null on the first turn",
+    )
+
+
 # ── v2 route schemas ──────────────────────────────────────────────────────────
 
 class V2InvokeRequest(BaseModel):
@@ -67,6 +170,24 @@ class V2InvokeRequest(BaseModel):
         default_factory=lambda: str(uuid4()),
         description="Request trace ID for observability. Auto-generated if omitted.",
     )
+    max_tool_calls: int | None = Field(
+        default=None,
+        ge=1,
+        description="Cap on tool calls per agent for this turn (lowers the server default only)",
+    )
+    response_format: Literal["text", "json"] = Field(
+        default="text",
+        description="json: skip the narrative and return a short structured answer in `structured`",
+    )
+
+
+class V2BatchInvokeRequest(BaseModel):
+    items: list[V2InvokeRequest] = Field(..., min_length=1, description="Invoke requests to run")
+    max_concurrency: int | None = Field(
+        default=None,
+        ge=1,
+        description="Items run in parallel (capped by V2_BATCH_MAX_CONCURRENCY)",
+    )
 
 
 class V2StreamRequest(BaseModel):
@@ -75,3 +196,4 @@ class V2StreamRequest(BaseModel):
     application_id: str = Field(default="")
     thread_id: str = Field(default_factory=lambda: str(uuid4()))
     correlation_id: str = Field(default_factory=lambda: str(uuid4()))
+    max_tool_calls: int | None = Field(default=None, ge=1)
@@ -0,0 +1,197 @@
+"""Shared Server-Sent Events encoder for the streaming routes.
+
+The streaming routes yield ``(event, data)`` pairs. ``sse_frames`` turns them
+into wire frames with three cost savings:
+
+  • Pre-encoded templates. ``token`` and ``tool_call`` frames are a fixed
+    prefix and suffix around one JSON-encoded string, so no nested dict is
+    built or serialized for each chunk.
+  • orjson when it is importable (langsmith already depends on it), with the
+    stdlib ``json`` module as the fallback. Frames are ``bytes`` and go to the
+    socket without being encoded a second time.
+  • Token coalescing. Consecutive token chunks are merged into one frame,
+    flushed after SSE_COALESCE_MS or once SSE_COALESCE_BYTES are buffered. Any
+    other event flushes the buffer first, so event order is preserved.
+
+Events are read into a bounded queue (64 events), and the token buffer never
+grows past SSE_COALESCE_BYTES. A slow client therefore holds back its own
+subscription; the run itself records into its channel (api/idempotency.py).
+The ``/stream`` routes coalesce there, before the channel numbers and buffers
+the events, and encode the channel's events one frame each.
+
+The wire format is unchanged: ``data: {"event": ..., "data": {...}}\\n\\n``.
+Sources may also yield ``(event, data, seq)``. The frame then starts with an
+``id: <seq>`` line, which clients send back as ``Last-Event-ID`` to resume.
+A merged token frame carries the id of its last chunk.
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator
+
+try:
+    import orjson
+
+    def _dumps(value: Any) -> bytes:
+        return orjson.dumps(value)
+
+except ImportError:  # pragma: no cover - orjson ships with langsmith
+    import json
+
+    def _dumps(value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",  # Disable Nginx buffering
+}
+
+_TOKEN_PREFIX = b'data: {"event":"token","data":{"content":'
+_TOOL_CALL_PREFIX = b'data: {"event":"tool_call","data":{"name":'
+_FRAME_SUFFIX = b"}}\n\n"
+
+
+def token_frame(content: str) -> bytes:
+    return _TOKEN_PREFIX + _dumps(content) + _FRAME_SUFFIX
+
+
+def tool_call_frame(name: str) -> bytes:
+    return _TOOL_CALL_PREFIX + _dumps(name) + _FRAME_SUFFIX
+
+
+def event_json(event: str, data: dict, **extra: Any) -> bytes:
+    """``{"event": ..., "data": ..., **extra}`` as compact JSON (also used by the WebSocket route)."""
+    return _dumps({"event": event, "data": data, **extra})
+
+
+def encode_event(event: str, data: dict, event_id: int | None = None) -> bytes:
+    """Encode one SSE frame; fast paths for the per-chunk event types."""
+    if event == "token":
+        frame = token_frame(data["content"])
+    elif event == "tool_call" and len(data) == 1:
+        frame = tool_call_frame(data["name"])
+    else:
+        frame = b"data: " + event_json(event, data) + b"\n\n"
+    if event_id is None:
+        return frame
+    return b"id: %d\n" % event_id + frame
+
+
+_END = object()
+
+
+async def _pump(events: AsyncIterator[tuple[str, dict]], queue: asyncio.Queue) -> None:
+    """Run the event source in its own task, feeding a bounded queue."""
+    try:
+        async for item in events:
+            await queue.put(item)
+    except asyncio.CancelledError:
+        # Unblock a consumer still waiting on the queue; pending events are moot
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(_END)
+        raise
+    except Exception as exc:
+        await queue.put(exc)
+    else:
+        await queue.put(_END)
+    finally:
+        # Cancelled while blocked on a full queue: close the source so its cleanup runs
+        aclose = getattr(events, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+async def coalesce_tokens(
+    events: AsyncIterator[tuple[str, dict]],
+    *,
+    coalesce_ms: float = 30.0,
+    coalesce_bytes: int = 256,
+    max_pending: int = 64,
+) -> AsyncIterator[tuple[str, dict]]:
+    """Relay ``(event, data)`` pairs, merging consecutive ``token`` events.
+
+    Items may carry extra fields after ``data`` (the event id); a merged token
+    keeps those of its last chunk.
+    ``events`` runs in a producer task that feeds a queue holding at most
+    ``max_pending`` events. When the consumer stops reading, the producer
+    blocks on that queue. Exceptions raised by ``events`` are re-raised here.
+    """
+    interval = coalesce_ms / 1000
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+    producer = asyncio.create_task(_pump(events, queue))
+    buffer: list[str] = []
+    buffered = 0  # characters — equal to bytes for ASCII text
+    tail: list = []  # extra fields (event id) of the last buffered chunk
+    flush_at = 0.0
+
+    try:
+        while True:
+            if not queue.empty():
+                item = queue.get_nowait()
+            elif buffer:
+                try:
+                    item = await asyncio.wait_for(queue.get(), max(0.0, flush_at - time.monotonic()))
+                except TimeoutError:
+                    yield "token", {"content": "".join(buffer)}, *tail
+                    buffer, buffered = [], 0
+                    continue
+            else:
+                item = await queue.get()
+
+            if item is _END:
+                break
+            if isinstance(item, Exception):
+                raise item
+
+            event, data, *rest = item
+            if event == "token":
+                if not buffer:
+                    flush_at = time.monotonic() + interval
+                buffer.append(data["content"])
+                buffered += len(data["content"])
+                tail = rest
+                if buffered >= coalesce_bytes or time.monotonic() >= flush_at:
+                    yield "token", {"content": "".join(buffer)}, *tail
+                    buffer, buffered = [], 0
+                continue
+
+            if buffer:
+                yield "token", {"content": "".join(buffer)}, *tail
+                buffer, buffered = [], 0
+            yield item
+
+        if buffer:
+            yield "token", {"content": "".join(buffer)}, *tail
+    finally:
+        if not producer.done():
+            producer.cancel()
+            try:
+                await producer
+            except asyncio.CancelledError:
+                pass
+
+
+async def sse_frames(
+    events: AsyncIterator[tuple[str, dict]],
+    *,
+    coalesce_ms: float = 30.0,
+    coalesce_bytes: int = 256,
+    max_pending: int = 64,
+) -> AsyncIterator[bytes]:
+    """Encode ``(event, data[, seq])`` items as SSE frames, merging consecutive tokens.
+
+    See ``coalesce_tokens``. ``coalesce_bytes=0`` disables coalescing (one
+    frame per token chunk, no producer task).
+    """
+    if coalesce_bytes <= 0:
+        async for item in events:
+            yield encode_event(*item)
+        return
+
+    async for item in coalesce_tokens(
+        events, coalesce_ms=coalesce_ms, coalesce_bytes=coalesce_bytes, max_pending=max_pending
+    ):
+        yield encode_event(*item)
@@ -0,0 +1,9 @@
+"""Small helpers shared by the ``stats()`` reports of the run-control modules."""
+
+
+def percentile(samples: list[float], pct: float) -> float | None:
+    """Nearest-rank ``pct`` (0–1) of ``samples``; None when there are none."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
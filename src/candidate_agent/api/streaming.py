@@ -0,0 +1,157 @@
+"""Streaming engine shared by the v1 and v2 ``/stream`` routes.
+
+The routes used to iterate ``graph.astream_events(version="v2")``. That
+dispatches a callback event for every chain, prompt, parser, and runnable
+inside the ReAct subgraphs, and the routes threw almost all of them away. This
+engine subscribes only to the two LangGraph stream modes the SSE contract
+needs, with ``subgraphs=True`` so agent internals are visible:
+
+  • ``messages`` — LLM token chunks (plus any message a node emits without
+                   streaming it, such as the "need more steps" fallback)
+  • ``updates``  — per-node state updates, used to detect tool calls (from the
+                   AIMessage that requests them) and node transitions
+
+It yields the same ``(event, data)`` pairs as before (token, tool_call,
+handoff, done, error) for ``api/sse.py`` to encode. Two differences from the
+old filtering: each tool call is reported exactly once, and the handoff event
+fires once, when the first specialist-side node starts producing output.
+Tokens from a profile's ``private_nodes`` are not streamed: on a v2 fan-out turn
+only the synthesized answer reaches the client, not each sub-run's draft.
+
+With a ``StreamRedactor`` (api/redaction.py, PII_REDACTION_ENABLED), token text
+passes through it before it is yielded. It learns identifiers from the tool
+results in the ``updates`` stream, and its held text is flushed before any
+other event.
+"""
+
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from langchain_core.messages import AIMessage, ToolMessage
+
+from candidate_agent.api.redaction import StreamRedactor
+
+
+@dataclass(frozen=True)
+class StreamProfile:
+    """How a graph's nodes map onto the SSE contract's agents."""
+
+    entry_agent: str                 # agent reported before any handoff
+    specialist: str                  # agent reported after the handoff
+    specialist_nodes: frozenset[str]  # top-level nodes that mean the specialist is active
+    private_nodes: frozenset[str] = frozenset()  # top-level nodes whose tokens are never streamed
+    log_prefix: str = ""             # "v2_" → v2_stream_complete / v2_stream_error
+
+
+V1_STREAM = StreamProfile(
+    entry_agent="candidate_primary",
+    specialist="job_application_agent",
+    specialist_nodes=frozenset({"job_application_agent"}),
+)
+
+V2_STREAM = StreamProfile(
+    entry_agent="v2_primary_assistant",
+    specialist="post_apply_assistant",
+    specialist_nodes=frozenset(
+        {
+            "post_apply_assistant",
+            "application_fan_out",
+            "application_sub_run",
+            "synthesize_applications",
+        }
+    ),
+    # Per-application drafts are inputs to synthesize_applications, not answers;
+    # the sub-runs also run concurrently, so their tokens would interleave.
+    private_nodes=frozenset({"application_fan_out", "application_sub_run"}),
+    log_prefix="v2_",
+)
+
+
+def _chunk_text(content: str | list) -> str:
+    if isinstance(content, str):
+        return content
+    return "".join(
+        b.get("text", "") for b in content if isinstance(b, dict) and b.get("type") == "text"
+    )
+
+
+async def stream_turn(
+    graph,
+    input_state: dict,
+    config: dict,
+    profile: StreamProfile,
+    log,
+    redactor: StreamRedactor | None = None,
+) -> AsyncIterator[tuple[str, dict]]:
+    """Run one turn and yield SSE ``(event, data)`` pairs; errors become an ``error`` event."""
+    tool_calls_seen: list[str] = []
+    seen_call_ids: set[str] = set()
+    active_agent = profile.entry_agent
+    handed_off = False
+
+    def held_tokens():
+        if redactor is not None:
+            for content in redactor.flush():
+                yield "token", {"content": content}
+
+    try:
+        async for namespace, mode, payload in graph.astream(
+            input_state,
+            config=config,
+            stream_mode=["messages", "updates"],
+            subgraphs=True,
+        ):
+            # Namespace entries look like "post_apply_assistant:<task id>"; the
+            # first one names the top-level node the event came from.
+            top_node = namespace[0].split(":", 1)[0] if namespace else None
+            if mode == "updates" and not namespace:
+                top_node = next(iter(payload), None)
+
+            if not handed_off and top_node in profile.specialist_nodes:
+                handed_off = True
+                active_agent = profile.specialist
+                for item in held_tokens():
+                    yield item
+                yield "handoff", {"from": profile.entry_agent, "to": profile.specialist}
+
+            if mode == "messages":
+                chunk, _metadata = payload
+                if top_node in profile.private_nodes:
+                    continue
+                if isinstance(chunk, AIMessage) and chunk.content:
+                    content = _chunk_text(chunk.content)
+                    if content and redactor is not None:
+                        content = redactor.feed(content, namespace)
+                    if content:
+                        yield "token", {"content": content}
+                continue
+
+            for node, update in payload.items():
+                if not isinstance(update, dict):
+                    continue
+                if not namespace and update.get("active_agent"):
+                    active_agent = update["active_agent"]
+                for msg in update.get("messages") or []:
+                    if isinstance(msg, ToolMessage) and redactor is not None:
+                        redactor.observe(msg)
+                    if not isinstance(msg, AIMessage):
+                        continue
+                    for tc in msg.tool_calls:
+                        if tc["id"] in seen_call_ids:
+                            continue
+                        seen_call_ids.add(tc["id"])
+                        tool_calls_seen.append(tc["name"])
+                        for item in held_tokens():
+                            yield item
+                        yield "tool_call", {"name": tc["name"]}
+
+        for item in held_tokens():
+            yield item
+        yield "done", {"active_agent": active_agent, "tool_calls": tool_calls_seen}
+        log.info(f"{profile.log_prefix}stream_complete", active_agent=active_agent, tool_calls=tool_calls_seen)
+
+    except Exception as exc:
+        log.error(f"{profile.log_prefix}stream_error", error=str(exc), exc_info=True)
+        for item in held_tokens():
+            yield item
+        yield "error", {"detail": str(exc)}
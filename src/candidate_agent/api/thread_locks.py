@@ -0,0 +1,150 @@
+"""Per-thread serialization of concurrent turns.
+
+Two turns on one ``thread_id`` would both read the thread's checkpoint, run,
+and write back. Each would miss the other's messages, and the later write
+would win. ``ThreadLocks`` lets one run per thread proceed. THREAD_LOCK_POLICY
+decides what happens to a second run:
+
+  • ``queue``        — wait for the running turn (up to THREAD_LOCK_WAIT_TIMEOUT_SECONDS,
+                       at most THREAD_LOCK_MAX_WAITERS per thread), then run
+  • ``reject``       — fail fast with 409
+  • ``cancel_older`` — cancel the running turn (reason ``superseded``), then run
+
+Rejections, timeouts, and a full wait line all answer 409. A lock exists only
+while a run holds it or waits for it, so the table never grows with idle
+threads. ``stats()`` reports lock-wait percentiles.
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+import structlog
+from fastapi import HTTPException
+
+from candidate_agent.api.cancellation import RunRegistry
+from candidate_agent.api.stats import percentile
+
+logger = structlog.get_logger(__name__)
+
+POLICIES = ("queue", "reject", "cancel_older")
+
+# Lock-wait samples kept for the percentile figures in stats()
+_WAIT_SAMPLES = 1024
+
+
+class ThreadBusy(HTTPException):
+    """Another turn is running on the thread and the policy does not wait for it."""
+
+    def __init__(self, thread_id: str, reason: str) -> None:
+        super().__init__(
+            status_code=409,
+            detail=f"Thread {thread_id!r} already has a turn in progress ({reason})",
+        )
+
+
+@dataclass(eq=False)
+class _ThreadLock:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    holder: str | None = None  # correlation_id of the running turn
+    users: int = 0  # holder + waiters
+
+
+class ThreadLocks:
+    """One lock per active ``thread_id``, created on demand and dropped when idle."""
+
+    def __init__(
+        self,
+        runs: RunRegistry,
+        policy: str,
+        wait_timeout: float,
+        max_waiters: int,
+    ) -> None:
+        if policy not in POLICIES:
+            raise ValueError(f"THREAD_LOCK_POLICY must be one of {POLICIES}, got {policy!r}")
+        self._runs = runs
+        self.policy = policy
+        self._wait_timeout = wait_timeout
+        self._max_waiters = max_waiters
+        self._locks: dict[str, _ThreadLock] = {}
+        self._waits: deque[float] = deque(maxlen=_WAIT_SAMPLES)
+        self.acquired = 0
+        self.waited = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.superseded = 0
+
+    def reject_if_busy(self, thread_id: str) -> None:
+        """Fast 409 before any work is started, under the ``reject`` policy."""
+        entry = self._locks.get(thread_id)
+        if self.policy == "reject" and entry is not None and entry.lock.locked():
+            self.rejected += 1
+            raise ThreadBusy(thread_id, "rejected")
+
+    @asynccontextmanager
+    async def hold(self, thread_id: str, correlation_id: str):
+        """Hold ``thread_id``'s lock for the body, applying the policy if it is taken."""
+        entry = self._locks.get(thread_id)
+        if entry is None:
+            entry = self._locks[thread_id] = _ThreadLock()
+
+        if entry.lock.locked():
+            if self.policy == "reject":
+                self.rejected += 1
+                raise ThreadBusy(thread_id, "rejected")
+            if entry.users - 1 >= self._max_waiters:
+                self.rejected += 1
+                raise ThreadBusy(thread_id, "too many waiting turns")
+            if self.policy == "cancel_older" and entry.holder is not None:
+                if self._runs.cancel(entry.holder, "superseded"):
+                    self.superseded += 1
+
+        entry.users += 1
+        try:
+            started = time.monotonic()
+            try:
+                await asyncio.wait_for(entry.lock.acquire(), self._wait_timeout)
+            except TimeoutError:
+                self.timed_out += 1
+                raise ThreadBusy(thread_id, "timed out waiting") from None
+            wait_ms = round((time.monotonic() - started) * 1000, 1)
+            self._waits.append(wait_ms)
+            self.acquired += 1
+            if wait_ms >= 1:
+                self.waited += 1
+                logger.info(
+                    "thread_lock_wait",
+                    thread_id=thread_id,
+                    correlation_id=correlation_id,
+                    wait_ms=wait_ms,
+                )
+
+            entry.holder = correlation_id
+            try:
+                yield
+            finally:
+                entry.holder = None
+                entry.lock.release()
+        finally:
+            entry.users -= 1
+            if entry.users == 0 and self._locks.get(thread_id) is entry:
+                del self._locks[thread_id]
+
+    def stats(self) -> dict:
+        waits = list(self._waits)
+        return {
+            "policy": self.policy,
+            "active_threads": len(self._locks),
+            "acquired": self.acquired,
+            "waited": self.waited,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "superseded": self.superseded,
+            "lock_wait_ms": {
+                "p50": percentile(waits, 0.50),
+                "p95": percentile(waits, 0.95),
+                "max": max(waits) if waits else None,
+            },
+        }
@@ -0,0 +1,202 @@
+"""Sampled Langfuse tracing for v2 runs.
+
+The v2 routes used to attach one module-global Langfuse ``CallbackHandler`` to
+every run, so every run was traced in full. The handler does its work on the
+event loop, once per chain, LLM and tool callback. ``RunTracer`` decides per
+run instead:
+
+  • Head sampling. A run is traced in full (the handler is attached) with
+    probability TRACE_SAMPLE_RATE. TRACE_SAMPLE_RATES overrides the rate per
+    route: ``v2/invoke``, ``v2/invoke/batch``, ``v2/runs``, ``v2/stream``,
+    ``v2/ws``. An unsampled run pays nothing.
+  • Opt-in. A request with ``X-Trace: true`` (``"trace": true`` on a WebSocket
+    message) is always traced in full.
+  • Tail capture. An unsampled run that fails, or takes longer than
+    TRACE_SLOW_MS, is still recorded. It cannot be traced in full after the
+    fact, so a summary trace is exported instead: route, ids, input, output or
+    error, and duration.
+
+Summary traces go onto a bounded queue (TRACE_EXPORT_QUEUE_MAX) and are
+exported by a background thread. A full queue drops the trace and counts it;
+the event loop never waits on Langfuse. Full traces use the SDK's own
+background batch exporter. Tracing is off when LANGFUSE_PUBLIC_KEY or
+LANGFUSE_SECRET_KEY is unset. Counters are served at ``/api/runs/tracing``.
+"""
+
+import asyncio
+import queue
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator
+
+import structlog
+from fastapi import HTTPException
+from langfuse import Langfuse
+from langfuse.langchain import CallbackHandler
+
+from candidate_agent.api.cancellation import RunCancelled
+from candidate_agent.config import Settings
+
+logger = structlog.get_logger(__name__)
+
+_STOP = object()
+
+
+@dataclass
+class RunTrace:
+    """Tracing decision for one run; the route fills in ``output`` / ``error``."""
+
+    route: str
+    sampled: bool
+    callbacks: list
+    context: dict[str, Any]
+    input: str
+    started: float = field(default_factory=time.monotonic)
+    output: str | None = None
+    error: str | None = None
+
+
+async def traced_events(
+    events: AsyncIterator[tuple[str, dict]], trace: RunTrace
+) -> AsyncIterator[tuple[str, dict]]:
+    """Relay stream events, recording the answer text and any ``error`` event on ``trace``."""
+    parts: list[str] = []
+    async for event, data in events:
+        if event == "token":
+            parts.append(data["content"])
+        elif event == "error":
+            trace.error = data["detail"]
+        yield event, data
+    trace.output = "".join(parts)
+
+
+class RunTracer:
+    """Per-route head sampling, opt-in and tail capture around Langfuse."""
+
+    def __init__(self, settings: Settings) -> None:
+        secret = settings.langfuse_secret_key.get_secret_value() if settings.langfuse_secret_key else ""
+        self.enabled = bool(settings.langfuse_public_key and secret)
+        self._default_rate = settings.trace_sample_rate
+        self._rates = settings.trace_sample_rates
+        self._slow_ms = settings.trace_slow_ms
+        self._queue: queue.Queue = queue.Queue(maxsize=settings.trace_export_queue_max)
+        self._thread: threading.Thread | None = None
+        self._client = None
+        self._handler = None
+        if self.enabled:
+            self._client = Langfuse(
+                public_key=settings.langfuse_public_key,
+                secret_key=secret,
+                base_url=settings.langfuse_base_url,
+            )
+            self._handler = CallbackHandler(public_key=settings.langfuse_public_key)
+
+        self.decisions: Counter = Counter()  # "<route>:<sampled|opt_in|unsampled>"
+        self.tail_captured: Counter = Counter()  # by reason: error, slow
+        self.exported = 0
+        self.dropped = 0
+        self.export_failed = 0
+
+    def start(self) -> None:
+        if not self.enabled:
+            logger.info("tracing_disabled")
+            return
+        self._thread = threading.Thread(target=self._export_loop, name="trace-export", daemon=True)
+        self._thread.start()
+        logger.info("tracing_started", default_rate=self._default_rate, rates=self._rates)
+
+    async def stop(self) -> None:
+        """Export what is queued, then flush and shut down the Langfuse client."""
+        if self._thread is None:
+            return
+        await asyncio.to_thread(self._queue.put, _STOP)
+        await asyncio.to_thread(self._thread.join, 10.0)
+        await asyncio.to_thread(self._client.shutdown)  # type: ignore[union-attr]
+
+    def rate(self, route: str) -> float:
+        return self._rates.get(route, self._default_rate)
+
+    @asynccontextmanager
+    async def run(
+        self, route: str, *, input: str, opt_in: bool = False, **context: Any
+    ) -> AsyncIterator[RunTrace]:
+        """Decide whether to trace one run; ``trace.callbacks`` goes into its config.
+
+        An exception escaping the block marks the run failed (cancellations and
+        409/429 rejections do not).
+        """
+        if not self.enabled:
+            yield RunTrace(route, False, [], context, input)
+            return
+        if opt_in:
+            decision = "opt_in"
+        else:
+            decision = "sampled" if random.random() < self.rate(route) else "unsampled"
+        self.decisions[f"{route}:{decision}"] += 1
+        sampled = decision != "unsampled"
+        trace = RunTrace(route, sampled, [self._handler] if sampled else [], context, input)
+        try:
+            yield trace
+        except (RunCancelled, HTTPException):
+            raise
+        except Exception as exc:
+            trace.error = trace.error or f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            self._finish(trace)
+
+    def _finish(self, trace: RunTrace) -> None:
+        if trace.sampled:
+            return
+        elapsed_ms = (time.monotonic() - trace.started) * 1000
+        if trace.error is not None:
+            reason = "error"
+        elif elapsed_ms >= self._slow_ms:
+            reason = "slow"
+        else:
+            return
+        self.tail_captured[reason] += 1
+        try:
+            self._queue.put_nowait((trace, reason, round(elapsed_ms, 1)))
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("trace_dropped", route=trace.route, reason=reason)
+
+    def _export_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            trace, reason, elapsed_ms = item
+            try:
+                span = self._client.start_observation(  # type: ignore[union-attr]
+                    name=trace.route,
+                    input=trace.input,
+                    output=trace.output,
+                    metadata={**trace.context, "duration_ms": elapsed_ms, "captured": reason},
+                    level="ERROR" if trace.error else "WARNING",
+                    status_message=trace.error,
+                )
+                span.end()
+                self.exported += 1
+            except Exception as exc:
+                self.export_failed += 1
+                logger.warning("trace_export_failed", route=trace.route, error=str(exc))
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "default_rate": self._default_rate,
+            "rates": self._rates,
+            "slow_ms": self._slow_ms,
+            "decisions": dict(self.decisions),
+            "tail_captured": dict(self.tail_captured),
+            "queue_depth": self._queue.qsize(),
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "export_failed": self.export_failed,
+        }
@@ -0,0 +1,96 @@
+"""Per-turn result extraction shared by the v1 and v2 routes.
+
+Each turn's HumanMessage carries the turn id (also stored as ``turn_id`` in
+graph state). Extraction walks the thread backwards only until that message,
+so the work is proportional to the current turn rather than the whole thread,
+and ``tool_calls`` reports exactly this turn's calls.
+"""
+
+from dataclasses import dataclass, field
+from typing import Sequence
+
+import structlog
+from langchain_core.messages import AIMessage, AnyMessage, ToolMessage
+from pydantic import ValidationError
+
+from candidate_agent.agents.fanout import SUB_RUN_TOOL_CALLS_KEY
+from candidate_agent.agents.state import current_turn
+from candidate_agent.agents.structured import ANSWER_TOOL_NAME, StructuredAnswer
+from candidate_agent.agents.tool_timing import DURATION_KEY
+from candidate_agent.api.schemas import InvokeResponse, ToolTiming
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class ToolCallRecord:
+    name: str
+    duration_ms: float | None = None
+
+
+@dataclass
+class TurnResult:
+    response_text: str = ""
+    tool_calls: list[ToolCallRecord] = field(default_factory=list)
+    structured: StructuredAnswer | None = None  # response_format="json"
+
+    @property
+    def tool_names(self) -> list[str]:
+        return [tc.name for tc in self.tool_calls]
+
+    def to_response(self, *, thread_id: str, correlation_id: str, agent_used: str) -> InvokeResponse:
+        return InvokeResponse(
+            thread_id=thread_id,
+            correlation_id=correlation_id,
+            response=self.response_text,
+            agent_used=agent_used,
+            tool_calls=self.tool_names,
+            tool_timings=[ToolTiming(name=tc.name, duration_ms=tc.duration_ms) for tc in self.tool_calls],
+            structured=self.structured,
+        )
+
+
+def message_text(msg: AnyMessage) -> str:
+    """Text of a message whose content may be a string or a list of content blocks."""
+    if isinstance(msg.content, str):
+        return msg.content
+    return " ".join(
+        block.get("text", "")
+        for block in msg.content
+        if isinstance(block, dict) and block.get("type") == "text"
+    )
+
+
+def extract_turn(messages: Sequence[AnyMessage], turn_id: str | None) -> TurnResult:
+    """Return the final answer and tool calls of the turn started by ``turn_id``.
+
+    Falls back to the last HumanMessage as the turn boundary when ``turn_id``
+    is missing (e.g. threads created before turn ids were recorded). A
+    JSON-mode answer is read from the answer tool call's arguments, and the
+    answer tool is not reported as a tool call.
+    """
+    turn = current_turn(messages, turn_id)
+    result = TurnResult()
+    durations = {
+        m.tool_call_id: m.response_metadata.get(DURATION_KEY)
+        for m in turn
+        if isinstance(m, ToolMessage)
+    }
+    for msg in turn:
+        if not isinstance(msg, AIMessage):
+            continue
+        for tc in msg.tool_calls:
+            if tc["name"] == ANSWER_TOOL_NAME:
+                try:
+                    result.structured = StructuredAnswer.model_validate(tc["args"])
+                except ValidationError as exc:
+                    logger.warning("structured_answer_invalid", error=str(exc))
+                continue
+            result.tool_calls.append(ToolCallRecord(tc["name"], durations.get(tc["id"])))
+        for sub in msg.response_metadata.get(SUB_RUN_TOOL_CALLS_KEY, []):
+            result.tool_calls.append(ToolCallRecord(sub["name"], sub.get("duration_ms")))
+        if msg.content:
+            result.response_text = message_text(msg)
+    if result.structured is not None:
+        result.response_text = result.structured.answer
+    return result
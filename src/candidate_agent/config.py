@@ -15,6 +15,8 @@ class Settings(BaseSettings):
     # MCP server
     mcp_server_url: str = "http://localhost:8081/mcp"
     mcp_connect_timeout: int = 30
+    mcp_max_connections: int = 100  # shared HTTP pool for all MCP sessions (batch items included)
+    mcp_max_keepalive_connections: int = 20  # idle connections kept open for reuse
 
     # LLM — Anthropic (used when LOCAL_LLM=false)
     anthropic_api_key: Optional[SecretStr] = None
@@ -33,6 +35,94 @@ class Settings(BaseSettings):
     app_port: int = 8000
     log_level: str = "INFO"
 
+    # Health probing — MCP and LLM are checked in the background; probes read the cache
+    health_probe_interval_seconds: float = 10.0
+    health_probe_timeout_seconds: float = 3.0
+    health_probe_window: int = 360  # latency samples kept per dependency (1h at 10s)
+    health_failure_threshold: int = 3  # consecutive failures before /readyz answers 503
+    health_slow_probe_ms: float = 1000.0  # p95 above this marks the dependency degraded
+
+    # Tool result blob store — large ToolMessage payloads are kept out of checkpoints
+    tool_blob_store: str = "memory"  # memory | disk | none
+    tool_blob_dir: str = ".tool_blobs"  # used when TOOL_BLOB_STORE=disk
+    tool_blob_min_bytes: int = 2048  # payloads smaller than this stay inline
+    tool_blob_memory_max_bytes: int = 256 * 1024 * 1024
+
+    # SSE streaming — consecutive token chunks are merged into one frame
+    sse_coalesce_ms: float = 30.0  # flush buffered tokens at least this often
+    sse_coalesce_bytes: int = 256  # ... or once this much text is buffered; 0 disables
+
+    # PII redaction of streamed output (SSE and WebSocket)
+    pii_redaction_enabled: bool = False
+    pii_redaction_max_lookahead: int = 256  # max characters held back per token source
+
+    # v2 WebSocket sessions (/api/v2/agent/ws)
+    ws_heartbeat_seconds: float = 20.0
+
+    # Idempotency — retries with a known correlation_id reuse the run (/invoke, /stream)
+    idempotency_ttl_seconds: float = 300.0  # completed results kept this long
+    idempotency_max_entries: int = 1000  # completed results kept at most
+    idempotency_reattach_grace_seconds: float = 15.0  # stream run survives its last client this long
+    stream_replay_max_events: int = 2048  # events replayed frame by frame per stream run; older ones joined
+
+    # Per-thread run lock — one turn per thread_id at a time
+    thread_lock_policy: str = "queue"  # queue | reject (409) | cancel_older
+    thread_lock_wait_timeout_seconds: float = 60.0  # queue policy: 409 after waiting this long
+    thread_lock_max_waiters: int = 4  # queue policy: 409 when this many turns already wait
+
+    # Admission control — concurrent graph runs, fair wait queue, adaptive limit
+    admission_max_in_flight: int = 32  # starting limit
+    admission_min_limit: int = 4
+    admission_max_limit: int = 128
+    admission_max_queue: int = 200  # waiting runs beyond this are shed with 429
+    admission_queue_timeout_seconds: float = 30.0  # ... as are runs that wait longer
+    admission_per_candidate_max: int = 4  # slots one candidate_id may hold; 0 disables
+    admission_target_llm_latency_ms: float = 10000.0  # above this the limit shrinks; 0 = fixed
+    admission_adjust_interval_seconds: float = 5.0
+
+    # Graceful drain — in-flight runs finish, then thread checkpoints are handed off
+    drain_grace_seconds: float = 25.0
+    checkpoint_snapshot_path: str = ""  # empty disables export/import
+    drain_token: Optional[SecretStr] = None  # unset: POST /drain accepts loopback callers only
+
+    # v2 fan-out — multi-application questions run one sub-run per application (opt-in)
+    v2_fanout_enabled: bool = False
+    v2_fanout_max_concurrency: int = 4  # sub-runs in flight per fan-out, not per process
+    v2_fanout_max_applications: int = 12  # above this, fall back to the single ReAct loop
+
+    # v2 speculative specialist — run post_apply_assistant alongside the router (/invoke only)
+    v2_speculative_specialist: bool = False
+    v2_speculative_max_tokens: int = 8000  # spend cap before the router has decided
+
+    # v2 fast path — templated answers for single-tool questions, no LLM call (opt-in)
+    v2_fast_path_enabled: bool = False
+
+    # v2 batch invoke — NDJSON endpoint running many candidates per request
+    v2_batch_max_items: int = 500
+    v2_batch_max_concurrency: int = 8
+
+    # Async runs — submit/poll endpoints backed by an in-process worker queue
+    job_queue_max_depth: int = 1000
+    job_workers: int = 8
+    job_result_ttl_seconds: float = 900.0
+
+    # ReAct step budget — max tool calls per agent node per turn, then force an answer
+    agent_tool_call_budget: int = 8
+    agent_tool_call_budgets: dict[str, int] = {}  # per-node overrides, e.g. {"candidate_primary": 4}
+    agent_max_repeated_tool_calls: int = 2  # identical repeat calls tolerated before forcing an answer
+
+    # response_format="json" — output-token cap per LLM call of a structured-answer turn
+    structured_max_tokens: int = 512
+
+    # Langfuse tracing (v2 routes) — off unless both keys are set
+    langfuse_public_key: str = ""
+    langfuse_secret_key: Optional[SecretStr] = None
+    langfuse_base_url: str = "https://cloud.langfuse.com"
+    trace_sample_rate: float = 0.1  # share of runs traced in full (head sampling)
+    trace_sample_rates: dict[str, float] = {}  # per-route overrides, e.g. {"v2/stream": 0.02}
+    trace_slow_ms: float = 10000.0  # unsampled runs slower than this get a summary trace
+    trace_export_queue_max: int = 1000  # summary traces waiting for export; excess is dropped
+
     @model_validator(mode="after")
     def _check_api_key(self) -> "Settings":
         if not self.local_llm and self.anthropic_api_key is None:
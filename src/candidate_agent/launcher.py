@@ -0,0 +1,541 @@
+"""Multi-worker launcher with thread-affinity routing.
+
+MemorySaver keeps each conversation in the memory of one process, so scaling
+out with plain ``uvicorn --workers N`` breaks multi-turn context. This launcher
+starts N single-process workers on consecutive ports and runs a thin front
+proxy that consistently hashes ``thread_id`` (from the JSON request body) to a
+worker, so every turn of a thread reaches the same MemorySaver.
+
+    python -m candidate_agent.launcher --workers 4
+
+  • Consistent hashing with virtual nodes — when a worker dies or comes back,
+    only the threads that hashed to it move.
+  • Requests without a ``thread_id`` get one generated by the proxy, so the
+    follow-up turn (which echoes the returned ``thread_id``) lands on the same worker.
+  • ``/threads/{thread_id}/...`` paths route by the path's thread_id.
+  • Run-scoped paths (``/api/runs/{run_id}``, ``/api/runs/cancel/{correlation_id}``,
+    ``.../stream/{correlation_id}``) go to the worker that ran the request carrying that
+    id, remembered from request bodies; unknown ids are tried on each live worker in turn
+    until one answers with something other than 404/410 (or, for cancels, ``cancelled: false``).
+  • WebSocket sessions (``/api/v2/agent/ws``) are proxied by their ``thread_id`` query
+    parameter, generated when absent; the worker's close code (e.g. 1012 on drain) is passed on.
+  • Per-worker admin routes (``/metrics``, ``/api/runs/stats``, ``/health``) are not
+    aggregated — they answer from one worker; scrape worker ports directly for totals.
+  • ``GET /launcher/workers`` reports per-worker liveness and load.
+  • Crashed workers leave the ring, are restarted, and rejoin once they accept connections.
+"""
+
+import argparse
+import asyncio
+import bisect
+import hashlib
+import json
+import os
+import re
+import signal
+import sys
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Generic, Hashable, TypeVar
+from urllib.parse import urlencode
+from uuid import uuid4
+
+import httpx
+import structlog
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route, WebSocketRoute
+from starlette.websockets import WebSocket, WebSocketDisconnect
+from websockets.asyncio.client import connect as ws_connect  # installed by uvicorn[standard]
+from websockets.exceptions import ConnectionClosed, InvalidHandshake
+
+from candidate_agent.config import settings
+from candidate_agent.logging_setup import configure_logging
+
+logger = structlog.get_logger(__name__)
+
+N = TypeVar("N", bound=Hashable)
+
+# Headers that must not be forwarded verbatim by a proxy
+_HOP_BY_HOP = frozenset(
+    {
+        "connection",
+        "keep-alive",
+        "transfer-encoding",
+        "te",
+        "trailer",
+        "upgrade",
+        "proxy-authorization",
+        "proxy-authenticate",
+        "host",
+        "content-length",
+    }
+)
+
+
+# Paths that name a thread, or a run held by whichever worker started it
+_THREAD_PATH = re.compile(r"/threads/([^/]+)/")
+_RUN_PATH = re.compile(r"^/api/(?:runs(?:/cancel)?|v[12]/agent/stream)/([^/]+)$")
+
+# Run ids / correlation ids whose owning worker is remembered
+_MAX_OWNERS = 10_000
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing(Generic[N]):
+    """Consistent hash ring with ``vnodes`` virtual points per node."""
+
+    def __init__(self, vnodes: int = 64) -> None:
+        self._vnodes = vnodes
+        self._points: list[int] = []
+        self._owners: dict[int, N] = {}
+        self._nodes: set[N] = set()
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, node: N) -> bool:
+        return node in self._nodes
+
+    def add(self, node: N) -> None:
+        if node in self._nodes:
+            return
+        self._nodes.add(node)
+        for i in range(self._vnodes):
+            point = _hash(f"{node}#{i}")
+            self._owners[point] = node
+            bisect.insort(self._points, point)
+
+    def remove(self, node: N) -> None:
+        if node not in self._nodes:
+            return
+        self._nodes.discard(node)
+        for i in range(self._vnodes):
+            point = _hash(f"{node}#{i}")
+            if self._owners.get(point) == node:
+                del self._owners[point]
+                self._points.pop(bisect.bisect_left(self._points, point))
+
+    def get(self, key: str) -> N | None:
+        """Return the node owning ``key`` (first point clockwise), or None if empty."""
+        if not self._points:
+            return None
+        idx = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[self._points[idx]]
+
+
+# ── Worker pool ───────────────────────────────────────────────────────────────
+
+
+@dataclass(eq=False)
+class Worker:
+    index: int
+    port: int
+    process: asyncio.subprocess.Process | None = None
+    restarts: int = 0
+    inflight: int = 0
+    requests: int = 0
+    errors: int = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __str__(self) -> str:
+        return f"worker-{self.index}"
+
+
+@dataclass
+class WorkerPool:
+    count: int
+    base_port: int
+    vnodes: int = 64
+    workers: list[Worker] = field(default_factory=list)
+    ring: HashRing[Worker] = field(init=False)
+    owners: OrderedDict[str, Worker] = field(init=False)  # run/correlation id → worker (LRU)
+    _stopping: bool = False
+
+    def __post_init__(self) -> None:
+        self.ring = HashRing(self.vnodes)
+        self.owners = OrderedDict()
+        self.workers = [Worker(index=i, port=self.base_port + i) for i in range(self.count)]
+
+    def _worker_env(self, worker: Worker) -> dict[str, str]:
+        env = dict(os.environ)
+        # Each worker owns its own thread snapshot — they must not overwrite each other
+        if settings.checkpoint_snapshot_path:
+            env["CHECKPOINT_SNAPSHOT_PATH"] = f"{settings.checkpoint_snapshot_path}.{worker}"
+        return env
+
+    async def _spawn(self, worker: Worker) -> None:
+        worker.process = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "uvicorn", "candidate_agent.main:app",
+            "--host", "127.0.0.1",
+            "--port", str(worker.port),
+            "--log-level", settings.log_level.lower(),
+            env=self._worker_env(worker),
+        )
+        logger.info("worker_spawned", worker=str(worker), port=worker.port, pid=worker.process.pid)
+
+    async def _wait_ready(self, worker: Worker, timeout: float = 120.0) -> bool:
+        """Poll until the worker accepts TCP connections (lifespan startup finished)."""
+        deadline = asyncio.get_running_loop().time() + timeout
+        while asyncio.get_running_loop().time() < deadline:
+            if worker.process is None or worker.process.returncode is not None:
+                return False
+            try:
+                _, writer = await asyncio.open_connection("127.0.0.1", worker.port)
+                writer.close()
+                await writer.wait_closed()
+                return True
+            except OSError:
+                await asyncio.sleep(0.25)
+        return False
+
+    async def _supervise(self, worker: Worker) -> None:
+        """Keep one worker alive: spawn, join the ring when ready, leave it on exit, restart."""
+        backoff = 1.0
+        while not self._stopping:
+            await self._spawn(worker)
+            if await self._wait_ready(worker):
+                self.ring.add(worker)
+                logger.info("worker_joined_ring", worker=str(worker), ring_size=len(self.ring))
+                backoff = 1.0
+            returncode = await worker.process.wait()  # type: ignore[union-attr]
+            self.ring.remove(worker)
+            if self._stopping:
+                break
+            worker.restarts += 1
+            logger.warning(
+                "worker_exited",
+                worker=str(worker),
+                returncode=returncode,
+                restarts=worker.restarts,
+                ring_size=len(self.ring),
+            )
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    async def rejoin(self, worker: Worker) -> None:
+        """Put a worker that dropped a connection back on the ring once it answers again."""
+        if await self._wait_ready(worker, timeout=30.0) and not self._stopping:
+            self.ring.add(worker)
+            logger.info("worker_rejoined_ring", worker=str(worker), ring_size=len(self.ring))
+
+    def start(self) -> list[asyncio.Task]:
+        return [asyncio.create_task(self._supervise(w)) for w in self.workers]
+
+    async def stop(self, timeout: float) -> None:
+        """SIGTERM every worker (each drains itself) and wait for them to exit."""
+        self._stopping = True
+        procs = [w.process for w in self.workers if w.process and w.process.returncode is None]
+        for proc in procs:
+            proc.send_signal(signal.SIGTERM)
+        try:
+            await asyncio.wait_for(asyncio.gather(*(p.wait() for p in procs)), timeout=timeout)
+        except TimeoutError:
+            for proc in procs:
+                if proc.returncode is None:
+                    proc.kill()
+
+    def pick(self, thread_id: str | None) -> Worker | None:
+        """Route by ``thread_id`` when present; otherwise to the least-loaded live worker."""
+        if thread_id:
+            return self.ring.get(thread_id)
+        live = [w for w in self.workers if w in self.ring]
+        if not live:
+            return None
+        return min(live, key=lambda w: w.inflight)
+
+    def remember(self, run_key: str, worker: Worker) -> None:
+        """Record that ``worker`` holds the run identified by ``run_key``."""
+        self.owners[run_key] = worker
+        self.owners.move_to_end(run_key)
+        if len(self.owners) > _MAX_OWNERS:
+            self.owners.popitem(last=False)
+
+    def candidates(self, run_key: str) -> list[Worker]:
+        """Live workers to try for ``run_key``: the remembered owner, then least-loaded first."""
+        live = sorted((w for w in self.workers if w in self.ring), key=lambda w: w.inflight)
+        owner = self.owners.get(run_key)
+        if owner in live:
+            live.remove(owner)
+            live.insert(0, owner)
+        return live
+
+    def snapshot(self) -> list[dict]:
+        return [
+            {
+                "worker": str(w),
+                "port": w.port,
+                "pid": w.process.pid if w.process else None,
+                "alive": bool(w.process and w.process.returncode is None),
+                "in_ring": w in self.ring,
+                "inflight": w.inflight,
+                "requests": w.requests,
+                "errors": w.errors,
+                "restarts": w.restarts,
+            }
+            for w in self.workers
+        ]
+
+
+# ── Front proxy ───────────────────────────────────────────────────────────────
+
+
+def _affinity_key(path: str, body: bytes) -> tuple[str | None, str | None, bytes]:
+    """Return ``(thread_id, correlation_id, body)``; injects a thread_id into agent requests.
+
+    A ``/threads/{thread_id}/`` path wins over the body. Only JSON object bodies
+    carrying a ``message`` field are treated as agent requests. Everything else
+    (health checks, admin calls) has no affinity.
+    """
+    if match := _THREAD_PATH.search(path):
+        return match.group(1), None, body
+    if not body:
+        return None, None, body
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return None, None, body
+    if not isinstance(payload, dict):
+        return None, None, body
+    correlation_id = str(payload["correlation_id"]) if payload.get("correlation_id") else None
+    thread_id = payload.get("thread_id")
+    if thread_id:
+        return str(thread_id), correlation_id, body
+    if "message" in payload:
+        payload["thread_id"] = thread_id = str(uuid4())
+        return thread_id, correlation_id, json.dumps(payload).encode("utf-8")
+    return None, correlation_id, body
+
+
+def _run_key(path: str) -> str | None:
+    """The run_id / correlation_id addressed by a run-scoped path, else None."""
+    match = _RUN_PATH.match(path)
+    return match.group(1) if match else None
+
+
+async def _is_miss(path: str, upstream: httpx.Response) -> bool:
+    """True when a worker does not hold the run a run-scoped request addressed."""
+    if upstream.status_code in (404, 410):
+        return True
+    if path.startswith("/api/runs/cancel/") and upstream.status_code == 200:
+        await upstream.aread()
+        return upstream.json().get("cancelled") is False
+    return False
+
+
+def _forwarded_headers(headers, client) -> list[tuple[str, str]]:
+    """Request headers minus hop-by-hop ones, with the caller appended to X-Forwarded-For.
+
+    Workers see the launcher's loopback address; this keeps proxied callers from
+    passing loopback-only checks (POST /drain).
+    """
+    out = [
+        (k, v)
+        for k, v in headers.items()
+        if k.lower() not in _HOP_BY_HOP and k.lower() != "x-forwarded-for"
+    ]
+    peer = client.host if client else "unknown"
+    forwarded = headers.get("x-forwarded-for")
+    out.append(("x-forwarded-for", f"{forwarded}, {peer}" if forwarded else peer))
+    return out
+
+
+def build_front_app(
+    pool: WorkerPool, shutdown_timeout: float, client: httpx.AsyncClient | None = None
+) -> Starlette:
+    """Return the ASGI front proxy for ``pool``."""
+    client = client or httpx.AsyncClient(timeout=httpx.Timeout(None, connect=5.0))
+    background: set[asyncio.Task] = set()
+
+    async def workers(request: Request) -> Response:
+        return JSONResponse({"ring_size": len(pool.ring), "workers": pool.snapshot()})
+
+    def unreachable(worker: Worker, exc: Exception, attempt: int) -> None:
+        worker.errors += 1
+        if worker in pool.ring:
+            pool.ring.remove(worker)
+            background.add(task := asyncio.create_task(pool.rejoin(worker)))
+            task.add_done_callback(background.discard)
+        logger.warning("worker_unreachable", worker=str(worker), error=str(exc), attempt=attempt)
+
+    async def send(request: Request, worker: Worker, headers, body: bytes) -> httpx.Response:
+        upstream_request = client.build_request(
+            request.method,
+            worker.url + request.url.path,
+            params=request.query_params,
+            headers=headers,
+            content=body,
+        )
+        worker.inflight += 1
+        worker.requests += 1
+        try:
+            return await client.send(upstream_request, stream=True)
+        except BaseException:
+            worker.inflight -= 1
+            raise
+
+    async def proxy(request: Request) -> Response:
+        path = request.url.path
+        thread_id, correlation_id, body = _affinity_key(path, await request.body())
+        run_key = _run_key(path)
+        headers = _forwarded_headers(request.headers, request.client)
+
+        upstream = worker = None
+        if run_key:
+            # The run lives on one worker only; try its remembered owner, then the rest.
+            # The last worker's answer is returned as-is, so a miss everywhere keeps its 404/410.
+            candidates = pool.candidates(run_key)
+            for attempt, worker in enumerate(candidates):
+                try:
+                    upstream = await send(request, worker, headers, body)
+                except httpx.TransportError as exc:
+                    unreachable(worker, exc, attempt)
+                    continue
+                if not await _is_miss(path, upstream):
+                    pool.remember(run_key, worker)
+                    break
+                if attempt == len(candidates) - 1:
+                    break
+                await upstream.aclose()
+                worker.inflight -= 1
+                upstream = None
+            if upstream is None:
+                return JSONResponse({"detail": "No workers available"}, status_code=503)
+        else:
+            # One retry: if the owner just died, the ring already points at its successor
+            for attempt in range(2):
+                worker = pool.pick(thread_id)
+                if worker is None:
+                    return JSONResponse({"detail": "No workers available"}, status_code=503)
+                try:
+                    upstream = await send(request, worker, headers, body)
+                    break
+                except httpx.TransportError as exc:
+                    unreachable(worker, exc, attempt)
+            else:
+                return JSONResponse({"detail": "Worker unavailable"}, status_code=503)
+            if correlation_id:
+                pool.remember(correlation_id, worker)
+
+        async def relay():
+            try:
+                if upstream.is_stream_consumed:
+                    yield upstream.content
+                else:
+                    async for chunk in upstream.aiter_raw():
+                        yield chunk
+            finally:
+                await upstream.aclose()
+                worker.inflight -= 1
+
+        response_headers = {
+            k: v for k, v in upstream.headers.items() if k.lower() not in _HOP_BY_HOP
+        }
+        return StreamingResponse(relay(), status_code=upstream.status_code, headers=response_headers)
+
+    async def ws_proxy(websocket: WebSocket) -> None:
+        params = dict(websocket.query_params)
+        params["thread_id"] = params.get("thread_id") or str(uuid4())
+        worker = pool.pick(params["thread_id"])
+        if worker is None:
+            await websocket.close(code=1013, reason="No workers available")
+            return
+        url = f"ws://127.0.0.1:{worker.port}{websocket.url.path}?{urlencode(params)}"
+        headers = [
+            (k, v)
+            for k, v in _forwarded_headers(websocket.headers, websocket.client)
+            if not k.lower().startswith("sec-websocket-")
+        ]
+        try:
+            upstream = await ws_connect(url, additional_headers=headers, max_size=None)
+        except (OSError, InvalidHandshake) as exc:
+            # Refused handshakes include a draining worker (1013 before accept)
+            logger.warning("worker_ws_refused", worker=str(worker), error=str(exc))
+            await websocket.close(code=1013, reason="Worker unavailable")
+            return
+
+        await websocket.accept()
+        worker.inflight += 1
+        worker.requests += 1
+
+        async def client_to_worker() -> None:
+            try:
+                while True:
+                    message = await websocket.receive()
+                    if message["type"] == "websocket.disconnect":
+                        return
+                    await upstream.send(message.get("text") or message.get("bytes") or "")
+            except ConnectionClosed:
+                return
+
+        async def worker_to_client() -> None:
+            try:
+                async for frame in upstream:
+                    if isinstance(frame, str):
+                        await websocket.send_text(frame)
+                    else:
+                        await websocket.send_bytes(frame)
+            except ConnectionClosed:
+                pass
+            try:
+                await websocket.close(code=upstream.close_code or 1000, reason=upstream.close_reason or "")
+            except (RuntimeError, WebSocketDisconnect):
+                pass  # client already gone
+
+        tasks = [asyncio.create_task(client_to_worker()), asyncio.create_task(worker_to_client())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await upstream.close()
+            worker.inflight -= 1
+
+    @asynccontextmanager
+    async def lifespan(app):
+        tasks = pool.start()
+        yield
+        await pool.stop(shutdown_timeout)
+        for task in tasks:
+            task.cancel()
+        await client.aclose()
+
+    return Starlette(
+        routes=[
+            Route("/launcher/workers", workers, methods=["GET"]),
+            Route("/{path:path}", proxy, methods=["GET", "POST", "PUT", "PATCH", "DELETE"]),
+            WebSocketRoute("/{path:path}", ws_proxy),
+        ],
+        lifespan=lifespan,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run candidate-agent workers behind a thread-affinity proxy.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--host", default=settings.app_host)
+    parser.add_argument("--port", type=int, default=settings.app_port)
+    parser.add_argument("--worker-base-port", type=int, default=settings.app_port + 100)
+    parser.add_argument("--vnodes", type=int, default=64, help="Virtual nodes per worker on the hash ring")
+    args = parser.parse_args()
+
+    configure_logging(settings.log_level)
+    pool = WorkerPool(count=args.workers, base_port=args.worker_base_port, vnodes=args.vnodes)
+    # Give workers their full drain window before the launcher gives up on them
+    app = build_front_app(pool, shutdown_timeout=settings.drain_grace_seconds + 10)
+    logger.info("launcher_start", workers=args.workers, port=args.port, worker_base_port=args.worker_base_port)
+    uvicorn.run(app, host=args.host, port=args.port, log_level=settings.log_level.lower())
+
+
+if __name__ == "__main__":
+    main()
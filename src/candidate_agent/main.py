@@ -1,8 +1,13 @@
 """FastAPI application entry point.
 
 Lifespan:
-  startup  — configure logging, init MCP registry, compile LangGraph
-  shutdown — no explicit teardown needed (MCP client is stateless per-call)
+  startup  — configure logging, init MCP registry, compile LangGraph,
+             import the thread checkpoint snapshot left by the previous process,
+             start the async run workers, the background health prober and the
+             trace exporter
+  shutdown — drain: finish in-flight and queued runs, export thread checkpoints
+             (no-op if POST /drain already ran), then stop the run workers, the
+             prober and the trace exporter, and close the shared MCP connection pool
 """
 
 from contextlib import asynccontextmanager
@@ -10,10 +15,26 @@ from contextlib import asynccontextmanager
 import structlog
 from fastapi import FastAPI
 
+from candidate_agent.agents.blob_store import build_blob_store
+from candidate_agent.agents.checkpoint_snapshot import import_checkpoints
 from candidate_agent.agents.graph import build_graph, build_v2_graph
+from candidate_agent.api.admission import AdmissionController
+from candidate_agent.api.cancellation import RunRegistry
+from candidate_agent.api.drain import RunTracker, drain
+from candidate_agent.api.health_probe import HealthProber
+from candidate_agent.api.idempotency import IdempotencyStore
+from candidate_agent.api.jobs import JobQueue
+from candidate_agent.api.metrics import HTTPMetricsMiddleware
 from candidate_agent.api.routes.agent import router as agent_router
 from candidate_agent.api.routes.agent_v2 import router as agent_v2_router
+from candidate_agent.api.routes.agent_v2_ws import router as agent_v2_ws_router
 from candidate_agent.api.routes.health import router as health_router
+from candidate_agent.api.routes.lifecycle import router as lifecycle_router
+from candidate_agent.api.routes.metrics import router as metrics_router
+from candidate_agent.api.routes.runs import router as runs_router
+from candidate_agent.api.routes.threads import router as threads_router
+from candidate_agent.api.thread_locks import ThreadLocks
+from candidate_agent.api.tracing import RunTracer
 from candidate_agent.config import settings
 from candidate_agent.logging_setup import configure_logging
 from candidate_agent.mcp.client import init_registry
@@ -42,15 +63,72 @@ async def lifespan(app: FastAPI):
     # Load MCP tools and static resources from candidate-mcp server
     registry = await init_registry(settings)
 
+    # Large tool results are stored out-of-band; both graphs share one store
+    blob_store = build_blob_store(
+        settings.tool_blob_store,
+        settings.tool_blob_dir,
+        settings.tool_blob_memory_max_bytes,
+    )
+
     # Compile both graphs — they share the same registry and LLM config
-    graph = build_graph(registry, settings)
-    v2_graph = build_v2_graph(registry, settings)
+    graph = build_graph(registry, settings, blob_store)
+    v2_graph = build_v2_graph(registry, settings, blob_store)
+
+    # Resume threads handed off by the previous process (see api/drain.py)
+    if settings.checkpoint_snapshot_path:
+        try:
+            await import_checkpoints(
+                {"v1": graph.checkpointer, "v2": v2_graph.checkpointer},
+                settings.checkpoint_snapshot_path,
+            )
+        except Exception as exc:
+            logger.error("checkpoint_import_failed", error=str(exc), exc_info=True)
 
     # Attach to app state so dependencies can access them
     app.state.mcp_registry = registry
+    app.state.blob_store = blob_store
     app.state.graph = graph
     app.state.v2_graph = v2_graph
     app.state.settings = settings
+    app.state.run_tracker = RunTracker()
+    app.state.run_registry = RunRegistry()
+    app.state.idempotency = IdempotencyStore(
+        app.state.run_registry,
+        ttl=settings.idempotency_ttl_seconds,
+        max_entries=settings.idempotency_max_entries,
+        reattach_grace=settings.idempotency_reattach_grace_seconds,
+        replay_max_events=settings.stream_replay_max_events,
+        coalesce_ms=settings.sse_coalesce_ms,
+        coalesce_bytes=settings.sse_coalesce_bytes,
+    )
+    app.state.thread_locks = ThreadLocks(
+        app.state.run_registry,
+        policy=settings.thread_lock_policy,
+        wait_timeout=settings.thread_lock_wait_timeout_seconds,
+        max_waiters=settings.thread_lock_max_waiters,
+    )
+    app.state.admission = AdmissionController(
+        limit=settings.admission_max_in_flight,
+        min_limit=settings.admission_min_limit,
+        max_limit=settings.admission_max_limit,
+        max_queue=settings.admission_max_queue,
+        queue_timeout=settings.admission_queue_timeout_seconds,
+        per_candidate=settings.admission_per_candidate_max,
+        target_llm_latency_ms=settings.admission_target_llm_latency_ms,
+        adjust_interval=settings.admission_adjust_interval_seconds,
+    )
+    app.state.drain_task = None
+    app.state.job_queue = JobQueue(
+        app.state.run_tracker,
+        max_depth=settings.job_queue_max_depth,
+        workers=settings.job_workers,
+        result_ttl=settings.job_result_ttl_seconds,
+    )
+    app.state.job_queue.start()
+    app.state.health_prober = HealthProber(settings)
+    app.state.health_prober.start()
+    app.state.tracer = RunTracer(settings)
+    app.state.tracer.start()
 
     logger.info(
         "startup_complete",
@@ -58,6 +136,11 @@ async def lifespan(app: FastAPI):
     )
     yield
     logger.info("shutdown")
+    await drain(app.state)
+    await app.state.job_queue.stop()
+    await app.state.health_prober.stop()
+    await app.state.tracer.stop()
+    await registry.aclose()
 
 
 app = FastAPI(
@@ -71,6 +154,13 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+app.add_middleware(HTTPMetricsMiddleware)
+
 app.include_router(agent_router, prefix="/api/v1/agent")
 app.include_router(agent_v2_router, prefix="/api/v2/agent")
+app.include_router(agent_v2_ws_router, prefix="/api/v2/agent")
 app.include_router(health_router)
+app.include_router(runs_router)
+app.include_router(threads_router)
+app.include_router(lifecycle_router)
+app.include_router(metrics_router)
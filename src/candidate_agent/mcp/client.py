@@ -2,14 +2,20 @@
 
 langchain-mcp-adapters 0.2.x design:
   - MultiServerMCPClient is NOT a context manager; call `await client.get_tools()` directly.
-  - Each tool invocation creates a fresh HTTP session to the stateless MCP server, which
+  - Each tool invocation creates a fresh MCP session to the stateless MCP server, which
     is exactly what we want — no persistent session state to manage.
+  - Sessions share one process-wide HTTP connection pool (MCP_MAX_CONNECTIONS), so a
+    fresh session reuses a kept-alive TCP/TLS connection instead of dialling again.
+    The adapter closes each session's httpx client; ``_SharedTransport`` keeps that from
+    closing the pool. LLM clients need no equivalent: langchain-anthropic/-openai already
+    cache one httpx client per process.
   - get_resources(server_name, uris=[...]) fetches specific resource URIs (including templates).
   - Dynamic resource templates require explicit URIs; they are NOT returned by uris=None.
 """
 
 from dataclasses import dataclass, field
 
+import httpx
 import structlog
 from langchain_core.tools import BaseTool
 from langchain_mcp_adapters.client import MultiServerMCPClient
@@ -65,6 +71,38 @@ _KNOWLEDGE_URIS = [
 ]
 
 
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """One MCP session's view of the shared pool; closing it leaves the pool open."""
+
+    def __init__(self, pool: httpx.AsyncBaseTransport) -> None:
+        self._pool = pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._pool.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pass
+
+
+def pooled_client_factory(pool: httpx.AsyncBaseTransport):
+    """``httpx_client_factory`` for MCP connections: per-session clients over ``pool``."""
+
+    def factory(
+        headers: dict[str, str] | None = None,
+        timeout: httpx.Timeout | None = None,
+        auth: httpx.Auth | None = None,
+    ) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            transport=_SharedTransport(pool),
+            headers=headers,
+            timeout=timeout,
+            auth=auth,
+            follow_redirects=True,
+        )
+
+    return factory
+
+
 def _blob_text(blobs, uri: str) -> str:
     """Extract the text content of a Blob whose metadata['uri'] matches ``uri``."""
     for blob in blobs:
@@ -84,6 +122,7 @@ class MCPToolRegistry:
     """
 
     client: MultiServerMCPClient
+    http_pool: httpx.AsyncBaseTransport | None = None  # shared by every MCP session
     all_tools: list[BaseTool] = field(default_factory=list)
     app_tools: list[BaseTool] = field(default_factory=list)
     post_apply_tools: list[BaseTool] = field(default_factory=list)
@@ -94,12 +133,23 @@ class MCPToolRegistry:
     candidate_schema_json: str = ""     # ats://schema/candidate
     application_schema_json: str = ""   # ats://schema/application
 
+    async def aclose(self) -> None:
+        """Close the shared MCP connection pool (shutdown only)."""
+        if self.http_pool is not None:
+            await self.http_pool.aclose()
+
 
 async def init_registry(settings: Settings) -> MCPToolRegistry:
     """Create the MCP client, load all tools and static knowledge resources.
 
     Called once during FastAPI lifespan startup.
     """
+    http_pool = httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(
+            max_connections=settings.mcp_max_connections,
+            max_keepalive_connections=settings.mcp_max_keepalive_connections,
+        )
+    )
     client = MultiServerMCPClient(
         {
             "candidate_mcp": {
@@ -109,6 +159,7 @@ async def init_registry(settings: Settings) -> MCPToolRegistry:
                 "headers": {
                     "Accept": "application/json, text/event-stream",
                 },
+                "httpx_client_factory": pooled_client_factory(http_pool),
             }
         }
     )
@@ -149,6 +200,7 @@ async def init_registry(settings: Settings) -> MCPToolRegistry:
 
     return MCPToolRegistry(
         client=client,
+        http_pool=http_pool,
         all_tools=all_tools,
         app_tools=app_tools,
         post_apply_tools=post_apply_tools,
@@ -0,0 +1,138 @@
+"""Test doubles shared by the graph-level unit tests."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Callable
+
+from fastapi import FastAPI
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from candidate_agent.api.admission import AdmissionController
+from candidate_agent.api.cancellation import RunRegistry
+from candidate_agent.api.drain import RunTracker
+from candidate_agent.api.idempotency import IdempotencyStore
+from candidate_agent.api.thread_locks import ThreadLocks
+from candidate_agent.api.tracing import RunTracer
+from candidate_agent.config import Settings
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model whose reply is ``respond(messages)``.
+
+    Replies depend only on the conversation, not on call order, so concurrent
+    sub-runs get deterministic answers. Streamed text arrives word by word,
+    ``chunk_delay`` seconds apart.
+    """
+
+    respond: Callable[[list[BaseMessage]], AIMessage]
+    chunk_delay: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ScriptedChatModel":
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=self.respond(messages))])
+
+    async def _astream(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        reply = self.respond(messages)
+        if reply.tool_calls:
+            chunks = [
+                {"name": tc["name"], "args": json.dumps(tc["args"]), "id": tc["id"], "index": i}
+                for i, tc in enumerate(reply.tool_calls)
+            ]
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=chunks))
+            return
+        for word in reply.content.split(" "):
+            if self.chunk_delay:
+                await asyncio.sleep(self.chunk_delay)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+            if run_manager:
+                await run_manager.on_llm_new_token(word + " ", chunk=chunk)
+            yield chunk
+
+
+def tool_call(name: str, args: dict, call_id: str) -> AIMessage:
+    return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": call_id}])
+
+
+def last_human(messages: list[BaseMessage]) -> str:
+    return next(m.content for m in reversed(messages) if isinstance(m, HumanMessage))
+
+
+def after_tool(messages: list[BaseMessage]) -> bool:
+    return isinstance(messages[-1], ToolMessage)
+
+
+def registry(post_apply_tools: list) -> SimpleNamespace:
+    """Stand-in for ``MCPToolRegistry`` with no schema resources."""
+    return SimpleNamespace(
+        all_tools=[],
+        app_tools=[],
+        post_apply_tools=post_apply_tools,
+        workflow_states_json="",
+        assessment_types_json="",
+        candidate_schema_json="",
+        application_schema_json="",
+    )
+
+
+def settings(**overrides: Any) -> Settings:
+    return Settings(anthropic_api_key="test", **overrides)
+
+
+def app_state(app: FastAPI, settings: Settings, **state: Any) -> None:
+    """Populate ``app.state`` the way the lifespan does, minus MCP and background tasks."""
+    runs = RunRegistry()
+    app.state.settings = settings
+    app.state.run_tracker = RunTracker()
+    app.state.run_registry = runs
+    app.state.blob_store = None
+    app.state.tracer = RunTracer(settings)
+    app.state.idempotency = IdempotencyStore(
+        runs,
+        ttl=settings.idempotency_ttl_seconds,
+        max_entries=settings.idempotency_max_entries,
+        reattach_grace=settings.idempotency_reattach_grace_seconds,
+        replay_max_events=settings.stream_replay_max_events,
+        coalesce_ms=settings.sse_coalesce_ms,
+        coalesce_bytes=settings.sse_coalesce_bytes,
+    )
+    app.state.thread_locks = ThreadLocks(
+        runs,
+        policy=settings.thread_lock_policy,
+        wait_timeout=settings.thread_lock_wait_timeout_seconds,
+        max_waiters=settings.thread_lock_max_waiters,
+    )
+    app.state.admission = AdmissionController(
+        limit=settings.admission_max_in_flight,
+        min_limit=settings.admission_min_limit,
+        max_limit=settings.admission_max_limit,
+        max_queue=settings.admission_max_queue,
+        queue_timeout=settings.admission_queue_timeout_seconds,
+        per_candidate=settings.admission_per_candidate_max,
+        target_llm_latency_ms=settings.admission_target_llm_latency_ms,
+        adjust_interval=settings.admission_adjust_interval_seconds,
+    )
+    for name, value in state.items():
+        setattr(app.state, name, value)
+
+
+def v2_input(question: str, turn_id: str = "t1", **state: Any) -> dict:
+    return {
+        "messages": [HumanMessage(question, id=turn_id)],
+        "turn_id": turn_id,
+        "candidate_id": "C1",
+        "application_id": "",
+        "correlation_id": turn_id,
+        "active_agent": "v2_primary_assistant",
+        **state,
+    }
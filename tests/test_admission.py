@@ -0,0 +1,100 @@
+"""Unit tests for the admission controller (no MCP server or LLM needed)."""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from candidate_agent.agents.usage import TokenCounter
+from candidate_agent.api.admission import AdmissionController
+
+
+def _controller(**overrides) -> AdmissionController:
+    options = dict(
+        limit=1,
+        min_limit=1,
+        max_limit=4,
+        max_queue=8,
+        queue_timeout=5.0,
+        per_candidate=0,
+        target_llm_latency_ms=0,
+        adjust_interval=0,
+    )
+    options.update(overrides)
+    return AdmissionController(**options)
+
+
+async def test_waiting_candidates_are_served_round_robin():
+    ac = _controller()
+    order: list[str] = []
+
+    async def run(candidate: str) -> None:
+        async with ac.slot(candidate):
+            order.append(candidate)
+            await asyncio.sleep(0.01)
+
+    # A floods the queue before B arrives; B must not wait behind all of A
+    tasks = [asyncio.create_task(run("A")) for _ in range(4)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(run("B")))
+    await asyncio.gather(*tasks)
+
+    assert order.index("B") <= 2
+    assert ac.in_flight == 0 and ac.queued == 0
+
+
+async def test_full_queue_sheds_with_retry_after():
+    ac = _controller(max_queue=1)
+    release = asyncio.Event()
+
+    async def hold() -> None:
+        async with ac.slot("A"):
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    waiter = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await ac.acquire("B")
+    assert exc_info.value.status_code == 429
+    assert int(exc_info.value.headers["Retry-After"]) >= 1
+    assert ac.stats()["shed"] == {"queue_full": 1}
+
+    release.set()
+    await asyncio.gather(holder, waiter)
+
+
+async def test_cancelled_waiter_leaves_no_slot_behind():
+    ac = _controller()
+    release = asyncio.Event()
+
+    async def hold() -> None:
+        async with ac.slot("A"):
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(ac.acquire("B"))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    release.set()
+    await asyncio.gather(holder, waiter, return_exceptions=True)
+
+    assert ac.in_flight == 0 and ac.queued == 0
+
+
+async def test_limit_shrinks_on_slow_llm_and_grows_when_saturated():
+    ac = _controller(limit=4, target_llm_latency_ms=100)
+    slow, fast = TokenCounter(), TokenCounter()
+    slow.llm_latencies_ms = [500.0] * 5
+    fast.llm_latencies_ms = [10.0] * 40
+
+    async with ac.slot("A", slow):
+        pass
+    assert ac.limit == 3
+
+    ac._saturated = True
+    async with ac.slot("A", fast):
+        pass
+    assert ac.limit == 4
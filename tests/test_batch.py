@@ -0,0 +1,92 @@
+"""Unit tests for v2 /invoke/batch and the pooled MCP client (no MCP server or LLM needed)."""
+
+import asyncio
+import json
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+
+from candidate_agent.agents import graph as graph_module
+from candidate_agent.api.routes import agent_v2
+from candidate_agent.mcp.client import pooled_client_factory
+from tests.fakes import ScriptedChatModel, after_tool, app_state, last_human, registry, settings, tool_call
+
+JOB_CALLS: list[str] = []
+
+
+@tool
+async def getJob(jobId: str) -> str:
+    """Job details."""
+    JOB_CALLS.append(jobId)
+    await asyncio.sleep(0.05)  # concurrent items overlap on the same call
+    return json.dumps({"jobId": jobId, "title": "Backend Engineer"})
+
+
+def _client(monkeypatch) -> TestClient:
+    def respond(messages):
+        if "Route immediately" in messages[0].content:
+            return tool_call("transfer_to_post_apply_assistant", {"reason": "job"}, "handoff")
+        if "boom" in last_human(messages):
+            raise RuntimeError("model exploded")
+        if after_tool(messages):
+            return AIMessage("The Backend Engineer role is open.")
+        return tool_call("getJob", {"jobId": "J1"}, "job-1")
+
+    monkeypatch.setattr(graph_module, "build_llm", lambda s: ScriptedChatModel(respond=respond))
+    config = settings(v2_fast_path_enabled=False)
+    app = FastAPI()
+    app.include_router(agent_v2.router, prefix="/api/v2/agent")
+    app_state(app, config, v2_graph=graph_module.build_v2_graph(registry([getJob]), config))
+    JOB_CALLS.clear()
+    return TestClient(app)
+
+
+def test_batch_streams_ndjson_isolates_failures_and_shares_tool_calls(monkeypatch):
+    items = [{"message": "Tell me about job J1", "candidate_id": f"C{i}"} for i in range(3)]
+    items.append({"message": "boom", "candidate_id": "C9", "correlation_id": "bad-item"})
+
+    response = _client(monkeypatch).post(
+        "/api/v2/agent/invoke/batch", json={"items": items, "max_concurrency": 4}
+    )
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["index"] for line in lines) == [0, 1, 2, 3]
+    ok = [line for line in lines if line["status"] == "ok"]
+    (failed,) = [line for line in lines if line["status"] == "error"]
+    assert len(ok) == 3
+    assert all(line["result"]["response"] == "The Backend Engineer role is open." for line in ok)
+    assert failed["index"] == 3 and failed["correlation_id"] == "bad-item"
+    assert "model exploded" in failed["detail"]
+    assert JOB_CALLS == ["J1"]  # one in-flight call served all three items
+
+
+def test_batch_over_the_item_limit_is_rejected(monkeypatch):
+    client = _client(monkeypatch)
+    client.app.state.settings = settings(v2_batch_max_items=2)
+    items = [{"message": "hi", "candidate_id": "C1"}] * 3
+
+    assert client.post("/api/v2/agent/invoke/batch", json={"items": items}).status_code == 413
+
+
+async def test_mcp_sessions_reuse_the_shared_pool_after_closing():
+    class Pool(httpx.AsyncBaseTransport):
+        requests = 0
+        closed = False
+
+        async def handle_async_request(self, request):
+            Pool.requests += 1
+            return httpx.Response(200, json={"ok": True})
+
+        async def aclose(self):
+            Pool.closed = True
+
+    factory = pooled_client_factory(Pool())
+    for _ in range(3):  # the MCP adapter opens and closes one client per session
+        async with factory(headers={"Accept": "application/json"}) as client:
+            assert (await client.get("http://mcp.test/mcp")).json() == {"ok": True}
+
+    assert Pool.requests == 3 and not Pool.closed
@@ -0,0 +1,59 @@
+"""Unit tests for the out-of-band tool result store (no MCP server or LLM needed)."""
+
+from langchain_core.messages import ToolMessage
+
+from candidate_agent.agents.blob_store import (
+    BLOB_REF_KEY,
+    DiskBlobStore,
+    InMemoryBlobStore,
+    offload_tool_message,
+    resolve_messages,
+)
+
+
+def _tool_message(content, name="getCandidateJourney") -> ToolMessage:
+    return ToolMessage(content=content, name=name, tool_call_id="call-1")
+
+
+def test_small_payload_stays_inline():
+    store = InMemoryBlobStore(max_bytes=1024 * 1024)
+    msg = _tool_message("short")
+    assert offload_tool_message(msg, store, min_bytes=64) is msg
+
+
+def test_large_payload_round_trips_and_dedupes():
+    store = InMemoryBlobStore(max_bytes=1024 * 1024)
+    payload = '{"events": "' + "x" * 4096 + '"}'
+
+    first = offload_tool_message(_tool_message(payload), store, min_bytes=64)
+    second = offload_tool_message(_tool_message(payload), store, min_bytes=64)
+
+    assert BLOB_REF_KEY in first.additional_kwargs
+    assert len(first.content) < 200
+    assert first.additional_kwargs[BLOB_REF_KEY]["key"] == second.additional_kwargs[BLOB_REF_KEY]["key"]
+    assert len(store._blobs) == 1
+
+    [resolved] = resolve_messages([first], store)
+    assert resolved.content == payload
+    assert BLOB_REF_KEY not in resolved.additional_kwargs
+    # The state copy keeps only the reference
+    assert first.content != payload
+
+
+def test_content_blocks_round_trip_on_disk(tmp_path):
+    store = DiskBlobStore(tmp_path)
+    blocks = [{"type": "text", "text": "y" * 4096}]
+
+    offloaded = offload_tool_message(_tool_message(blocks), store, min_bytes=64)
+    [resolved] = resolve_messages([offloaded], DiskBlobStore(tmp_path))
+
+    assert resolved.content == blocks
+
+
+def test_evicted_blob_resolves_to_placeholder():
+    store = InMemoryBlobStore(max_bytes=5000)
+    first = offload_tool_message(_tool_message("a" * 4096), store, min_bytes=64)
+    offload_tool_message(_tool_message("b" * 4096), store, min_bytes=64)
+
+    [resolved] = resolve_messages([first], store)
+    assert "no longer available" in resolved.content
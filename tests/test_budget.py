@@ -0,0 +1,61 @@
+"""Unit tests for per-turn tool-call budgets (no MCP server or LLM needed)."""
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import tool
+
+from candidate_agent.agents import graph as graph_module
+from candidate_agent.agents.budget import budget_stats
+from candidate_agent.api.turns import extract_turn
+from tests.fakes import ScriptedChatModel, registry, settings, tool_call, v2_input
+
+CALLS: list[str] = []
+
+
+@tool
+def getApplicationStatus(applicationId: str) -> str:
+    """Current status of an application."""
+    CALLS.append(applicationId)
+    return '{"status": "TECHNICAL_INTERVIEW"}'
+
+
+def _graph(monkeypatch, next_call, **overrides):
+    """v2 graph whose specialist keeps calling tools until it is told to answer."""
+
+    def respond(messages):
+        system = messages[0].content
+        if "Route immediately" in system:
+            return tool_call("transfer_to_post_apply_assistant", {"reason": "status"}, "handoff")
+        if "Tool Budget Exhausted" in system:
+            return AIMessage("Here is what I found so far.")
+        done = sum(isinstance(m, ToolMessage) for m in messages)
+        return tool_call("getApplicationStatus", {"applicationId": next_call(done)}, f"call-{done}")
+
+    monkeypatch.setattr(graph_module, "build_llm", lambda s: ScriptedChatModel(respond=respond))
+    CALLS.clear()
+    return graph_module.build_v2_graph(
+        registry([getApplicationStatus]), settings(v2_fast_path_enabled=False, **overrides)
+    )
+
+
+async def test_spent_budget_forces_a_final_answer(monkeypatch):
+    graph = _graph(monkeypatch, lambda done: f"A{done}", agent_tool_call_budget=2)
+    forced_before = budget_stats.forced_final["post_apply_assistant"]
+
+    state = await graph.ainvoke(v2_input("Check my applications"), {"configurable": {"thread_id": "T"}})
+
+    assert CALLS == ["A0", "A1"]
+    assert extract_turn(state["messages"], "t1").response_text == "Here is what I found so far."
+    assert budget_stats.forced_final["post_apply_assistant"] == forced_before + 1
+
+
+async def test_repeated_identical_calls_reuse_the_result_then_force_an_answer(monkeypatch):
+    graph = _graph(
+        monkeypatch, lambda done: "A1", agent_tool_call_budget=8, agent_max_repeated_tool_calls=2
+    )
+    repeats_before = budget_stats.repeated_calls["post_apply_assistant"]
+
+    state = await graph.ainvoke(v2_input("Status of A1?"), {"configurable": {"thread_id": "T"}})
+
+    assert CALLS == ["A1"]  # both repeats were answered from the first result
+    assert budget_stats.repeated_calls["post_apply_assistant"] == repeats_before + 2
+    assert extract_turn(state["messages"], "t1").response_text == "Here is what I found so far."
@@ -0,0 +1,118 @@
+"""Unit tests for run cancellation (api/cancellation.py) and the 499 answer."""
+
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from candidate_agent.api import cancellation
+from candidate_agent.api.cancellation import RunCancelled, RunRegistry, cancellation_stats, watch_disconnect
+from candidate_agent.api.routes import agent_v2, runs
+from tests.fakes import app_state, settings
+
+
+async def test_cancel_by_correlation_id_raises_run_cancelled_in_the_run():
+    registry, started = RunRegistry(), asyncio.Event()
+    before = cancellation_stats.cancelled["api"]
+
+    async def run():
+        async with registry.track("c1"):
+            started.set()
+            await asyncio.sleep(60)
+
+    task = asyncio.create_task(run())
+    await started.wait()
+    assert "c1" in registry
+
+    assert registry.cancel("c1", "api")
+    assert not registry.cancel("c1", "api")  # already being cancelled
+    with pytest.raises(RunCancelled) as exc_info:
+        await task
+    assert exc_info.value.reason == "api"
+    assert cancellation_stats.cancelled["api"] == before + 1
+    assert "c1" not in registry
+
+
+async def test_cancelling_unknown_or_finished_runs_is_a_no_op():
+    registry = RunRegistry()
+    async with registry.track("c1"):
+        pass
+
+    assert not registry.cancel("c1", "api")
+    assert not registry.cancel("never-started", "api")
+
+
+async def test_other_cancellations_propagate_unchanged():
+    registry, started = RunRegistry(), asyncio.Event()
+
+    async def run():
+        async with registry.track("c1"):
+            started.set()
+            await asyncio.sleep(60)
+
+    task = asyncio.create_task(run())
+    await started.wait()
+    task.cancel()  # e.g. shutdown, not the registry
+
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+class _Request:
+    """Request stand-in whose client disconnects after ``polls`` checks."""
+
+    def __init__(self, polls: int) -> None:
+        self.polls = polls
+
+    async def is_disconnected(self) -> bool:
+        self.polls -= 1
+        return self.polls < 0
+
+
+async def test_watch_disconnect_calls_back_when_the_client_leaves(monkeypatch):
+    monkeypatch.setattr(cancellation, "DISCONNECT_POLL_SECONDS", 0.01)
+    disconnected = []
+
+    async def events():
+        yield "token", {"text": "a"}
+        await asyncio.sleep(60)
+        yield "done", {}
+
+    stream = watch_disconnect(_Request(polls=2), events(), lambda: disconnected.append(True))
+    assert await anext(stream) == ("token", {"text": "a"})
+    await asyncio.sleep(0.1)
+    await stream.aclose()
+    assert disconnected == [True]
+
+    finished = watch_disconnect(_Request(polls=1000), events(), lambda: disconnected.append(False))
+    assert await anext(finished) == ("token", {"text": "a"})
+    await finished.aclose()  # ends first: the watcher is stopped, no callback
+    await asyncio.sleep(0.02)
+    assert disconnected == [True]
+
+
+async def test_invoke_cancelled_through_the_api_answers_499():
+    started = asyncio.Event()
+
+    async def ainvoke(state, config):
+        started.set()
+        await asyncio.sleep(60)
+
+    app = FastAPI()
+    app.include_router(agent_v2.router, prefix="/api/v2/agent")
+    app.include_router(runs.router)
+    app_state(app, settings(), v2_graph=SimpleNamespace(ainvoke=ainvoke))
+    body = {"message": "hi", "candidate_id": "C1", "correlation_id": "c-499"}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://test") as client:
+        invoke = asyncio.create_task(client.post("/api/v2/agent/invoke", json=body))
+        await started.wait()
+        cancelled = await client.post("/api/runs/cancel/c-499")
+        response = await invoke
+        again = await client.post("/api/runs/cancel/c-499")
+
+    assert cancelled.json() == {"correlation_id": "c-499", "cancelled": True}
+    assert response.status_code == 499 and "api" in response.json()["detail"]
+    assert again.json()["cancelled"] is False  # the run has already finished
@@ -0,0 +1,98 @@
+"""Unit tests for graceful drain and the checkpoint hand-off (no MCP server or LLM needed)."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from candidate_agent.agents.blob_store import BLOB_REF_KEY, InMemoryBlobStore, offload_tool_message
+from candidate_agent.agents.checkpoint_snapshot import import_checkpoints
+from candidate_agent.api.drain import RunTracker, drain
+from candidate_agent.api.routes import lifecycle
+from tests.fakes import settings
+
+PAYLOAD = '{"events": "' + "x" * 4096 + '"}'
+
+
+def _graph():
+    builder = StateGraph(MessagesState)
+    builder.add_node("noop", lambda state: {})
+    builder.add_edge(START, "noop")
+    builder.add_edge("noop", END)
+    return builder.compile(checkpointer=MemorySaver())
+
+
+async def test_drain_rejects_new_runs_waits_for_inflight_and_runs_once():
+    tracker = RunTracker()
+    state = SimpleNamespace(
+        settings=settings(drain_grace_seconds=5, checkpoint_snapshot_path=""),
+        run_tracker=tracker,
+        drain_task=None,
+    )
+    tracker.begin()
+
+    first = asyncio.create_task(drain(state))
+    await asyncio.sleep(0.01)
+    with pytest.raises(HTTPException) as exc_info:
+        tracker.reject_if_draining()
+    assert exc_info.value.status_code == 503 and not first.done()
+
+    tracker.end()
+    outcome = await first
+    assert outcome["drained"] and outcome["inflight"] == 0
+    assert await drain(state) is outcome
+
+
+async def test_snapshot_round_trip_inlines_process_local_blobs(tmp_path):
+    store = InMemoryBlobStore(max_bytes=1024 * 1024)
+    tool_result = offload_tool_message(
+        ToolMessage(PAYLOAD, name="getCandidateJourney", tool_call_id="c1"), store, min_bytes=64
+    )
+    assert BLOB_REF_KEY in tool_result.additional_kwargs
+    old = _graph()
+    await old.aupdate_state(
+        {"configurable": {"thread_id": "T"}},
+        {"messages": [HumanMessage("journey?"), tool_result, AIMessage("Here it is.")]},
+    )
+    snapshot = tmp_path / "threads.jsonl"
+    state = SimpleNamespace(
+        settings=settings(drain_grace_seconds=1, checkpoint_snapshot_path=str(snapshot)),
+        run_tracker=RunTracker(),
+        drain_task=None,
+        graph=_graph(),
+        v2_graph=old,
+        blob_store=store,
+    )
+
+    assert (await drain(state))["threads_exported"] == 1
+
+    new = _graph()
+    assert await import_checkpoints({"v1": _graph().checkpointer, "v2": new.checkpointer}, snapshot) == 1
+    messages = (await new.aget_state({"configurable": {"thread_id": "T"}})).values["messages"]
+    assert messages[1].content == PAYLOAD and BLOB_REF_KEY not in messages[1].additional_kwargs
+    assert not snapshot.exists() and snapshot.with_suffix(".jsonl.imported").exists()
+
+
+def test_drain_endpoint_is_local_only_unless_a_token_is_set(monkeypatch):
+    async def fake_drain(app_state):
+        return {"drained": True}
+
+    monkeypatch.setattr(lifecycle, "drain", fake_drain)
+    app = FastAPI()
+    app.include_router(lifecycle.router)
+    app.state.settings = settings()
+
+    assert TestClient(app, client=("10.0.0.7", 1234)).post("/drain").status_code == 403
+    local = TestClient(app, client=("127.0.0.1", 1234))
+    assert local.post("/drain").json() == {"drained": True}
+    assert local.post("/drain", headers={"X-Forwarded-For": "10.0.0.7"}).status_code == 403
+
+    app.state.settings = settings(drain_token="s3cret")
+    assert local.post("/drain").status_code == 403
+    remote = TestClient(app, client=("10.0.0.7", 1234))
+    assert remote.post("/drain", headers={"X-Drain-Token": "s3cret"}).status_code == 200
@@ -0,0 +1,128 @@
+"""Unit tests for the v2 multi-application fan-out (no MCP server or LLM needed)."""
+
+import asyncio
+import json
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import tool
+from langgraph.types import Send
+
+from candidate_agent.agents.fanout import (
+    SUB_RUN_TOOL_CALLS_KEY,
+    build_fanout_nodes,
+    is_multi_application_query,
+)
+from tests.fakes import ScriptedChatModel
+
+APPLICATION_IDS = ["A1", "A2", "A3"]
+
+
+@tool
+def getApplicationsByCandidate(candidateId: str) -> str:
+    """All applications of a candidate."""
+    return json.dumps({"applications": [{"applicationId": a} for a in APPLICATION_IDS]})
+
+
+class _SubAgent:
+    """Stands in for the post_apply ReAct agent; records peak concurrency (per candidate, "all")."""
+
+    def __init__(self) -> None:
+        self.running: dict[str, int] = {}
+        self.peak: dict[str, int] = {}
+
+    async def ainvoke(self, state: dict, config) -> dict:
+        for key in (state["candidate_id"], "all"):
+            self.running[key] = self.running.get(key, 0) + 1
+            self.peak[key] = max(self.peak.get(key, 0), self.running[key])
+        await asyncio.sleep(0.01)
+        for key in (state["candidate_id"], "all"):
+            self.running[key] -= 1
+        app_id = state["application_id"]
+        call = AIMessage("", tool_calls=[{"name": "getApplicationStatus", "args": {}, "id": f"c-{app_id}"}])
+        return {"messages": [*state["messages"], call, AIMessage(f"{app_id} is in review.")]}
+
+
+def _nodes(sub_agent=None, *, llm=None, max_concurrency=4, max_applications=12):
+    return build_fanout_nodes(
+        list_tool=getApplicationsByCandidate,
+        post_apply_agent=sub_agent or _SubAgent(),
+        llm=llm or ScriptedChatModel(respond=lambda messages: AIMessage("")),
+        persona_prompt="You are the post-apply assistant.",
+        blob_store=None,
+        min_blob_bytes=2048,
+        max_concurrency=max_concurrency,
+        max_applications=max_applications,
+    )
+
+
+def test_classifier_matches_only_all_applications_questions():
+    for question in (
+        "Summarize all my applications",
+        "Give me an overview of my applications",
+        "how do my applications stand?",
+        "What's the status of each of my job applications?",
+    ):
+        assert is_multi_application_query(question), question
+    for question in ("What's the status of application A1?", "How do I apply?", "my application to Acme"):
+        assert not is_multi_application_query(question), question
+
+
+async def test_fan_out_sends_one_sub_run_per_application_up_to_the_cap():
+    fan_out, _, _ = _nodes()
+    state = {"messages": [HumanMessage("Summarize all my applications")], "candidate_id": "C1"}
+
+    command = await fan_out(state, {})
+
+    assert [s.arg["application_id"] for s in command.goto] == APPLICATION_IDS
+    assert all(isinstance(s, Send) and s.node == "application_sub_run" for s in command.goto)
+    assert len({s.arg["fanout_id"] for s in command.goto}) == 1
+    call, result = command.update["messages"]
+    assert result.tool_call_id == call.tool_calls[0]["id"]
+    assert command.update["application_summaries"] is None  # reset for this turn
+
+    capped, _, _ = _nodes(max_applications=2)
+    fallback = await capped(state, {})
+    assert fallback.goto == "post_apply_assistant" and len(fallback.update["messages"]) == 2
+
+
+async def test_concurrency_is_bounded_per_fan_out_not_per_process():
+    agent = _SubAgent()
+    fan_out, sub_run, _ = _nodes(agent, max_concurrency=1)
+    sends = []
+    for candidate_id in ("C1", "C2"):
+        state = {"messages": [HumanMessage("Summarize all my applications")], "candidate_id": candidate_id}
+        sends += (await fan_out(state, {})).goto
+
+    results = await asyncio.gather(*(sub_run(send.arg, {}) for send in sends))
+
+    assert agent.peak == {"C1": 1, "C2": 1, "all": 2}  # each turn is serialized, neither waits on the other
+    assert results[0]["application_summaries"][0]["summary"] == "A1 is in review."
+
+
+async def test_synthesis_merges_findings_in_order_and_reports_sub_run_tool_calls():
+    seen = []
+
+    def respond(messages):
+        seen.append(messages[0].content)
+        return AIMessage("A1 and A2 are both in review.")
+
+    _, _, synthesize = _nodes(llm=ScriptedChatModel(respond=respond))
+    summaries = [
+        {
+            "application_id": "A2",
+            "summary": "In review.",
+            "tool_calls": [{"name": "getApplicationStatus", "duration_ms": 3}],
+        },
+        {"application_id": "A1", "summary": "In review.", "tool_calls": []},
+    ]
+
+    out = await synthesize(
+        {"messages": [HumanMessage("Summarize all my applications")], "application_summaries": summaries}, {}
+    )
+
+    (answer,) = out["messages"]
+    assert answer.name == "post_apply_assistant" and out["active_agent"] == "post_apply_assistant"
+    assert seen[0].index("### A1") < seen[0].index("### A2")
+    assert answer.response_metadata[SUB_RUN_TOOL_CALLS_KEY] == [
+        {"name": "getApplicationStatus", "duration_ms": 3, "application_id": "A2"}
+    ]
@@ -0,0 +1,63 @@
+"""Unit tests for the v2 templated fast path (no MCP server or LLM needed)."""
+
+import json
+
+from langchain_core.messages import HumanMessage
+from langchain_core.tools import tool
+from langgraph.graph import END
+
+from candidate_agent.agents.fast_path import build_fast_path_node, classify, fast_path_stats
+from tests.fakes import settings
+
+WORKFLOW = json.dumps({"states": [
+    {"code": "TECHNICAL_INTERVIEW", "label": "Technical Interview", "description": "Meet the team."},
+]})
+
+
+@tool
+def getApplicationStatus(applicationId: str) -> str:
+    """Current status of an application."""
+    return json.dumps({"applicationId": applicationId, "status": "TECHNICAL_INTERVIEW", "daysInStage": 3})
+
+
+def test_classify_accepts_only_whole_single_tool_questions():
+    assert classify("Hi! What's the status of application A123?").application_id == "A123"
+    assert classify("when is my next interview").name == "next_interview"
+    assert classify("What's the status of application A123 and how do I prepare?") is None
+    assert classify("Tell me about my applications") is None
+
+
+async def test_status_question_is_answered_from_template_and_others_fall_back():
+    node = build_fast_path_node(
+        tools=[getApplicationStatus],
+        workflow_states_json=WORKFLOW,
+        fallback=lambda config: "v2_primary_assistant",
+        blob_store=None,
+        min_blob_bytes=2048,
+    )
+    before = fast_path_stats.snapshot()
+
+    hit = await node({"messages": [HumanMessage("What is the status of application A123?")]}, {})
+    assert hit.goto == END
+    call, result, answer = hit.update["messages"]
+    assert call.tool_calls[0]["args"] == {"applicationId": "A123"}
+    assert result.tool_call_id == call.tool_calls[0]["id"]
+    assert "**Technical Interview**" in answer.content and "3 days" in answer.content
+    assert hit.update["active_agent"] == "fast_path"
+
+    miss = await node({"messages": [HumanMessage("Why was I rejected?")]}, {})
+    assert miss.goto == "v2_primary_assistant" and not miss.update
+    json_turn = await node(
+        {"messages": [HumanMessage("What is the status of application A123?")], "response_format": "json"}, {}
+    )
+    assert json_turn.goto == "v2_primary_assistant"
+
+    no_tool = await node({"messages": [HumanMessage("When is my next interview?")]}, {})
+    assert no_tool.goto == "v2_primary_assistant"
+    after = fast_path_stats.snapshot()
+    assert after["answered"]["application_status"] == before["answered"].get("application_status", 0) + 1
+    assert after["fallbacks"]["tool_unavailable"] == before["fallbacks"].get("tool_unavailable", 0) + 1
+
+
+def test_fast_path_is_opt_in():
+    assert settings().v2_fast_path_enabled is False
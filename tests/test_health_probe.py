@@ -0,0 +1,71 @@
+"""Unit tests for the cached readiness verdict (api/health_probe.py); nothing is probed over the network."""
+
+import time
+
+from candidate_agent.api.health_probe import HealthProber
+from tests.fakes import settings
+
+
+def _prober(**overrides) -> HealthProber:
+    options = {
+        "health_probe_interval_seconds": 10,
+        "health_probe_timeout_seconds": 3,
+        "health_failure_threshold": 3,
+        "health_slow_probe_ms": 1000,
+    } | overrides
+    return HealthProber(settings(**options))
+
+
+def _healthy(prober: HealthProber) -> HealthProber:
+    for state in (prober.mcp, prober.llm):
+        state.record(True, 20.0, None)
+    return prober
+
+
+def test_ready_only_once_both_dependencies_answered():
+    prober = _prober()
+    assert prober.readiness(draining=False) == ("not_ready", ["mcp_not_probed_yet", "llm_not_probed_yet"])
+
+    _healthy(prober)
+    assert prober.readiness(draining=False) == ("ready", [])
+    assert prober.readiness(draining=True) == ("not_ready", ["draining"])
+
+
+def test_failures_degrade_until_the_threshold_then_mark_not_ready():
+    prober = _healthy(_prober())
+    for _ in range(2):
+        prober.mcp.record(False, 20.0, "ConnectError: refused")
+    assert prober.readiness(draining=False) == ("degraded", ["mcp_probe_failed (ConnectError: refused)"])
+
+    prober.mcp.record(False, 20.0, "ConnectError: refused")
+    assert prober.readiness(draining=False) == ("not_ready", ["mcp_unreachable (ConnectError: refused)"])
+
+    prober.mcp.record(True, 20.0, None)  # one success resets the count
+    assert prober.readiness(draining=False) == ("ready", [])
+
+
+def test_stale_probe_results_degrade():
+    prober = _healthy(_prober())
+    # Stale after three missed intervals plus the probe timeout (33s here)
+    prober.llm.checked_at = time.monotonic() - 30
+    assert prober.readiness(draining=False)[0] == "ready"
+
+    prober.llm.checked_at = time.monotonic() - 40
+    assert prober.readiness(draining=False) == ("degraded", ["llm_probe_stale"])
+
+
+def test_slow_p95_and_event_loop_lag_degrade():
+    prober = _healthy(_prober())
+    for _ in range(38):
+        prober.llm.record(True, 20.0, None)
+    prober.llm.record(True, 2500.0, None)
+    assert prober.readiness(draining=False)[0] == "ready"  # one outlier in 40 stays under p95
+
+    for _ in range(2):
+        prober.llm.record(True, 2500.0, None)
+    assert prober.readiness(draining=False) == ("degraded", ["llm_slow (p95 2500 ms)"])
+
+    prober.llm.samples.clear()
+    prober.llm.record(True, 20.0, None)
+    prober.loop_lag_ms = 1500.0
+    assert prober.readiness(draining=False) == ("degraded", ["event_loop_lag (1500.0 ms)"])
@@ -0,0 +1,52 @@
+"""Unit tests for paginated thread history (no MCP server or LLM needed)."""
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from candidate_agent.api.history import read_history, turn_spans
+
+
+def _thread(turns: int) -> list:
+    messages = []
+    for t in range(turns):
+        messages += [
+            HumanMessage(f"q{t}", id=f"h{t}"),
+            AIMessage("", name="v2_primary_assistant", tool_calls=[{"id": f"c{t}", "name": "getJob", "args": {}}]),
+            ToolMessage("x" * 100, tool_call_id=f"c{t}", name="getJob"),
+            AIMessage(f"a{t}", name="post_apply_assistant"),
+        ]
+    return messages
+
+
+def test_turn_spans_page_backwards_from_the_cursor():
+    messages = _thread(5)
+    spans, cursor = turn_spans(messages, None, 2)
+    assert spans == [(12, 16), (16, 20)] and cursor == 12
+
+    spans, cursor = turn_spans(messages, cursor, 10)
+    assert spans == [(0, 4), (4, 8), (8, 12)] and cursor is None
+
+
+async def test_read_history_omits_tool_output_and_reports_agents():
+    builder = StateGraph(MessagesState)
+    builder.add_node("noop", lambda state: {})
+    builder.add_edge(START, "noop")
+    builder.add_edge("noop", END)
+    graph = builder.compile(checkpointer=MemorySaver())
+    config = {"configurable": {"thread_id": "T"}}
+    await graph.aupdate_state(config, {"messages": _thread(3)})
+
+    page = await read_history(
+        graph.checkpointer, "T", cursor=None, limit=1, include_tool_output=False, blob_store=None
+    )
+    (turn,) = page.turns
+    assert (turn.message, turn.response, page.next_cursor) == ("q2", "a2", 8)
+    assert turn.agents == ["v2_primary_assistant", "post_apply_assistant"]
+    assert [tc.name for tc in turn.tool_calls] == ["getJob"]
+    tool = turn.messages[2]
+    assert tool.content is None and tool.content_bytes == 100
+
+    assert await read_history(
+        graph.checkpointer, "missing", cursor=None, limit=1, include_tool_output=True, blob_store=None
+    ) is None
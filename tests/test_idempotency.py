@@ -0,0 +1,160 @@
+"""Unit tests for correlation_id idempotency (api/idempotency.py)."""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from candidate_agent.api.cancellation import RunRegistry
+from candidate_agent.api.idempotency import IdempotencyStore
+
+
+def _store(runs: RunRegistry | None = None, **overrides) -> IdempotencyStore:
+    options = {"ttl": 60, "max_entries": 100, "reattach_grace": 5, "replay_max_events": 100} | overrides
+    return IdempotencyStore(runs or RunRegistry(), **options)
+
+
+class _Run:
+    """Zero-arg run factory that counts how often it actually ran."""
+
+    def __init__(self, result="answer", delay: float = 0.0, error: Exception | None = None) -> None:
+        self.calls = 0
+        self.result, self.delay, self.error = result, delay, error
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+async def test_invoke_retries_attach_in_flight_then_replay_the_result():
+    store, run = _store(), _Run(delay=0.05)
+    key = ("v2/invoke", "c1")
+
+    first, attached = await asyncio.gather(store.invoke(key, "fp", run), store.invoke(key, "fp", run))
+    replayed = await store.invoke(key, "fp", run)
+
+    assert first == ("answer", False)
+    assert attached == replayed == ("answer", True)
+    assert run.calls == 1
+    stats = store.snapshot()
+    assert (stats["started"], stats["attached"], stats["replayed"]) == (1, 1, 1)
+
+
+async def test_same_correlation_id_with_a_different_body_is_422():
+    store = _store()
+    await store.invoke(("v2/invoke", "c1"), "fp-a", _Run())
+
+    with pytest.raises(HTTPException) as exc_info:
+        await store.invoke(("v2/invoke", "c1"), "fp-b", _Run())
+    assert exc_info.value.status_code == 422
+    assert store.snapshot()["conflicts"] == 1
+    assert (await store.invoke(("v1/invoke", "c1"), "fp-b", _Run()))[1] is False  # routes are separate
+
+
+async def test_failed_runs_are_not_kept():
+    store, failing = _store(), _Run(error=RuntimeError("boom"))
+    with pytest.raises(RuntimeError):
+        await store.invoke(("v2/invoke", "c1"), "fp", failing)
+
+    retry = _Run()
+    assert await store.invoke(("v2/invoke", "c1"), "fp", retry) == ("answer", False)
+    assert retry.calls == 1
+
+
+async def test_results_expire_after_the_ttl():
+    store, run = _store(ttl=0.05), _Run()
+    await store.invoke(("v2/invoke", "c1"), "fp", run)
+    await asyncio.sleep(0.1)
+
+    assert (await store.invoke(("v2/invoke", "c1"), "fp", run))[1] is False
+    assert run.calls == 2
+
+
+async def test_oldest_results_are_evicted_past_max_entries():
+    store = _store(max_entries=2)
+    runs = {cid: _Run(result=cid) for cid in ("c1", "c2", "c3")}
+    for cid, run in runs.items():
+        await store.invoke(("v2/invoke", cid), "fp", run)
+
+    assert await store.invoke(("v2/invoke", "c3"), "fp", runs["c3"]) == ("c3", True)
+    assert await store.invoke(("v2/invoke", "c1"), "fp", runs["c1"]) == ("c1", False)  # evicted, ran again
+    assert runs["c1"].calls == 2 and runs["c3"].calls == 1
+    assert store.snapshot()["retained_results"] == 2
+
+
+async def _read(subscription, count: int) -> list[str]:
+    return [event for event, _, _ in [await anext(subscription) for _ in range(count)]]
+
+
+async def test_stream_survives_a_reattach_within_grace_and_is_cancelled_after_it():
+    runs, gate = RunRegistry(), asyncio.Event()
+    store = _store(runs, reattach_grace=0.05)
+    key = ("v2/stream", "c1")
+
+    async def events():
+        async with runs.track("c1"):
+            yield "token", {"content": "Hello"}
+            await gate.wait()
+            yield "done", {}
+
+    subscription, detach, replayed = store.stream(key, "fp", events)
+    assert not replayed and await _read(subscription, 1) == ["token"]
+    detach()
+    await subscription.aclose()
+
+    # A gateway retry inside the grace period picks the same run up again
+    await asyncio.sleep(0.01)
+    subscription, detach, replayed = store.stream(key, "fp", events)
+    assert replayed and await _read(subscription, 1) == ["token"]
+    await asyncio.sleep(0.1)
+    assert "c1" in runs  # still running: a subscriber is attached
+    detach()
+    await subscription.aclose()
+
+    # Nobody comes back: the run is cancelled once the grace period passes
+    await asyncio.sleep(0.1)
+    assert "c1" not in runs
+    subscription, _, replayed = store.stream(key, "fp", events)  # key released, new run
+    assert not replayed and store.snapshot()["started"] == 2
+    gate.set()
+    assert await _read(subscription, 2) == ["token", "done"]
+
+
+
+async def test_retry_replays_a_run_longer_than_the_replay_buffer():
+    store, gate, started = _store(replay_max_events=4), asyncio.Event(), []
+    key = ("v2/stream", "c1")
+
+    async def events():
+        started.append(1)
+        yield "tool_call", {"name": "getApplication"}
+        for i in range(10):
+            yield "token", {"content": f"{i} "}
+        await gate.wait()
+        for i in range(10, 20):
+            yield "token", {"content": f"{i} "}
+        yield "done", {}
+
+    first, _, _ = store.stream(key, "fp", events)
+    head = [await anext(first)]
+    while head[-1][2] < 11:  # the ring already overwrote the start: it arrives joined
+        head.append(await anext(first))
+
+    # Mid-run: the ring has dropped the start, the retry still gets all of it
+    attached, _, replayed = store.stream(key, "fp", events)
+    assert replayed and await anext(attached) == ("tool_call", {"name": "getApplication"}, 1)
+    assert await anext(attached) == ("token", {"content": "".join(f"{i} " for i in range(10))}, 11)
+    gate.set()
+    tail = [item async for item in first]
+    assert [item async for item in attached][-1][0] == "done"
+
+    # Finished: the same retry is a full replay, not an error frame
+    again, _, replayed = store.stream(key, "fp", events)
+    replay = [item async for item in again]
+    assert replayed and len(started) == 1
+    assert [event for event, _, _ in replay] == ["tool_call", "token", "done"]
+    assert replay[1][1]["content"] == "".join(data["content"] for event, data, _ in head + tail if event == "token")
+    assert replay[-1][2] == tail[-1][2] == 22
@@ -0,0 +1,170 @@
+"""Unit tests for the async run queue and the submit/poll routes (no MCP server or LLM needed)."""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+
+from candidate_agent.agents import graph as graph_module
+from candidate_agent.api.cancellation import RunCancelled
+from candidate_agent.api.drain import RunTracker
+from candidate_agent.api.jobs import JobQueue
+from candidate_agent.api.routes import runs
+from tests.fakes import ScriptedChatModel, app_state, registry, settings
+
+
+def _queue(**overrides) -> JobQueue:
+    options = {"max_depth": 8, "workers": 2, "result_ttl": 60} | overrides
+    return JobQueue(RunTracker(), **options)
+
+
+async def _finished(jobs: JobQueue, run_id: str):
+    for _ in range(200):
+        job = jobs.get(run_id)
+        if job is None or job.status not in ("queued", "running"):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"run {run_id} never finished")
+
+
+async def _ok():
+    return "done"
+
+
+async def _boom():
+    raise RuntimeError("model exploded")
+
+
+async def _cancelled():
+    raise RunCancelled("api")
+
+
+async def test_workers_run_jobs_and_count_each_outcome():
+    jobs = _queue()
+    jobs.start()
+    try:
+        ids = [jobs.submit("v2", run)[0].run_id for run in (_ok, _boom, _cancelled)]
+        ok, failed, cancelled = [await _finished(jobs, run_id) for run_id in ids]
+    finally:
+        await jobs.stop()
+
+    assert (ok.status, ok.result) == ("succeeded", "done")
+    assert failed.status == "failed" and "model exploded" in failed.error
+    assert cancelled.status == "cancelled" and "api" in cancelled.error
+    stats = jobs.stats()
+    assert (stats["completed"], stats["failed"], stats["cancelled"]) == (1, 1, 1)
+    assert stats["queue_wait_ms"]["p50"] is not None and stats["busy_workers"] == 0
+
+
+async def test_full_queue_answers_429():
+    jobs = _queue(max_depth=1, workers=0)
+    jobs.submit("v2", _ok)
+
+    with pytest.raises(HTTPException) as exc_info:
+        jobs.submit("v2", _ok)
+    assert exc_info.value.status_code == 429 and exc_info.value.headers["Retry-After"]
+    await jobs.stop()
+
+
+async def test_retried_submit_returns_the_same_job_and_a_different_body_conflicts():
+    jobs = _queue(workers=0)
+    first, deduplicated = jobs.submit("v2", _ok, "corr-1", "body-a")
+    assert not deduplicated
+
+    again, deduplicated = jobs.submit("v2", _ok, "corr-1", "body-a")
+    assert again is first and deduplicated
+    assert jobs.submit("v1", _ok, "corr-1", "body-a")[0] is not first  # kinds are separate
+    with pytest.raises(HTTPException) as exc_info:
+        jobs.submit("v2", _ok, "corr-1", "body-b")
+    assert exc_info.value.status_code == 422
+    assert (jobs.stats()["deduplicated"], jobs.stats()["conflicts"]) == (1, 1)
+    await jobs.stop()
+
+
+async def test_failed_runs_free_their_correlation_id_for_a_retry():
+    jobs = _queue()
+    jobs.start()
+    try:
+        failed, _ = jobs.submit("v2", _boom, "corr-2", "body")
+        await _finished(jobs, failed.run_id)
+        retry, deduplicated = jobs.submit("v2", _ok, "corr-2", "body")
+        assert retry is not failed and not deduplicated
+        assert (await _finished(jobs, retry.run_id)).status == "succeeded"
+    finally:
+        await jobs.stop()
+
+
+async def test_shutdown_cancels_running_and_queued_jobs_and_counts_them():
+    started = asyncio.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(60)
+
+    jobs = _queue(workers=1)
+    jobs.start()
+    running, _ = jobs.submit("v2", slow, "corr-3", "body")
+    queued, _ = jobs.submit("v2", _ok)
+    await started.wait()
+
+    await jobs.stop()
+
+    assert running.status == queued.status == "cancelled"
+    assert jobs.stats()["cancelled"] == 2 and jobs.stats()["failed"] == 0
+    assert jobs._tracker.inflight == 0
+
+
+async def test_results_expire_after_the_ttl():
+    jobs = _queue(result_ttl=0.05)
+    jobs.start()
+    try:
+        job, _ = jobs.submit("v2", _ok, "corr-4", "body")
+        assert (await _finished(jobs, job.run_id)).status == "succeeded"
+        await asyncio.sleep(0.1)
+        assert jobs.get(job.run_id) is None
+        assert not jobs.submit("v2", _ok, "corr-4", "body")[1]  # id freed with the result
+    finally:
+        await jobs.stop()
+
+
+def test_submit_and_poll_routes(monkeypatch):
+    monkeypatch.setattr(
+        graph_module,
+        "build_llm",
+        lambda s: ScriptedChatModel(respond=lambda messages: AIMessage("Hi! How can I help?")),
+    )
+    config = settings()
+
+    @asynccontextmanager
+    async def lifespan(app):
+        app.state.job_queue = JobQueue(app.state.run_tracker, max_depth=8, workers=1, result_ttl=60)
+        app.state.job_queue.start()
+        yield
+        await app.state.job_queue.stop()
+
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(runs.router)
+    app_state(app, config, v2_graph=graph_module.build_v2_graph(registry([]), config))
+    body = {"message": "Hello", "candidate_id": "C1", "correlation_id": "corr-route"}
+
+    with TestClient(app) as client:
+        submitted = client.post("/api/v2/agent/runs", json=body)
+        retried = client.post("/api/v2/agent/runs", json=body)
+        assert submitted.status_code == retried.status_code == 202
+        run_id = submitted.json()["run_id"]
+        assert retried.json()["run_id"] == run_id and retried.headers["Idempotent-Replayed"] == "true"
+        assert submitted.headers["Location"] == f"/api/runs/{run_id}"
+
+        for _ in range(200):
+            status = client.get(f"/api/runs/{run_id}").json()
+            if status["status"] == "succeeded":
+                break
+            time.sleep(0.01)
+        assert status["result"]["response"] == "Hi! How can I help?"
+        assert status["queue_wait_ms"] is not None and status["duration_ms"] is not None
+        assert client.get("/api/runs/no-such-run").status_code == 404
+        assert client.get("/api/runs/stats").json()["deduplicated"] == 1
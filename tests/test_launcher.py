@@ -0,0 +1,168 @@
+"""Unit tests for the launcher's hash ring, affinity keys, and proxy routing."""
+
+import json
+import socket
+import threading
+import time
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, WebSocket
+from fastapi.testclient import TestClient
+
+from candidate_agent.launcher import HashRing, WorkerPool, _affinity_key, _run_key, build_front_app
+
+KEYS = [f"thread-{i}" for i in range(5000)]
+
+
+def _assignments(ring: HashRing) -> dict[str, str]:
+    return {key: ring.get(key) for key in KEYS}
+
+
+def test_same_thread_always_maps_to_same_node():
+    ring = HashRing(vnodes=64)
+    for node in ("w0", "w1", "w2"):
+        ring.add(node)
+    assert _assignments(ring) == _assignments(ring)
+    assert set(_assignments(ring).values()) == {"w0", "w1", "w2"}
+
+
+def test_adding_a_node_only_moves_keys_to_it():
+    ring = HashRing(vnodes=64)
+    for node in ("w0", "w1", "w2"):
+        ring.add(node)
+    before = _assignments(ring)
+
+    ring.add("w3")
+    after = _assignments(ring)
+
+    moved = [k for k in KEYS if before[k] != after[k]]
+    assert all(after[k] == "w3" for k in moved)
+    # Roughly 1/4 of the keys should move — well under half
+    assert 0.1 * len(KEYS) < len(moved) < 0.4 * len(KEYS)
+
+
+def test_removing_a_node_only_moves_its_keys():
+    ring = HashRing(vnodes=64)
+    for node in ("w0", "w1", "w2", "w3"):
+        ring.add(node)
+    before = _assignments(ring)
+
+    ring.remove("w1")
+    after = _assignments(ring)
+
+    assert all(before[k] == after[k] for k in KEYS if before[k] != "w1")
+    assert "w1" not in after.values()
+
+
+def test_affinity_key_injects_thread_id_for_agent_requests():
+    thread_id, _, body = _affinity_key("/api/v1/agent/invoke", json.dumps({"message": "hi"}).encode())
+    assert thread_id and json.loads(body)["thread_id"] == thread_id
+
+    payload = {"message": "hi", "thread_id": "t-1", "correlation_id": "c-1"}
+    assert _affinity_key("/api/v1/agent/invoke", json.dumps(payload).encode())[:2] == ("t-1", "c-1")
+
+    assert _affinity_key("/api/v2/agent/threads/t-2/history", b"")[0] == "t-2"
+    assert _affinity_key("/health", b"")[0] is None
+
+
+def test_run_key_matches_only_run_scoped_paths():
+    assert _run_key("/api/runs/r-1") == "r-1"
+    assert _run_key("/api/runs/cancel/c-1") == "c-1"
+    assert _run_key("/api/v2/agent/stream/c-2") == "c-2"
+    assert _run_key("/api/v2/agent/stream") is None
+    assert _run_key("/api/v2/agent/threads/t-1/history") is None
+
+
+def _front(owner_port: int):
+    """Front app over two in-ring workers; only ``owner_port`` holds run r-1 / correlation c-1."""
+    pool = WorkerPool(count=2, base_port=9100)
+    for worker in pool.workers:
+        pool.ring.add(worker)
+    seen: list[tuple[int, str]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        port, path = request.url.port, request.url.path
+        seen.append((port, path))
+        if path.startswith("/api/runs/cancel/"):
+            return httpx.Response(200, json={"cancelled": port == owner_port and path.endswith("-1")})
+        if path.startswith("/api/runs/") or path.startswith("/api/v2/agent/stream/"):
+            if port == owner_port and path.endswith("-1"):
+                return httpx.Response(200, json={"worker": port})
+            return httpx.Response(410 if "stream" in path else 404, json={"detail": "unknown"})
+        return httpx.Response(200, json={"worker": port})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return pool, TestClient(build_front_app(pool, 1, client=client)), seen
+
+
+def test_run_scoped_requests_reach_the_worker_holding_the_run():
+    for owner_port in (9100, 9101):
+        pool, front, seen = _front(owner_port)
+
+        assert front.get("/api/runs/r-1").json() == {"worker": owner_port}
+        assert front.post("/api/runs/cancel/c-1").json()["cancelled"] is True
+        seen.clear()
+        assert front.get("/api/runs/r-1").json() == {"worker": owner_port}
+        assert seen == [(owner_port, "/api/runs/r-1")]  # owner remembered, no probing
+
+    assert front.get("/api/v2/agent/stream/c-unknown").status_code == 410  # last miss passed on
+    assert front.post("/api/runs/cancel/c-unknown").json()["cancelled"] is False
+    assert all(w.inflight == 0 for w in pool.workers)
+
+
+def test_correlation_id_from_a_turn_routes_its_resume_and_cancel():
+    pool, front, seen = _front(owner_port=0)
+    body = {"message": "hi", "thread_id": "T", "correlation_id": "c-9"}
+    owner = pool.ring.get("T")
+
+    assert front.post("/api/v2/agent/stream", json=body).json() == {"worker": owner.port}
+    front.get("/api/v2/agent/stream/c-9")
+    front.post("/api/runs/cancel/c-9")
+
+    assert seen[1] == (owner.port, "/api/v2/agent/stream/c-9")
+    assert seen[3] == (owner.port, "/api/runs/cancel/c-9")
+    history = front.get("/api/v1/agent/threads/T/history").json()
+    assert history == {"worker": owner.port}
+
+
+def _serve_worker(app: FastAPI) -> tuple[uvicorn.Server, int]:
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning", lifespan="off"))
+    threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, sock.getsockname()[1]
+
+
+def test_websocket_is_proxied_to_the_thread_owner_and_keeps_its_close_code():
+    worker_app = FastAPI()
+
+    @worker_app.websocket("/api/v2/agent/ws")
+    async def echo(websocket: WebSocket, thread_id: str = ""):
+        await websocket.accept()
+        await websocket.send_text(f"thread={thread_id}")
+        await websocket.send_text("echo:" + await websocket.receive_text())
+        await websocket.close(code=1012, reason="Server is draining")
+
+    server, port = _serve_worker(worker_app)
+    try:
+        pool = WorkerPool(count=1, base_port=port)
+        pool.ring.add(pool.workers[0])
+        front = TestClient(build_front_app(pool, 1))
+
+        with front.websocket_connect("/api/v2/agent/ws?thread_id=T-1") as ws:
+            assert ws.receive_text() == "thread=T-1"
+            ws.send_text("hello")
+            assert ws.receive_text() == "echo:hello"
+            closed = ws.receive()
+        assert closed == {"type": "websocket.close", "code": 1012, "reason": "Server is draining"}
+
+        with front.websocket_connect("/api/v2/agent/ws") as ws:
+            assert ws.receive_text().removeprefix("thread=")  # generated by the proxy
+            ws.send_text("bye")
+            assert ws.receive_text() == "echo:bye"
+            assert ws.receive()["code"] == 1012
+    finally:
+        server.should_exit = True
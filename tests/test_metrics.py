@@ -0,0 +1,129 @@
+"""Unit tests for the Prometheus metrics (no MCP server or LLM needed)."""
+
+import asyncio
+import re
+from types import SimpleNamespace
+from uuid import uuid4
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+from candidate_agent.api import metrics
+from candidate_agent.api.admission import AdmissionController
+from candidate_agent.api.cancellation import RunRegistry
+from candidate_agent.api.drain import RunTracker
+from candidate_agent.api.jobs import JobQueue
+from candidate_agent.api.metrics import Histogram, metrics_handler
+from candidate_agent.api.routes import agent_v2
+from candidate_agent.api.routes import metrics as metrics_route
+from candidate_agent.api.routes.metrics import collected
+from tests.fakes import app_state, settings
+
+
+def test_histogram_renders_cumulative_buckets():
+    hist = Histogram("demo_seconds", "Demo", ("route",), buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.5, 3):
+        hist.observe(value, '/a"b')
+
+    assert hist.render()[2:] == [
+        'candidate_agent_demo_seconds_bucket{route="/a\\"b",le="0.1"} 1',
+        'candidate_agent_demo_seconds_bucket{route="/a\\"b",le="1"} 3',
+        'candidate_agent_demo_seconds_bucket{route="/a\\"b",le="+Inf"} 4',
+        'candidate_agent_demo_seconds_sum{route="/a\\"b"} 4.050000',
+        'candidate_agent_demo_seconds_count{route="/a\\"b"} 4',
+    ]
+
+
+def test_handler_records_llm_tokens_and_tool_errors():
+    llm_run, tool_run = uuid4(), uuid4()
+    tokens_before = dict(metrics.llm_tokens.values)
+    errors_before = metrics.tool_errors.values.get(("getCandidateProfile",), 0)
+
+    metrics_handler.on_chat_model_start({}, [], run_id=llm_run, metadata={"ls_model_name": "test-model"})
+    metrics_handler.on_llm_new_token("Hi", run_id=llm_run)
+    message = AIMessage(
+        "Hi",
+        usage_metadata={
+            "input_tokens": 120,
+            "output_tokens": 8,
+            "total_tokens": 128,
+            "input_token_details": {"cache_read": 100},
+        },
+    )
+    metrics_handler.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]), run_id=llm_run)
+
+    metrics_handler.on_tool_start({"name": "getCandidateProfile"}, "{}", run_id=tool_run)
+    metrics_handler.on_tool_end(ToolMessage("boom", tool_call_id="1", status="error"), run_id=tool_run)
+
+    def added(kind: str) -> float:
+        key = ("test-model", kind)
+        return metrics.llm_tokens.values[key] - tokens_before.get(key, 0)
+
+    assert (added("input"), added("output"), added("cache_read")) == (120, 8, 100)
+    assert metrics.llm_ttft_seconds.values[("test-model",)][-1] >= 0
+    assert metrics.tool_errors.values[("getCandidateProfile",)] == errors_before + 1
+    assert "candidate_agent_llm_call_duration_seconds_count{model=\"test-model\"}" in metrics.render()
+
+
+async def test_scrape_exports_state_gauges_and_stats_counters():
+    admission = AdmissionController(
+        limit=1,
+        min_limit=1,
+        max_limit=1,
+        max_queue=0,
+        queue_timeout=1,
+        per_candidate=0,
+        target_llm_latency_ms=0,
+        adjust_interval=1,
+    )
+    tracker = RunTracker()
+    state = SimpleNamespace(
+        run_tracker=tracker,
+        run_registry=RunRegistry(),
+        admission=admission,
+        job_queue=JobQueue(tracker, max_depth=4, workers=1, result_ttl=60),
+    )
+    async with admission.slot("C1"):
+        with pytest.raises(HTTPException):
+            await admission.acquire("C2")  # no queue: shed
+        text = metrics.render(collected(state))
+
+    assert "candidate_agent_admission_admitted_total 1\n" in text
+    assert re.search(r'candidate_agent_admission_shed_total\{reason="\w+"\} 1\n', text)
+    assert "# TYPE candidate_agent_admission_queued gauge\n" in text
+    assert "# TYPE candidate_agent_runs_cancelled_total counter\n" in text
+    assert "# TYPE candidate_agent_pii_redactions_total counter\n" in text
+    assert re.search(r'candidate_agent_speculative_tokens_total\{kind="wasted"\} \d+\n', text)
+    assert "# TYPE candidate_agent_fast_path_fallbacks_total counter\n" in text
+
+
+async def test_runs_in_flight_counts_batch_items_and_not_queued_jobs():
+    release = asyncio.Event()
+
+    async def ainvoke(state, config):
+        await release.wait()
+        raise RuntimeError("released")
+
+    app = FastAPI()
+    app.include_router(agent_v2.router, prefix="/api/v2/agent")
+    app.include_router(metrics_route.router)
+    app_state(app, settings(), v2_graph=SimpleNamespace(ainvoke=ainvoke))
+    app.state.job_queue = JobQueue(app.state.run_tracker, max_depth=4, workers=0, result_ttl=60)
+    app.state.job_queue.submit("v2", release.wait)  # queued: no worker picks it up
+    items = [{"message": "hi", "candidate_id": f"C{i}"} for i in range(3)]
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://test") as client:
+        batch = asyncio.create_task(client.post("/api/v2/agent/invoke/batch", json={"items": items}))
+        while app.state.run_registry.running < 3:
+            await asyncio.sleep(0.01)
+        text = (await client.get("/metrics")).text
+        release.set()
+        assert (await batch).status_code == 200
+    await app.state.job_queue.stop()
+
+    assert "candidate_agent_runs_in_flight 3\n" in text  # one per batch item
+    assert "candidate_agent_drain_pending_runs 2\n" in text  # the batch request and the queued job
+    assert "candidate_agent_job_queue_depth 1\n" in text
@@ -0,0 +1,42 @@
+"""Unit tests for streaming PII redaction (no MCP server or LLM needed)."""
+
+import random
+
+from langchain_core.messages import ToolMessage
+
+from candidate_agent.api.redaction import StreamRedactor
+
+TEXT = (
+    "Your id C0042 is on file. Write to recruiting.team@acme-corp.com or call "
+    "+1 (415) 555-0100 before 2030-11-04 14:00. Application A001 and id C00421 are not yours."
+)
+REDACTED = (
+    "Your id [REDACTED_ID] is on file. Write to [REDACTED_EMAIL] or call "
+    "[REDACTED_PHONE] before 2030-11-04 14:00. Application A001 and id C00421 are not yours."
+)
+
+
+def _redact(chunks: list[str], redactor: StreamRedactor) -> list[str]:
+    released = [redactor.feed(chunk) for chunk in chunks]
+    return released + list(redactor.flush())
+
+
+def test_redaction_does_not_depend_on_chunk_boundaries():
+    for seed in range(50):
+        rnd = random.Random(seed)
+        chunks, i = [], 0
+        while i < len(TEXT):
+            size = rnd.randint(1, 8)
+            chunks.append(TEXT[i : i + size])
+            i += size
+        assert "".join(_redact(chunks, StreamRedactor(literals=["C0042"]))) == REDACTED
+
+
+def test_text_is_released_before_the_turn_ends_and_tool_identifiers_are_learned():
+    redactor = StreamRedactor()
+    redactor.observe(ToolMessage(content='{"profile": {"phone": "5551234"}}', tool_call_id="1"))
+
+    released = _redact(["Your", " number", " 55512", "34", " is", " on", " file."], redactor)
+
+    assert released[:3] == ["", "Your ", "number "]
+    assert "".join(released) == "Your number [REDACTED_ID] is on file."
@@ -0,0 +1,81 @@
+"""Unit tests for the v2 speculative specialist (no MCP server or LLM needed)."""
+
+import time
+
+from langchain_core.messages import AIMessage
+
+from candidate_agent.agents import graph as graph_module
+from candidate_agent.agents.speculation import speculation_stats
+from candidate_agent.api.turns import extract_turn
+from tests.fakes import ScriptedChatModel, registry, settings, tool_call, v2_input
+
+SPECULATIVE = {"configurable": {"thread_id": "T", "speculative": True}}
+SPECIALIST_ANSWER = "Your application A1 is in the technical interview stage."
+
+
+def _graph(monkeypatch, router_reply, specialist_reply=SPECIALIST_ANSWER, router_delay=0.0, **overrides):
+    """v2 graph in speculative mode; router and specialist share one scripted model.
+
+    The router is invoked without streaming, so its reply is built in an executor
+    thread and ``router_delay`` does not hold up the streaming specialist.
+    """
+
+    def respond(messages):
+        if "Route immediately" in messages[0].content:
+            time.sleep(router_delay)
+            return router_reply
+        return AIMessage(specialist_reply)
+
+    model = ScriptedChatModel(respond=respond, chunk_delay=0.005)
+    monkeypatch.setattr(graph_module, "build_llm", lambda s: model)
+    return graph_module.build_v2_graph(
+        registry([]),
+        settings(v2_speculative_specialist=True, v2_fast_path_enabled=False, **overrides),
+    )
+
+
+async def test_handoff_keeps_the_speculative_answer(monkeypatch):
+    graph = _graph(monkeypatch, tool_call("transfer_to_post_apply_assistant", {"reason": "status"}, "h1"))
+    before = speculation_stats.snapshot()
+
+    state = await graph.ainvoke(v2_input("Status of A1?"), SPECULATIVE)
+
+    assert extract_turn(state["messages"], "t1").response_text.strip() == SPECIALIST_ANSWER
+    assert state["active_agent"] == "post_apply_assistant"
+    after = speculation_stats.snapshot()
+    assert after["kept"] == before["kept"] + 1 and after["cancelled"] == before["cancelled"]
+
+
+async def test_direct_router_answer_discards_the_speculative_run(monkeypatch):
+    graph = _graph(monkeypatch, AIMessage("Hi! How can I help with your applications?"))
+    before = speculation_stats.snapshot()
+
+    state = await graph.ainvoke(v2_input("Hello"), SPECULATIVE)
+
+    answer = extract_turn(state["messages"], "t1").response_text
+    assert answer == "Hi! How can I help with your applications?"
+    assert SPECIALIST_ANSWER not in answer
+    after = speculation_stats.snapshot()
+    assert after["cancelled"] == before["cancelled"] + 1 and after["kept"] == before["kept"]
+
+
+async def test_budget_stops_a_long_generation_before_the_router_decides(monkeypatch):
+    # ~2 estimated tokens per streamed word: the specialist passes 20 tokens after ~10
+    # chunks (~50ms), well before the router decides and long before its 400 words end.
+    router_answer = "Hi! How can I help with your applications?"
+    graph = _graph(
+        monkeypatch,
+        AIMessage(router_answer),
+        specialist_reply=" ".join(["token"] * 400),
+        router_delay=0.5,
+        v2_speculative_max_tokens=20,
+    )
+    before = speculation_stats.snapshot()
+
+    state = await graph.ainvoke(v2_input("Hello"), SPECULATIVE)
+
+    assert extract_turn(state["messages"], "t1").response_text == router_answer
+    after = speculation_stats.snapshot()
+    assert after["budget_aborted"] == before["budget_aborted"] + 1
+    assert after["cancelled"] == before["cancelled"]  # already stopped, not counted twice
+    assert 20 < after["wasted_tokens"] - before["wasted_tokens"] < 400
@@ -0,0 +1,73 @@
+"""Unit tests for the shared SSE encoder (no MCP server or LLM needed)."""
+
+import asyncio
+import json
+
+from candidate_agent.api.sse import encode_event, sse_frames
+
+
+def _decode(frames: list[bytes]) -> list[dict]:
+    return [json.loads(f.decode()[len("data: "):]) for f in frames]
+
+
+async def _collect(events, **kwargs) -> list[bytes]:
+    return [frame async for frame in sse_frames(events, **kwargs)]
+
+
+async def _source(items, delay: float = 0.0):
+    for item in items:
+        if delay:
+            await asyncio.sleep(delay)
+        yield item
+
+
+def test_encoded_frames_match_legacy_format():
+    for event, data in [
+        ("token", {"content": 'he said "hi" — ok\n'}),
+        ("tool_call", {"name": "getApplicationStatus"}),
+        ("done", {"active_agent": "post_apply_assistant", "tool_calls": ["getJob"]}),
+    ]:
+        legacy = f"data: {json.dumps({'event': event, 'data': data})}\n\n"
+        frame = encode_event(event, data)
+        assert frame.startswith(b"data: ") and frame.endswith(b"\n\n")
+        assert json.loads(frame[6:]) == json.loads(legacy[6:])
+
+
+async def test_tokens_coalesce_and_other_events_flush_in_order():
+    items = [("token", {"content": c}) for c in "abc"] + [
+        ("tool_call", {"name": "getJob"}),
+        ("token", {"content": "d"}),
+        ("done", {"active_agent": "x", "tool_calls": ["getJob"]}),
+    ]
+    decoded = _decode(await _collect(_source(items), coalesce_ms=1000, coalesce_bytes=256))
+    assert [(d["event"], d["data"].get("content")) for d in decoded] == [
+        ("token", "abc"),
+        ("tool_call", None),
+        ("token", "d"),
+        ("done", None),
+    ]
+
+
+async def test_size_and_time_limits_flush_buffer():
+    by_size = _decode(
+        await _collect(_source([("token", {"content": "xx"})] * 4), coalesce_ms=1000, coalesce_bytes=4)
+    )
+    assert [d["data"]["content"] for d in by_size] == ["xxxx", "xxxx"]
+
+    by_time = _decode(
+        await _collect(_source([("token", {"content": "x"})] * 3, delay=0.05), coalesce_ms=10)
+    )
+    assert [d["data"]["content"] for d in by_time] == ["x", "x", "x"]
+
+
+async def test_coalescing_disabled_emits_one_frame_per_token():
+    frames = await _collect(_source([("token", {"content": "a"})] * 3), coalesce_bytes=0)
+    assert len(frames) == 3
+
+
+async def test_merged_token_frame_carries_id_of_last_chunk():
+    items = [("token", {"content": c}, seq) for seq, c in enumerate("abc", start=1)]
+    items.append(("done", {"active_agent": "x", "tool_calls": []}, 4))
+    frames = await _collect(_source(items), coalesce_ms=1000, coalesce_bytes=256)
+    assert [f.split(b"\n", 1)[0] for f in frames] == [b"id: 3", b"id: 4"]
+    assert json.loads(frames[0].split(b"\n", 1)[1][6:])["data"]["content"] == "abc"
@@ -0,0 +1,92 @@
+"""Unit tests for Last-Event-ID resume of streamed runs (no MCP server or LLM needed)."""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from candidate_agent.api.cancellation import RunRegistry
+from candidate_agent.api.idempotency import IdempotencyStore
+
+
+def _store(replay_max_events: int = 8, coalesce_bytes: int = 0) -> IdempotencyStore:
+    return IdempotencyStore(
+        RunRegistry(),
+        ttl=10,
+        max_entries=10,
+        reattach_grace=1,
+        replay_max_events=replay_max_events,
+        coalesce_bytes=coalesce_bytes,
+    )
+
+
+def _run(count: int, started: list[int]):
+    async def events():
+        started.append(1)
+        for i in range(count):
+            await asyncio.sleep(0.01)
+            yield "token", {"content": str(i)}
+        yield "done", {}
+
+    return events
+
+
+async def test_resume_replays_only_missed_events_without_a_new_run():
+    store, started = _store(), []
+    subscription, detach, _ = store.stream(("v2/stream", "c"), "fp", _run(5, started))
+    first = []
+    async for item in subscription:
+        first.append(item)
+        if len(first) == 2:
+            detach()
+
+    resumed, _, replayed = store.stream(("v2/stream", "c"), "fp", _run(5, started), first[-1][2])
+    rest = [item async for item in resumed]
+
+    assert replayed and len(started) == 1
+    assert [seq for _, _, seq in first + rest] == [1, 2, 3, 4, 5, 6]
+    assert rest[-1][0] == "done"
+
+
+async def test_resume_past_the_ring_buffer_replays_from_the_transcript():
+    store, started = _store(replay_max_events=4), []
+    subscription, _, _ = store.stream(("v2/stream", "c"), "fp", _run(10, started))
+    [item async for item in subscription]
+
+    # Events 3..7 left the ring: the rest of that token run comes back joined
+    older, _ = store.resume(("v2/stream", "c"), 2)
+    assert [item async for item in older] == [("token", {"content": "23456789"}, 10), ("done", {}, 11)]
+
+    tail, _ = store.resume(("v2/stream", "c"), 9)
+    assert [seq for _, _, seq in [item async for item in tail]] == [10, 11]
+    assert len(started) == 1
+
+    with pytest.raises(HTTPException) as exc_info:
+        store.resume(("v2/stream", "unknown"), 1)
+    assert exc_info.value.status_code == 410
+
+
+async def test_ids_count_coalesced_frames_so_resume_outlasts_many_chunks():
+    store, started, gate = _store(replay_max_events=8, coalesce_bytes=16), [], asyncio.Event()
+
+    async def events():
+        started.append(1)
+        for i in range(40):
+            yield "token", {"content": "ab"}
+            if i == 23:  # 48 characters in: three whole frames
+                await gate.wait()
+        yield "done", {}
+
+    subscription, detach, _ = store.stream(("v2/stream", "c"), "fp", events)
+    first = await anext(subscription)
+    assert first == ("token", {"content": "ab" * 8}, 1)  # eight chunks, one frame, one id
+    detach()
+    await subscription.aclose()
+    gate.set()
+
+    # 40 chunks but 6 frames: the resume is served from the ring, frame by frame
+    resumed, _ = store.resume(("v2/stream", "c"), first[2])
+    rest = [item async for item in resumed]
+
+    assert len(started) == 1
+    assert rest == [("token", {"content": "ab" * 8}, seq) for seq in range(2, 6)] + [("done", {}, 6)]
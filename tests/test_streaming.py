@@ -0,0 +1,59 @@
+"""Unit tests for the shared stream engine (no MCP server or LLM needed)."""
+
+import re
+
+import structlog
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+
+from candidate_agent.agents import graph as graph_module
+from candidate_agent.api.streaming import V2_STREAM, stream_turn
+from tests.fakes import ScriptedChatModel, after_tool, last_human, registry, settings, tool_call, v2_input
+
+
+@tool
+def getApplicationsByCandidate(candidateId: str) -> str:
+    """All applications of a candidate."""
+    return '[{"applicationId": "A1"}, {"applicationId": "A2"}]'
+
+
+@tool
+def getApplicationStatus(applicationId: str) -> str:
+    """Current status of an application."""
+    return '{"status": "TECHNICAL_INTERVIEW"}'
+
+
+def _respond(messages):
+    if "Per-application findings" in messages[0].content:
+        return AIMessage("Both applications are at the interview stage.")
+    scoped = re.search(r"Focus only on application (\w+)", last_human(messages))
+    if scoped:
+        app_id = scoped.group(1)
+        if after_tool(messages):
+            return AIMessage(f"Draft for {app_id} only.")
+        return tool_call("getApplicationStatus", {"applicationId": app_id}, f"status-{app_id}")
+    return tool_call("transfer_to_post_apply_assistant", {"reason": "all applications"}, "handoff")
+
+
+async def test_fan_out_streams_only_the_synthesized_answer(monkeypatch):
+    monkeypatch.setattr(graph_module, "build_llm", lambda s: ScriptedChatModel(respond=_respond))
+    graph = graph_module.build_v2_graph(
+        registry([getApplicationsByCandidate, getApplicationStatus]),
+        settings(v2_fanout_enabled=True, v2_fast_path_enabled=False),
+    )
+
+    events = [
+        item
+        async for item in stream_turn(
+            graph,
+            v2_input("Summarize all my applications"),
+            {"configurable": {"thread_id": "T"}},
+            V2_STREAM,
+            structlog.get_logger(),
+        )
+    ]
+
+    tokens = "".join(data["content"] for event, data in events if event == "token")
+    assert tokens.strip() == "Both applications are at the interview stage."
+    assert ("handoff", {"from": "v2_primary_assistant", "to": "post_apply_assistant"}) in events
+    assert events[-1][0] == "done"
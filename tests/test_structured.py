@@ -0,0 +1,54 @@
+"""Unit tests for response_format="json" (no MCP server or LLM needed)."""
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import tool
+from langgraph.prebuilt import ToolNode, create_react_agent
+
+from candidate_agent.agents.budget import budget_model
+from candidate_agent.agents.structured import ANSWER_TOOL_NAME, submit_structured_answer
+from candidate_agent.api.turns import extract_turn
+
+
+@tool
+def getApplicationStatus(application_id: str) -> str:
+    """Current status of an application."""
+    return '{"status": "INTERVIEW"}'
+
+
+class _FakeModel(GenericFakeChatModel):
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+async def test_json_turn_ends_on_the_answer_tool_and_returns_its_payload():
+    llm = _FakeModel(messages=iter([
+        AIMessage("", tool_calls=[{"id": "1", "name": "getApplicationStatus", "args": {"application_id": "A1"}}]),
+        AIMessage("", tool_calls=[{
+            "id": "2",
+            "name": ANSWER_TOOL_NAME,
+            "args": {"answer": "A1 is at the interview stage.", "facts": [{"name": "status", "value": "INTERVIEW"}]},
+        }]),
+    ]))
+    model = budget_model(
+        llm,
+        [getApplicationStatus],
+        agent="post_apply_assistant",
+        budget=4,
+        max_repeats=2,
+        no_tool_choice={"type": "none"},
+        structured_max_tokens=256,
+        exempt=frozenset({ANSWER_TOOL_NAME}),
+    )
+    agent = create_react_agent(
+        model=model, tools=ToolNode([getApplicationStatus, submit_structured_answer])
+    )
+    state = await agent.ainvoke(
+        {"messages": [HumanMessage("Status of A1?", id="t1")], "response_format": "json"}
+    )
+
+    result = extract_turn(state["messages"], "t1")
+    assert result.structured is not None
+    assert result.structured.facts[0].value == "INTERVIEW"
+    assert result.response_text == "A1 is at the interview stage."
+    assert result.tool_names == ["getApplicationStatus"]
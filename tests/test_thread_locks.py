@@ -0,0 +1,111 @@
+"""Unit tests for per-thread turn serialization (api/thread_locks.py)."""
+
+import asyncio
+
+import pytest
+
+from candidate_agent.api.cancellation import RunCancelled, RunRegistry
+from candidate_agent.api.thread_locks import ThreadBusy, ThreadLocks
+
+
+RUNS = RunRegistry()
+
+
+def _locks(policy: str, *, wait_timeout: float = 5.0, max_waiters: int = 4) -> ThreadLocks:
+    return ThreadLocks(RUNS, policy=policy, wait_timeout=wait_timeout, max_waiters=max_waiters)
+
+
+async def _turn(locks: ThreadLocks, correlation_id: str, log: list[str], release: asyncio.Event, thread="T"):
+    """One turn: registered for cancellation, holding the thread lock until ``release``."""
+    async with RUNS.track(correlation_id), locks.hold(thread, correlation_id):
+        log.append(f"start {correlation_id}")
+        await release.wait()
+        log.append(f"end {correlation_id}")
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        _locks("fifo")
+
+
+async def test_queue_policy_runs_turns_one_after_another():
+    locks, log, release = _locks("queue"), [], asyncio.Event()
+    first = asyncio.create_task(_turn(locks, "c1", log, release))
+    await asyncio.sleep(0.01)
+    second = asyncio.create_task(_turn(locks, "c2", log, release))
+    other_thread = asyncio.create_task(_turn(locks, "c3", log, release, thread="U"))
+    await asyncio.sleep(0.01)
+
+    assert log == ["start c1", "start c3"]  # c2 waits; another thread does not
+    release.set()
+    await asyncio.gather(first, second, other_thread)
+
+    assert log.index("end c1") < log.index("start c2")
+    stats = locks.stats()
+    assert stats["acquired"] == 3 and stats["waited"] == 1
+    assert stats["lock_wait_ms"]["max"] >= 10
+    assert stats["active_threads"] == 0  # idle locks are dropped
+
+
+async def test_reject_policy_answers_409_while_a_turn_runs():
+    locks, log, release = _locks("reject"), [], asyncio.Event()
+    first = asyncio.create_task(_turn(locks, "c1", log, release))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(ThreadBusy) as exc_info:
+        locks.reject_if_busy("T")
+    assert exc_info.value.status_code == 409
+    with pytest.raises(ThreadBusy):
+        await _turn(locks, "c2", log, release)
+
+    release.set()
+    await first
+    assert locks.stats()["rejected"] == 2
+    locks.reject_if_busy("T")  # free again
+
+
+async def test_cancel_older_policy_supersedes_the_running_turn():
+    locks, log, release = _locks("cancel_older"), [], asyncio.Event()
+    first = asyncio.create_task(_turn(locks, "c1", log, release))
+    await asyncio.sleep(0.01)
+
+    second = asyncio.create_task(_turn(locks, "c2", log, release))
+    with pytest.raises(RunCancelled) as exc_info:
+        await first
+    assert exc_info.value.reason == "superseded"
+    await asyncio.sleep(0.01)
+    release.set()
+    await second
+
+    assert log == ["start c1", "start c2", "end c2"]
+    assert locks.stats()["superseded"] == 1
+
+
+async def test_full_wait_line_answers_409():
+    locks, log, release = _locks("queue", max_waiters=1), [], asyncio.Event()
+    running = asyncio.create_task(_turn(locks, "c1", log, release))
+    await asyncio.sleep(0.01)
+    waiting = asyncio.create_task(_turn(locks, "c2", log, release))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(ThreadBusy) as exc_info:
+        await _turn(locks, "c3", log, release)
+    assert exc_info.value.status_code == 409 and "too many waiting" in exc_info.value.detail
+
+    release.set()
+    await asyncio.gather(running, waiting)
+    assert locks.stats()["rejected"] == 1 and "start c3" not in log
+
+
+async def test_waiting_longer_than_the_timeout_answers_409():
+    locks, log, release = _locks("queue", wait_timeout=0.05), [], asyncio.Event()
+    running = asyncio.create_task(_turn(locks, "c1", log, release))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(ThreadBusy) as exc_info:
+        await _turn(locks, "c2", log, release)
+    assert "timed out" in exc_info.value.detail
+
+    release.set()
+    await running
+    assert locks.stats()["timed_out"] == 1 and locks.stats()["active_threads"] == 0
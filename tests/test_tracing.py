@@ -0,0 +1,34 @@
+"""Unit tests for sampled run tracing (no Langfuse server needed)."""
+
+import pytest
+
+from candidate_agent.api.cancellation import RunCancelled
+from candidate_agent.api.tracing import RunTracer
+from candidate_agent.config import Settings
+
+
+async def test_sampling_opt_in_and_bounded_tail_capture():
+    tracer = RunTracer(Settings(
+        anthropic_api_key="test",
+        langfuse_public_key="pk-lf-test",
+        langfuse_secret_key="sk-lf-test",
+        trace_sample_rate=0.0,
+        trace_sample_rates={"v2/stream": 1.0},
+        trace_export_queue_max=1,
+    ))  # exporter thread not started: captured traces stay queued
+
+    async with tracer.run("v2/invoke", input="hi") as trace:
+        assert trace.callbacks == []
+    async with tracer.run("v2/invoke", input="hi", opt_in=True) as trace:
+        assert trace.callbacks
+    async with tracer.run("v2/stream", input="hi") as trace:
+        assert trace.callbacks
+    for exc in (ValueError("boom"), ValueError("boom"), RunCancelled("api")):
+        with pytest.raises(type(exc)):
+            async with tracer.run("v2/invoke", input="hi"):
+                raise exc
+
+    stats = tracer.snapshot()
+    assert stats["decisions"] == {"v2/invoke:unsampled": 4, "v2/invoke:opt_in": 1, "v2/stream:sampled": 1}
+    assert stats["tail_captured"] == {"error": 2}  # the cancellation is not an error
+    assert (stats["queue_depth"], stats["dropped"]) == (1, 1)
@@ -0,0 +1,89 @@
+"""Unit tests for the v2 WebSocket session (api/routes/agent_v2_ws.py) and its drain handling."""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+from starlette.websockets import WebSocketDisconnect
+
+from candidate_agent.agents import graph as graph_module
+from candidate_agent.api.drain import drain
+from candidate_agent.api.routes import agent_v2_ws
+from tests.fakes import ScriptedChatModel, app_state, registry, settings
+
+REPLY = "Hi! How can I help you with your application today?"
+
+
+@pytest.fixture
+def app(monkeypatch) -> FastAPI:
+    monkeypatch.setattr(
+        graph_module,
+        "build_llm",
+        lambda s: ScriptedChatModel(respond=lambda messages: AIMessage(REPLY), chunk_delay=0.01),
+    )
+    config = settings(drain_grace_seconds=5, checkpoint_snapshot_path="")
+    app = FastAPI()
+    app.include_router(agent_v2_ws.router, prefix="/api/v2/agent")
+    app_state(app, config, v2_graph=graph_module.build_v2_graph(registry([]), config))
+    return app
+
+
+def _turn(ws, correlation_id: str) -> list[dict]:
+    """Frames of one turn, up to and including its ``done``."""
+    frames = []
+    while not frames or frames[-1]["event"] != "done":
+        frame = ws.receive_json()
+        if frame["event"] != "heartbeat":
+            frames.append(frame)
+    assert {frame["correlation_id"] for frame in frames} == {correlation_id}
+    return frames
+
+
+def test_session_runs_turns_and_reports_bad_frames(app):
+    with TestClient(app) as client, client.websocket_connect("/api/v2/agent/ws?candidate_id=C1&thread_id=T1") as ws:
+        assert ws.receive_json() == {"event": "session", "data": {"thread_id": "T1"}}
+
+        ws.send_json({"type": "message", "message": "Hello", "correlation_id": "c1"})
+        frames = _turn(ws, "c1")
+        text = "".join(frame["data"]["content"] for frame in frames if frame["event"] == "token")
+        assert text.strip() == REPLY
+
+        ws.send_text("not json")
+        assert "invalid JSON" in ws.receive_json()["data"]["detail"]
+        ws.send_json({"type": "message", "message": "", "correlation_id": "c2"})
+        error = ws.receive_json()
+        assert error["event"] == "error" and error["correlation_id"] == "c2"
+
+
+def test_frame_sent_while_draining_closes_with_1012(app):
+    with TestClient(app) as client, client.websocket_connect("/api/v2/agent/ws?candidate_id=C1") as ws:
+        ws.receive_json()  # session
+        app.state.run_tracker.draining = True
+
+        ws.send_json({"type": "message", "message": "Hello"})
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            ws.receive_json()
+        assert exc_info.value.code == 1012
+
+
+def test_drain_lets_the_running_turn_finish_then_closes_the_session(app):
+    with TestClient(app) as client:
+        with client.websocket_connect("/api/v2/agent/ws?candidate_id=C1") as busy, client.websocket_connect(
+            "/api/v2/agent/ws?candidate_id=C2"
+        ) as idle:
+            busy.receive_json(), idle.receive_json()  # session
+            busy.send_json({"type": "message", "message": "Hello", "correlation_id": "c1"})
+            assert busy.receive_json()["event"] == "token"
+
+            outcome = client.portal.call(drain, app.state)
+
+            assert outcome["drained"] and outcome["inflight"] == 0
+            assert _turn(busy, "c1")[-1]["event"] == "done"  # every frame arrives before the close
+            for ws in (busy, idle):
+                with pytest.raises(WebSocketDisconnect) as exc_info:
+                    ws.receive_json()
+                assert exc_info.value.code == 1012
+
+        with pytest.raises(WebSocketDisconnect) as exc_info, client.websocket_connect("/api/v2/agent/ws") as ws:
+            ws.receive_json()
+        assert exc_info.value.code == 1013  # new sessions are refused while draining